@@ -5,13 +5,22 @@ from collections import namedtuple
 from dataclasses import dataclass, fields
 from enum import Enum
 from pathlib import Path
-from typing import Dict, List, Set, Tuple, Union
+from typing import Dict, List, Optional, Set, Tuple, Union
 
 import dacite
+import numpy as np
 import orjson
 from pandas import DataFrame
 
-from kronos.nodes.utils_df_serialisation import default, df_type_hook
+from kronos.nodes.utils_df_serialisation import (
+    DFsFormat,
+    default,
+    df_type_hook,
+    dfs_format_from_path,
+    load_dfs_dir,
+    save_dfs_dir,
+)
+from kronos.nodes.utils_validation import concat_nids_by_ntype, nids_by_ntype
 
 logger = logging.getLogger(__name__)
 
@@ -122,6 +131,20 @@ class EdgeDFs:
 
         return etype_to_df
 
+    @property
+    def nids_by_ntype(self) -> Dict[str, np.ndarray]:
+        """Source and destination node ids referenced by edges per node type"""
+        return concat_nids_by_ntype(
+            nids_by_ntype(
+                ntype=edge_df.df[ntype_key.value], nid=edge_df.df[nid_key.value]
+            )
+            for edge_df in self.members
+            for ntype_key, nid_key in (
+                (EdgeAttrKey.src_ntype, EdgeAttrKey.src_nid),
+                (EdgeAttrKey.dst_ntype, EdgeAttrKey.dst_nid),
+            )
+        )
+
     @property
     def etypes(self) -> List[EdgeType]:
         return [edge_df.etype for edge_df in self.members]
@@ -150,10 +173,29 @@ class MetaEdgeDFs:
 
 
 class EdgeDFsDataInterface:
+    """Saves and loads edge dataframes either as a single json document or,
+    when the path suffix is .parquet or .arrow, as a directory holding one
+    binary file per edge type plus a manifest"""
+
     def __init__(self, filepath: Path) -> None:
         self.filepath = filepath
+        self.format = dfs_format_from_path(filepath)
 
     def save(self, edge_dfs: EdgeDFs) -> None:
+        if self.format != DFsFormat.json:
+            save_dfs_dir(
+                dirpath=self.filepath,
+                member_key="etype",
+                members={
+                    edge_df.etype.value: edge_df.df for edge_df in edge_dfs.members
+                },
+                fmt=self.format,
+            )
+
+            logger.info(f"Saved a {type(edge_dfs)} type object to {self.filepath}")
+
+            return
+
         if not self.filepath.parent.exists():
             logger.info(
                 f"Creating {self.filepath.parent} because it does not yet exist"
@@ -168,7 +210,29 @@ class EdgeDFsDataInterface:
 
             logger.info(f"Saved a {type(edge_dfs)} type object to {self.filepath}")
 
-    def load(self) -> EdgeDFs:
+    def load(
+        self, columns: Optional[List[str]] = None, memory_map: bool = False
+    ) -> EdgeDFs:
+        """Loads edge dataframes, optionally keeping only the given columns.
+        Memory mapping only applies to binary formats"""
+        if self.format != DFsFormat.json:
+            members = load_dfs_dir(
+                dirpath=self.filepath,
+                member_key="etype",
+                columns=columns,
+                memory_map=memory_map,
+            )
+            edge_dfs = EdgeDFs(
+                members=[
+                    EdgeDF(etype=EdgeType(etype), df=df)
+                    for etype, df in members.items()
+                ]
+            )
+
+            logger.info(f"Loaded a {type(edge_dfs)} object from {self.filepath}")
+
+            return edge_dfs
+
         with open(self.filepath, "rb") as f:
             json_data = orjson.loads(f.read())
             edge_dfs = dacite.from_dict(
@@ -179,6 +243,12 @@ class EdgeDFsDataInterface:
                 ),
             )
 
+            if columns is not None:
+                for edge_df in edge_dfs.members:
+                    edge_df.df = edge_df.df[
+                        [column for column in columns if column in edge_df.df.columns]
+                    ]
+
             logger.info(f"Loaded a {type(edge_dfs)} object from {self.filepath}")
 
             return edge_dfs
@@ -0,0 +1,41 @@
+from typing import Any, Dict, Iterable, List, Tuple
+
+import numpy as np
+
+from kronos.data_interfaces.sqlite_lru_cache_data_interface import (
+    SqliteLRUCacheDataInterface,
+    cache_key,
+)
+
+
+def emb_cache_key(model_name: str, text: str) -> str:
+    """Content address of an embedding: a hash of model identity plus text"""
+    return cache_key(model_name, text)
+
+
+class EmbCacheDataInterface(SqliteLRUCacheDataInterface[np.ndarray]):
+    """Persistent embedding cache backed by a single sqlite file, keyed by a
+    hash of model identity and text so that entries of different models never
+    collide"""
+
+    NAME = "embedding cache"
+    TABLE = "emb_cache"
+    VALUE_COLUMNS = (("dtype", "TEXT"), ("emb", "BLOB"))
+
+    def encode(self, value: np.ndarray) -> Tuple[Any, ...]:
+        return str(np.asarray(value).dtype), np.ascontiguousarray(value).tobytes()
+
+    def decode(self, *columns: Any) -> np.ndarray:
+        dtype, emb = columns
+
+        return np.frombuffer(emb, dtype=dtype)
+
+    def get_many(self, model_name: str, text: List[str]) -> Dict[str, np.ndarray]:
+        """Returns cached embeddings of texts found in the cache keyed by text"""
+        return self._get_many(namespace=model_name, text=text)
+
+    def put_many(
+        self, model_name: str, text_emb: Iterable[Tuple[str, np.ndarray]]
+    ) -> None:
+        """Writes embeddings back to the cache and evicts if it grows too large"""
+        self._put_many(namespace=model_name, text_value=text_emb)
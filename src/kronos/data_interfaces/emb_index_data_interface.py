@@ -0,0 +1,64 @@
+import logging
+from enum import Enum
+from pathlib import Path
+from typing import Any, Dict
+
+import numpy as np
+
+from kronos.nodes.search_emb import IVFIndex
+
+logger = logging.getLogger(__name__)
+
+
+class IVFArrayName(str, Enum):
+    centroids = "centroids"
+    order = "order"
+    starts = "starts"
+    digest = "digest"
+
+
+# Suffix replacing that of a text embedding file to name its index file
+IVF_INDEX_SUFFIX = ".ivf.npz"
+
+
+def ivf_index_path(path_text_emb: Path) -> Path:
+    """Index file persisted next to a text embedding .npz file or .emb store"""
+    return path_text_emb.with_suffix(IVF_INDEX_SUFFIX)
+
+
+class EmbIndexDataInterface:
+    def __init__(self, filepath: Path) -> None:
+        self.filepath = filepath
+
+    def exists(self) -> bool:
+        return self.filepath.exists()
+
+    def save(self, ivf_index: IVFIndex) -> None:
+        kwargs: Dict[str, Any] = {
+            IVFArrayName.centroids.value: ivf_index.centroids,
+            IVFArrayName.order.value: ivf_index.order,
+            IVFArrayName.starts.value: ivf_index.starts,
+            IVFArrayName.digest.value: np.array(ivf_index.digest),
+        }
+
+        np.savez(self.filepath, **kwargs)
+
+        logger.info(
+            f"Saved an IVF index of {ivf_index.n_list} lists to {self.filepath}"
+        )
+
+    def load(self) -> IVFIndex:
+        npzfile = np.load(self.filepath)
+
+        ivf_index = IVFIndex(
+            centroids=npzfile[IVFArrayName.centroids.value],
+            order=npzfile[IVFArrayName.order.value],
+            starts=npzfile[IVFArrayName.starts.value],
+            digest=str(npzfile[IVFArrayName.digest.value]),
+        )
+
+        logger.info(
+            f"Loaded an IVF index of {ivf_index.n_list} lists from {self.filepath}"
+        )
+
+        return ivf_index
@@ -0,0 +1,411 @@
+from __future__ import annotations
+
+import logging
+from collections import defaultdict
+from dataclasses import dataclass, field
+from enum import Enum
+from functools import cached_property
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+import orjson
+from networkx import DiGraph
+from pandas import DataFrame
+from pydantic import BaseModel
+
+from kronos.data_interfaces.edge_dfs_data_interface import (
+    EdgeAttrKey,
+    EdgeDFs,
+    EdgeType,
+)
+from kronos.data_interfaces.node_dfs_data_interface import (
+    NodeAttrKey,
+    NodeDFs,
+    NodeType,
+)
+from kronos.nodes.utils_columnar import iter_attr_dicts
+from kronos.nodes.utils_df_serialisation import DFsFormat, load_dfs_dir, save_dfs_dir
+
+logger = logging.getLogger(__name__)
+
+
+class HeteroGraphFileName(str, Enum):
+    header = "header.json"
+    nodes = "nodes"
+    edges = "edges"
+
+
+def build_csr(
+    keys: np.ndarray, values: np.ndarray, n_key: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Groups values by integer keys into an index pointer array of length
+    n_key + 1 and values ordered by key, preserving input order within a key"""
+    order = np.argsort(keys, kind="stable")
+    indptr = np.zeros(n_key + 1, dtype=np.int64)
+    np.cumsum(np.bincount(keys, minlength=n_key), out=indptr[1:])
+
+    return indptr, values[order]
+
+
+def gather_csr(indptr: np.ndarray, values: np.ndarray, keys: np.ndarray) -> np.ndarray:
+    """Concatenates the values of all given keys without a python loop"""
+    starts = indptr[keys]
+    counts = indptr[keys + 1] - starts
+    n = int(counts.sum())
+    if n == 0:
+        return values[:0]
+
+    # Offset of each output position within the run of values of its key
+    offsets = np.arange(n) - np.repeat(np.cumsum(counts) - counts, counts)
+
+    return values[np.repeat(starts, counts) + offsets]  # type: ignore[no-any-return]
+
+
+def _unique_ntype(df: DataFrame, attr_key: EdgeAttrKey, etype: EdgeType) -> NodeType:
+    ntypes = {str(ntype) for ntype in df[attr_key.value].unique()}
+    if len(ntypes) != 1:
+        raise ValueError(
+            f"{etype.value} edge dataframe has to reference exactly one "
+            f"{attr_key.value} but references {sorted(ntypes)}"
+        )
+
+    return NodeType(ntypes.pop())
+
+
+@dataclass
+class NodeStore:
+    ntype: NodeType
+    num_nodes: int
+    # Node attributes indexed by node id, node type included as in networkx
+    attrs: DataFrame
+
+
+@dataclass
+class EdgeStore:
+    etype: EdgeType
+    src_ntype: NodeType
+    dst_ntype: NodeType
+    num_src_nodes: int
+    num_dst_nodes: int
+    # Edges in input order as int32 coordinate arrays
+    src: np.ndarray
+    dst: np.ndarray
+    # Edge attributes aligned with src and dst, edge type included as in networkx
+    attrs: DataFrame
+
+    @cached_property
+    def out_csr(self) -> Tuple[np.ndarray, np.ndarray]:
+        return build_csr(keys=self.src, values=self.dst, n_key=self.num_src_nodes)
+
+    @cached_property
+    def in_csr(self) -> Tuple[np.ndarray, np.ndarray]:
+        return build_csr(keys=self.dst, values=self.src, n_key=self.num_dst_nodes)
+
+    def __len__(self) -> int:
+        return len(self.src)
+
+
+@dataclass
+class HeteroGraph:
+    """Compact heterogeneous graph whose nodes are addressed by (ntype, nid)
+    and whose edges of each edge type are held as int32 arrays with lazily
+    built compressed sparse row indices for both directions"""
+
+    nodes: Dict[NodeType, NodeStore] = field(default_factory=dict)
+    edges: Dict[EdgeType, EdgeStore] = field(default_factory=dict)
+
+    @classmethod
+    def from_dfs(cls, node_dfs: NodeDFs, edge_dfs: EdgeDFs) -> HeteroGraph:
+        relations: List[Tuple[EdgeType, NodeType, NodeType, DataFrame]] = []
+        for edge_df in edge_dfs.members:
+            df = edge_df.df
+            if len(df) == 0:
+                logger.info(f"Skipping empty {edge_df.etype.value} edge dataframe")
+                continue
+            relations.append(
+                (
+                    edge_df.etype,
+                    _unique_ntype(df, EdgeAttrKey.src_ntype, edge_df.etype),
+                    _unique_ntype(df, EdgeAttrKey.dst_ntype, edge_df.etype),
+                    df,
+                )
+            )
+
+        # Node id spaces span nodes of dataframes and nodes referenced by edges
+        num_nodes: Dict[NodeType, int] = defaultdict(int)
+        for node_df in node_dfs.members:
+            nid = node_df.df[NodeAttrKey.nid.value]
+            num_nodes[node_df.ntype] = int(nid.max()) + 1 if len(nid) > 0 else 0
+        for _, src_ntype, dst_ntype, df in relations:
+            for ntype, attr_key in (
+                (src_ntype, EdgeAttrKey.src_nid),
+                (dst_ntype, EdgeAttrKey.dst_nid),
+            ):
+                num_nodes[ntype] = max(
+                    num_nodes[ntype], int(df[attr_key.value].max()) + 1
+                )
+
+        nodes = {
+            node_df.ntype: NodeStore(
+                ntype=node_df.ntype,
+                num_nodes=num_nodes[node_df.ntype],
+                attrs=node_df.df.set_index(NodeAttrKey.nid.value),
+            )
+            for node_df in node_dfs.members
+        }
+
+        endpoint_keys = [
+            EdgeAttrKey.src_nid.value,
+            EdgeAttrKey.dst_nid.value,
+            EdgeAttrKey.src_ntype.value,
+            EdgeAttrKey.dst_ntype.value,
+        ]
+        edges = {
+            etype: EdgeStore(
+                etype=etype,
+                src_ntype=src_ntype,
+                dst_ntype=dst_ntype,
+                num_src_nodes=num_nodes[src_ntype],
+                num_dst_nodes=num_nodes[dst_ntype],
+                src=df[EdgeAttrKey.src_nid.value].to_numpy(dtype=np.int32),
+                dst=df[EdgeAttrKey.dst_nid.value].to_numpy(dtype=np.int32),
+                attrs=df.drop(columns=endpoint_keys).reset_index(drop=True),
+            )
+            for etype, src_ntype, dst_ntype, df in relations
+        }
+
+        hetero_graph = cls(nodes=nodes, edges=edges)
+
+        logger.info(
+            f"Built a heterogeneous graph with {hetero_graph.num_nodes()} nodes of "
+            f"{len(nodes)} node types and {hetero_graph.num_edges()} edges of "
+            f"{len(edges)} edge types"
+        )
+
+        return hetero_graph
+
+    def num_nodes(self, ntype: Optional[NodeType] = None) -> int:
+        if ntype is not None:
+            return len(self.nodes[ntype].attrs)
+
+        return sum(len(store.attrs) for store in self.nodes.values())
+
+    def num_edges(self, etype: Optional[EdgeType] = None) -> int:
+        if etype is not None:
+            return len(self.edges[etype])
+
+        return sum(len(store) for store in self.edges.values())
+
+    def out_neighbours(self, etype: EdgeType, nid: int) -> np.ndarray:
+        """Destination node ids of edges of an edge type leaving a node"""
+        indptr, dst = self.edges[etype].out_csr
+
+        return dst[indptr[nid] : indptr[nid + 1]]
+
+    def in_neighbours(self, etype: EdgeType, nid: int) -> np.ndarray:
+        """Source node ids of edges of an edge type arriving at a node"""
+        indptr, src = self.edges[etype].in_csr
+
+        return src[indptr[nid] : indptr[nid + 1]]
+
+    def out_degrees(self, etype: EdgeType) -> np.ndarray:
+        return np.diff(self.edges[etype].out_csr[0])
+
+    def in_degrees(self, etype: EdgeType) -> np.ndarray:
+        return np.diff(self.edges[etype].in_csr[0])
+
+    def k_hop(
+        self,
+        seeds: Dict[NodeType, Iterable[int]],
+        k: int,
+        etypes: Optional[Iterable[EdgeType]] = None,
+        reverse: bool = False,
+    ) -> Dict[NodeType, np.ndarray]:
+        """Returns sorted ids of nodes within k hops of seed nodes per node type,
+        seeds included, following edges of given edge types in their direction
+        or against it when reversed"""
+        stores = [
+            self.edges[etype] for etype in (self.edges if etypes is None else etypes)
+        ]
+        num_nodes = {ntype: store.num_nodes for ntype, store in self.nodes.items()}
+        for store in stores:
+            num_nodes.setdefault(store.src_ntype, store.num_src_nodes)
+            num_nodes.setdefault(store.dst_ntype, store.num_dst_nodes)
+
+        visited = {ntype: np.zeros(n, dtype=bool) for ntype, n in num_nodes.items()}
+        frontier: Dict[NodeType, np.ndarray] = {}
+        for ntype, nids in seeds.items():
+            frontier[ntype] = np.unique(np.asarray(list(nids), dtype=np.int64))
+            visited[ntype][frontier[ntype]] = True
+
+        for _ in range(k):
+            reached: Dict[NodeType, List[np.ndarray]] = defaultdict(list)
+            for store in stores:
+                from_ntype, to_ntype = (
+                    (store.dst_ntype, store.src_ntype)
+                    if reverse
+                    else (store.src_ntype, store.dst_ntype)
+                )
+                if from_ntype not in frontier:
+                    continue
+                indptr, values = store.in_csr if reverse else store.out_csr
+                reached[to_ntype].append(
+                    gather_csr(indptr=indptr, values=values, keys=frontier[from_ntype])
+                )
+
+            frontier = {}
+            for ntype, parts in reached.items():
+                nids = np.unique(np.concatenate(parts))
+                nids = nids[~visited[ntype][nids]]
+                if len(nids) > 0:
+                    visited[ntype][nids] = True
+                    frontier[ntype] = nids
+
+            if len(frontier) == 0:
+                break
+
+        return {
+            ntype: np.flatnonzero(mask) for ntype, mask in visited.items() if mask.any()
+        }
+
+    def iter_node_tuples(self) -> Iterator[Tuple[Tuple[str, int], Dict[str, Any]]]:
+        for ntype, store in self.nodes.items():
+            node_keys = ((ntype.value, nid) for nid in store.attrs.index.tolist())
+            attr_dicts = iter_attr_dicts(
+                df=store.attrs, attr_keys=store.attrs.columns.tolist()
+            )
+
+            yield from zip(node_keys, attr_dicts)
+
+    def iter_edge_tuples(
+        self,
+    ) -> Iterator[Tuple[Tuple[str, int], Tuple[str, int], Dict[str, Any]]]:
+        for store in self.edges.values():
+            src_keys = ((store.src_ntype.value, u) for u in store.src.tolist())
+            dst_keys = ((store.dst_ntype.value, v) for v in store.dst.tolist())
+            attr_dicts = iter_attr_dicts(
+                df=store.attrs, attr_keys=store.attrs.columns.tolist()
+            )
+
+            yield from zip(src_keys, dst_keys, attr_dicts)
+
+    def to_networkx(self) -> DiGraph:  # type: ignore[no-any-unimported]
+        """Converts to a networkx graph identical to one assembled directly from
+        node and edge dataframes, e.g. for analysis in notebooks"""
+        nx_g = DiGraph()
+        nx_g.add_nodes_from(self.iter_node_tuples())
+        nx_g.add_edges_from(self.iter_edge_tuples())
+
+        return nx_g
+
+
+class HeteroGraphHeader(BaseModel):
+    num_nodes: Dict[NodeType, int]
+    relations: List[Tuple[EdgeType, NodeType, NodeType]]
+
+
+class HeteroGraphDataInterface:
+    """Saves and loads a heterogeneous graph as a directory holding a header
+    with node id space sizes and edge type signatures, plus node and edge
+    attribute tables as arrow files which can be memory-mapped on load"""
+
+    def __init__(self, filepath: Path) -> None:
+        self.filepath = filepath
+
+    def save(self, hetero_graph: HeteroGraph) -> None:
+        self.filepath.mkdir(parents=True, exist_ok=True)
+
+        save_dfs_dir(
+            dirpath=self.filepath / HeteroGraphFileName.nodes.value,
+            member_key="ntype",
+            members={
+                ntype.value: store.attrs.reset_index()
+                for ntype, store in hetero_graph.nodes.items()
+            },
+            fmt=DFsFormat.arrow,
+        )
+        save_dfs_dir(
+            dirpath=self.filepath / HeteroGraphFileName.edges.value,
+            member_key="etype",
+            members={
+                etype.value: store.attrs.assign(
+                    **{
+                        EdgeAttrKey.src_nid.value: store.src,
+                        EdgeAttrKey.dst_nid.value: store.dst,
+                    }
+                )
+                for etype, store in hetero_graph.edges.items()
+            },
+            fmt=DFsFormat.arrow,
+        )
+
+        header = HeteroGraphHeader(
+            num_nodes={
+                **{
+                    ntype: store.num_nodes
+                    for ntype, store in hetero_graph.nodes.items()
+                },
+                **{
+                    store.src_ntype: store.num_src_nodes
+                    for store in hetero_graph.edges.values()
+                },
+                **{
+                    store.dst_ntype: store.num_dst_nodes
+                    for store in hetero_graph.edges.values()
+                },
+            },
+            relations=[
+                (etype, store.src_ntype, store.dst_ntype)
+                for etype, store in hetero_graph.edges.items()
+            ],
+        )
+        with open(self.filepath / HeteroGraphFileName.header.value, "wb") as f:
+            f.write(
+                orjson.dumps(header.model_dump(mode="json"), option=orjson.OPT_INDENT_2)
+            )
+
+        logger.info(f"Saved a {type(hetero_graph)} object to {self.filepath}")
+
+    def load(self, memory_map: bool = False) -> HeteroGraph:
+        with open(self.filepath / HeteroGraphFileName.header.value, "rb") as f:
+            header = HeteroGraphHeader(**orjson.loads(f.read()))
+
+        node_members = load_dfs_dir(
+            dirpath=self.filepath / HeteroGraphFileName.nodes.value,
+            member_key="ntype",
+            memory_map=memory_map,
+        )
+        edge_members = load_dfs_dir(
+            dirpath=self.filepath / HeteroGraphFileName.edges.value,
+            member_key="etype",
+            memory_map=memory_map,
+        )
+
+        nodes = {
+            NodeType(ntype): NodeStore(
+                ntype=NodeType(ntype),
+                num_nodes=header.num_nodes[NodeType(ntype)],
+                attrs=df.set_index(NodeAttrKey.nid.value),
+            )
+            for ntype, df in node_members.items()
+        }
+        edges: Dict[EdgeType, EdgeStore] = {}
+        for etype, src_ntype, dst_ntype in header.relations:
+            df = edge_members[etype.value]
+            edges[etype] = EdgeStore(
+                etype=etype,
+                src_ntype=src_ntype,
+                dst_ntype=dst_ntype,
+                num_src_nodes=header.num_nodes[src_ntype],
+                num_dst_nodes=header.num_nodes[dst_ntype],
+                src=df[EdgeAttrKey.src_nid.value].to_numpy(dtype=np.int32),
+                dst=df[EdgeAttrKey.dst_nid.value].to_numpy(dtype=np.int32),
+                attrs=df.drop(
+                    columns=[EdgeAttrKey.src_nid.value, EdgeAttrKey.dst_nid.value]
+                ),
+            )
+
+        logger.info(f"Loaded a {HeteroGraph} object from {self.filepath}")
+
+        return HeteroGraph(nodes=nodes, edges=edges)
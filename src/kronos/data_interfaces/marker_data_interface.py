@@ -0,0 +1,86 @@
+import logging
+from datetime import datetime
+from enum import Enum
+from pathlib import Path
+from typing import Generic, Optional, Type, TypeVar
+
+import orjson
+from pydantic import BaseModel
+
+from kronos.nodes.utils_data_interfaces import atomic_write_bytes
+
+logger = logging.getLogger(__name__)
+
+
+class RefreshStatus(str, Enum):
+    # Content differs from that of the version downstream stages last consumed,
+    # or no version has been consumed yet
+    changed = "changed"
+    # Content is identical to that of the version downstream stages last
+    # consumed, so they can be skipped
+    unchanged = "unchanged"
+
+
+class RefreshMarker(BaseModel):
+    status: RefreshStatus
+    # Version holding the refreshed content
+    version: str
+    content_hash: str
+    # Latest version before the refresh, if any
+    previous_version: Optional[str] = None
+    # Version downstream stages last consumed, if any
+    consumed_version: Optional[str] = None
+    checked_at: datetime
+
+
+class ConsumedMarker(BaseModel):
+    # Version which downstream stages last completed on
+    version: str
+    content_hash: str
+    consumed_at: datetime
+
+
+M = TypeVar("M", bound=BaseModel)
+
+
+class MarkerDataInterface(Generic[M]):
+    """Json marker through which pipeline stages and orchestration tell each
+    other about the versions of a source"""
+
+    MODEL: Type[M]
+
+    def __init__(self, filepath: Path) -> None:
+        self.filepath = filepath
+
+    def save(self, marker: M) -> None:
+        atomic_write_bytes(
+            path=self.filepath, content=orjson.dumps(marker.model_dump(mode="json"))
+        )
+
+        logger.info(f"Saved a {self.MODEL.__name__} to {self.filepath}")
+
+    def load(self) -> Optional[M]:
+        """Returns None if no marker has been written yet"""
+        if not self.filepath.is_file():
+            return None
+
+        with open(self.filepath, "rb") as f:
+            marker = self.MODEL(**orjson.loads(f.read()))
+
+        logger.info(f"Loaded a {self.MODEL.__name__} from {self.filepath}")
+
+        return marker
+
+
+class RefreshMarkerDataInterface(MarkerDataInterface[RefreshMarker]):
+    """Marker telling orchestration whether the latest refresh of a source
+    changed its content"""
+
+    MODEL = RefreshMarker
+
+
+class ConsumedMarkerDataInterface(MarkerDataInterface[ConsumedMarker]):
+    """Marker written once the last downstream stage succeeds, recording the
+    version of a source it consumed"""
+
+    MODEL = ConsumedMarker
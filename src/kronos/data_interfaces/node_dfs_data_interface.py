@@ -5,13 +5,27 @@ from collections import namedtuple
 from dataclasses import dataclass, fields
 from enum import Enum
 from pathlib import Path
-from typing import Dict, List, Set, Tuple
+from typing import Dict, List, Optional, Set, Tuple
 
 import dacite
+import numpy as np
 import orjson
 from pandas import DataFrame
 
-from kronos.nodes.utils_df_serialisation import default, df_type_hook
+from kronos.nodes.utils_df_serialisation import (
+    DFsFormat,
+    default,
+    df_type_hook,
+    dfs_format_from_path,
+    load_dfs_dir,
+    save_dfs_dir,
+)
+from kronos.nodes.utils_validation import (
+    concat_nids_by_ntype,
+    describe_nids,
+    duplicate_nids,
+    nids_by_ntype,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -95,19 +109,11 @@ class NodeDFs:
                 f"node types are not unique:\n{list_ntype}"
             )
 
-        list_nodes: List[Tuple[str, int]] = []
-        set_nodes: Set[Tuple[str, int]] = set()
-        for node_df in self.members:
-            df = node_df.df
-            list_nodes.extend(df[NodeAttrKey.nid.value].tolist())
-            set_nodes = set_nodes | set(
-                zip(df[NodeAttrKey.ntype.value], df[NodeAttrKey.nid.value])
-            )
-
-        if len(set_nodes) != len(list_nodes):
+        duplicates = duplicate_nids(self.nids_by_ntype)
+        if len(duplicates) > 0:
             raise ValueError(
                 "Node ids are not unique within dataframes in "
-                f"{self.__class__.__name__} object"
+                f"{self.__class__.__name__} object: {describe_nids(duplicates)}"
             )
 
     def report(self) -> None:
@@ -120,6 +126,16 @@ class NodeDFs:
 
         return ntype_to_df
 
+    @property
+    def nids_by_ntype(self) -> Dict[str, np.ndarray]:
+        return concat_nids_by_ntype(
+            nids_by_ntype(
+                ntype=node_df.df[NodeAttrKey.ntype.value],
+                nid=node_df.df[NodeAttrKey.nid.value],
+            )
+            for node_df in self.members
+        )
+
     @property
     def ntypes(self) -> List[NodeType]:
         return [node_df.ntype for node_df in self.members]
@@ -136,10 +152,29 @@ class NodeDFs:
 
 
 class NodeDFsDataInterface:
+    """Saves and loads node dataframes either as a single json document or,
+    when the path suffix is .parquet or .arrow, as a directory holding one
+    binary file per node type plus a manifest"""
+
     def __init__(self, filepath: Path) -> None:
         self.filepath = filepath
+        self.format = dfs_format_from_path(filepath)
 
     def save(self, node_dfs: NodeDFs) -> None:
+        if self.format != DFsFormat.json:
+            save_dfs_dir(
+                dirpath=self.filepath,
+                member_key="ntype",
+                members={
+                    node_df.ntype.value: node_df.df for node_df in node_dfs.members
+                },
+                fmt=self.format,
+            )
+
+            logger.info(f"Saved a {type(node_dfs)} type object to {self.filepath}")
+
+            return
+
         if not self.filepath.parent.exists():
             logger.info(
                 f"Creating {self.filepath.parent} because it does not yet exist"
@@ -154,7 +189,29 @@ class NodeDFsDataInterface:
 
             logger.info(f"Saved a {type(node_dfs)} type object to {self.filepath}")
 
-    def load(self) -> NodeDFs:
+    def load(
+        self, columns: Optional[List[str]] = None, memory_map: bool = False
+    ) -> NodeDFs:
+        """Loads node dataframes, optionally keeping only the given columns.
+        Memory mapping only applies to binary formats"""
+        if self.format != DFsFormat.json:
+            members = load_dfs_dir(
+                dirpath=self.filepath,
+                member_key="ntype",
+                columns=columns,
+                memory_map=memory_map,
+            )
+            node_dfs = NodeDFs(
+                members=[
+                    NodeDF(ntype=NodeType(ntype), df=df)
+                    for ntype, df in members.items()
+                ]
+            )
+
+            logger.info(f"Loaded a {type(node_dfs)} object from {self.filepath}")
+
+            return node_dfs
+
         with open(self.filepath, "rb") as f:
             json_data = orjson.loads(f.read())
             node_dfs = dacite.from_dict(
@@ -165,6 +222,12 @@ class NodeDFsDataInterface:
                 ),
             )
 
+            if columns is not None:
+                for node_df in node_dfs.members:
+                    node_df.df = node_df.df[
+                        [column for column in columns if column in node_df.df.columns]
+                    ]
+
             logger.info(f"Loaded a {type(node_dfs)} object from {self.filepath}")
 
             return node_dfs
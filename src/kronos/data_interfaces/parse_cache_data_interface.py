@@ -0,0 +1,60 @@
+from typing import Any, Dict, Iterable, List, NamedTuple, Tuple
+
+import orjson
+
+from kronos.data_interfaces.sqlite_lru_cache_data_interface import (
+    SqliteLRUCacheDataInterface,
+    cache_key,
+)
+
+
+class ParsedText(NamedTuple):
+    """Token and entity structure of a text parsed by a spacy pipeline"""
+
+    # Token texts in order, so that the position of a token is its index
+    tokens: Tuple[str, ...]
+    # Entities as (text, label, start token index, end token index)
+    ents: Tuple[Tuple[str, str, int, int], ...]
+
+
+def parse_cache_key(pipeline_name: str, text: str) -> str:
+    """Content address of a parse: a hash of pipeline identity plus text"""
+    return cache_key(pipeline_name, text)
+
+
+def dumps_parsed_text(parsed_text: ParsedText) -> bytes:
+    return orjson.dumps([parsed_text.tokens, parsed_text.ents])
+
+
+def loads_parsed_text(data: bytes) -> ParsedText:
+    tokens, ents = orjson.loads(data)
+
+    return ParsedText(tokens=tuple(tokens), ents=tuple(map(tuple, ents)))
+
+
+class ParseCacheDataInterface(SqliteLRUCacheDataInterface[ParsedText]):
+    """Persistent cache of parsed texts backed by a single sqlite file, keyed
+    by a hash of pipeline name, version and text so that a changed pipeline
+    never reuses stale parses"""
+
+    NAME = "parse cache"
+    TABLE = "parse_cache"
+    VALUE_COLUMNS = (("parse", "BLOB"),)
+
+    def encode(self, value: ParsedText) -> Tuple[Any, ...]:
+        return (dumps_parsed_text(value),)
+
+    def decode(self, *columns: Any) -> ParsedText:
+        (parse,) = columns
+
+        return loads_parsed_text(parse)
+
+    def get_many(self, pipeline_name: str, text: List[str]) -> Dict[str, ParsedText]:
+        """Returns cached parses of texts found in the cache keyed by text"""
+        return self._get_many(namespace=pipeline_name, text=text)
+
+    def put_many(
+        self, pipeline_name: str, text_parsed: Iterable[Tuple[str, ParsedText]]
+    ) -> None:
+        """Writes parses back to the cache and evicts if it grows too large"""
+        self._put_many(namespace=pipeline_name, text_value=text_parsed)
@@ -0,0 +1,176 @@
+import hashlib
+import logging
+import sqlite3
+from pathlib import Path
+from typing import Any, Dict, Generic, Iterable, List, Optional, Tuple, TypeVar
+
+logger = logging.getLogger(__name__)
+
+# Keep the number of bound parameters per statement below sqlite's limit
+SQLITE_MAX_VARS = 500
+
+V = TypeVar("V")
+
+
+def cache_key(namespace: str, text: str) -> str:
+    """Content address of a cached value: a hash of the identity of whatever
+    derived it, such as a model, plus text"""
+    return hashlib.sha256(f"{namespace}\0{text}".encode("utf-8")).hexdigest()
+
+
+class SqliteLRUCacheDataInterface(Generic[V]):
+    """Persistent cache of values derived from texts backed by a single sqlite
+    file.
+
+    Values are keyed by a hash of a namespace and text so that entries of
+    different namespaces never collide. Each lookup refreshes the recency of
+    the entries it hits and the least recently used entries are evicted once
+    the cache holds more than max_entries values.
+
+    Subclasses name the table, its value columns with their sqlite types and
+    how a value is encoded into and decoded from those columns.
+    """
+
+    NAME: str = "cache"
+    TABLE: str = ""
+    VALUE_COLUMNS: Tuple[Tuple[str, str], ...] = ()
+
+    def __init__(self, filepath: Path, max_entries: int = 1_000_000) -> None:
+        if max_entries < 1:
+            raise ValueError("Maximum number of cache entries has to be positive")
+
+        self.filepath = filepath
+        self.max_entries = max_entries
+
+        self.n_hit = 0
+        self.n_miss = 0
+        self.n_evicted = 0
+
+        self._conn: Optional[sqlite3.Connection] = None
+        self._tick = 0
+
+    def encode(self, value: V) -> Tuple[Any, ...]:
+        """Values of the value columns, in order, holding a value"""
+        raise NotImplementedError
+
+    def decode(self, *columns: Any) -> V:
+        raise NotImplementedError
+
+    @property
+    def _value_column_names(self) -> List[str]:
+        return [name for name, _ in self.VALUE_COLUMNS]
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.filepath.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.filepath)
+            value_column_defs = "".join(
+                f"{name} {sqlite_type} NOT NULL, "
+                for name, sqlite_type in self.VALUE_COLUMNS
+            )
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.TABLE} ("
+                f"key TEXT PRIMARY KEY, {value_column_defs}"
+                "last_used INTEGER NOT NULL)"
+            )
+            self._conn.execute(
+                f"CREATE INDEX IF NOT EXISTS {self.TABLE}_last_used "
+                f"ON {self.TABLE} (last_used)"
+            )
+            (self._tick,) = self._conn.execute(
+                f"SELECT COALESCE(MAX(last_used), 0) FROM {self.TABLE}"
+            ).fetchone()
+
+            logger.info(
+                f"Opened the {self.NAME} at {self.filepath} holding {len(self)} "
+                "entries"
+            )
+
+        return self._conn
+
+    def _next_tick(self) -> int:
+        _ = self.conn  # Recency ticks resume from those persisted in the cache
+        self._tick += 1
+
+        return self._tick
+
+    def __len__(self) -> int:
+        (n,) = self.conn.execute(f"SELECT COUNT(*) FROM {self.TABLE}").fetchone()
+
+        return int(n)
+
+    def _get_many(self, namespace: str, text: List[str]) -> Dict[str, V]:
+        """Returns cached values of texts found in the cache keyed by text"""
+        key_to_text = {cache_key(namespace, a_text): a_text for a_text in text}
+        keys = list(key_to_text)
+        tick = self._next_tick()
+        columns = ", ".join(["key", *self._value_column_names])
+
+        found: Dict[str, V] = {}
+        with self.conn:
+            for start in range(0, len(keys), SQLITE_MAX_VARS):
+                chunk = keys[start : start + SQLITE_MAX_VARS]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self.conn.execute(
+                    f"SELECT {columns} FROM {self.TABLE} "
+                    f"WHERE key IN ({placeholders})",
+                    chunk,
+                ).fetchall()
+                for key, *values in rows:
+                    found[key_to_text[key]] = self.decode(*values)
+                self.conn.execute(
+                    f"UPDATE {self.TABLE} SET last_used = ? "
+                    f"WHERE key IN ({placeholders})",
+                    [tick, *chunk],
+                )
+
+        self.n_hit += len(found)
+        self.n_miss += len(key_to_text) - len(found)
+
+        return found
+
+    def _put_many(self, namespace: str, text_value: Iterable[Tuple[str, V]]) -> None:
+        """Writes values back to the cache and evicts if it grows too large"""
+        tick = self._next_tick()
+        rows = [
+            (cache_key(namespace, a_text), *self.encode(value), tick)
+            for a_text, value in text_value
+        ]
+        column_names = ["key", *self._value_column_names, "last_used"]
+
+        with self.conn:
+            self.conn.executemany(
+                f"INSERT OR REPLACE INTO {self.TABLE} ({', '.join(column_names)}) "
+                f"VALUES ({','.join('?' * len(column_names))})",
+                rows,
+            )
+        self._evict()
+
+    def _evict(self) -> None:
+        n_excess = len(self) - self.max_entries
+        if n_excess <= 0:
+            return
+
+        with self.conn:
+            self.conn.execute(
+                f"DELETE FROM {self.TABLE} WHERE key IN (SELECT key FROM "
+                f"{self.TABLE} ORDER BY last_used ASC LIMIT ?)",
+                (n_excess,),
+            )
+        self.n_evicted += n_excess
+
+    def log_stats(self) -> None:
+        n_lookup = self.n_hit + self.n_miss
+        hit_rate = self.n_hit / n_lookup if n_lookup > 0 else 0.0
+
+        logger.info(
+            f"The {self.NAME} at {self.filepath} had {self.n_hit} hits and "
+            f"{self.n_miss} misses (hit rate {hit_rate:.1%}), evicted "
+            f"{self.n_evicted} entries and now holds {len(self)} entries"
+        )
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
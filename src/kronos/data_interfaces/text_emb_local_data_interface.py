@@ -3,9 +3,11 @@
 import logging
 from enum import Enum
 from pathlib import Path
-from typing import Any, Dict, Tuple
+from typing import Any, Dict, Iterator, Optional, Tuple
 
 import numpy as np
+import orjson
+from pydantic import BaseModel
 
 logger = logging.getLogger(__name__)
 
@@ -15,24 +17,153 @@ class NPArrayName(str, Enum):
     emb = "emb"
 
 
+class EmbDType(str, Enum):
+    float64 = "float64"
+    float32 = "float32"
+    float16 = "float16"
+
+
+class EmbStoreFileName(str, Enum):
+    header = "header.json"
+    emb = "emb.npy"
+    text_offsets = "text_offsets.npy"
+    text_bytes = "text_bytes.bin"
+
+
+# Paths with this suffix are saved as a memory-mappable directory store
+EMB_STORE_SUFFIX = ".emb"
+
+
+class TextEmbHeader(BaseModel):
+    row_count: int
+    dim: int
+    dtype: EmbDType
+    model_name: Optional[str] = None
+
+
+def encode_text(text: np.ndarray) -> Tuple[np.ndarray, bytes]:
+    """Packs strings into utf-8 bytes and n + 1 offsets delimiting each string"""
+    encoded = [str(a_text).encode("utf-8") for a_text in text]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(a_bytes) for a_bytes in encoded], out=offsets[1:])
+
+    return offsets, b"".join(encoded)
+
+
+def decode_text(offsets: np.ndarray, text_bytes: np.ndarray) -> np.ndarray:
+    """Unpacks the strings delimited by consecutive offsets into a string array"""
+    start, end = int(offsets[0]), int(offsets[-1])
+    block = text_bytes[start:end].tobytes()
+    relative = (offsets - start).tolist()
+
+    return np.array(
+        [
+            block[relative[i] : relative[i + 1]].decode("utf-8")
+            for i in range(len(relative) - 1)
+        ],
+        dtype=str,
+    )
+
+
 class TextEmbLocalDataInterface:
+    """Saves and loads a text array alongside its embedding array.
+
+    Paths ending with .emb are directories holding a header, the embedding
+    matrix as a raw .npy file which is memory-mapped on load, and texts as
+    utf-8 bytes delimited by offsets. Other paths use a single .npz file.
+    """
+
     def __init__(self, filepath: Path) -> None:
         self.filepath = filepath
 
-    def save(self, text: np.ndarray, emb: np.ndarray) -> None:
-        kwargs: Dict[str, Any] = {
-            NPArrayName.text.value: text,
-            NPArrayName.emb.value: emb,
-        }
+    @property
+    def is_store(self) -> bool:
+        return self.filepath.suffix == EMB_STORE_SUFFIX
+
+    def save(
+        self,
+        text: np.ndarray,
+        emb: np.ndarray,
+        model_name: Optional[str] = None,
+        emb_dtype: Optional[EmbDType] = None,
+    ) -> None:
+        if emb_dtype is not None:
+            emb = emb.astype(emb_dtype.value, copy=False)
 
-        np.savez(self.filepath, **kwargs)
+        if self.is_store:
+            self._save_store(text=text, emb=emb, model_name=model_name)
+        else:
+            kwargs: Dict[str, Any] = {
+                NPArrayName.text.value: text,
+                NPArrayName.emb.value: emb,
+            }
+
+            np.savez(self.filepath, **kwargs)
 
         logger.info(
             f"Saved text array and embedding arrays shaped {emb.shape} to "
             f"{self.filepath}"
         )
 
+    def _save_store(
+        self, text: np.ndarray, emb: np.ndarray, model_name: Optional[str]
+    ) -> None:
+        if len(text) != len(emb):
+            raise ValueError(
+                f"Text array of length {len(text)} does not match embedding "
+                f"array of length {len(emb)}"
+            )
+
+        self.filepath.mkdir(parents=True, exist_ok=True)
+
+        if emb.ndim != 2:  # e.g. an empty array built from an empty list
+            emb = emb.reshape(len(emb), -1 if len(emb) > 0 else 0)
+        header = TextEmbHeader(
+            row_count=emb.shape[0],
+            dim=emb.shape[1],
+            dtype=EmbDType(str(emb.dtype)),
+            model_name=model_name,
+        )
+        offsets, text_bytes = encode_text(text)
+
+        np.save(self.filepath / EmbStoreFileName.emb.value, emb)
+        np.save(self.filepath / EmbStoreFileName.text_offsets.value, offsets)
+        with open(self.filepath / EmbStoreFileName.text_bytes.value, "wb") as f:
+            f.write(text_bytes)
+        # Header is written last so that a complete header implies complete data
+        with open(self.filepath / EmbStoreFileName.header.value, "wb") as f:
+            f.write(orjson.dumps(header.model_dump(mode="json")))
+
+    def load_header(self) -> TextEmbHeader:
+        with open(self.filepath / EmbStoreFileName.header.value, "rb") as f:
+            return TextEmbHeader(**orjson.loads(f.read()))
+
+    def _open_store(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        emb = np.load(self.filepath / EmbStoreFileName.emb.value, mmap_mode="r")
+        offsets = np.load(
+            self.filepath / EmbStoreFileName.text_offsets.value, mmap_mode="r"
+        )
+        path_text_bytes = self.filepath / EmbStoreFileName.text_bytes.value
+        if path_text_bytes.stat().st_size == 0:  # Empty files cannot be mapped
+            text_bytes = np.zeros(0, dtype=np.uint8)
+        else:
+            text_bytes = np.memmap(path_text_bytes, dtype=np.uint8, mode="r")
+
+        return emb, offsets, text_bytes
+
     def load(self) -> Tuple[np.ndarray, np.ndarray]:
+        if self.is_store:
+            header = self.load_header()
+            emb, offsets, text_bytes = self._open_store()
+            text = decode_text(offsets, text_bytes)
+
+            logger.info(
+                f"Opened a memory-mapped {header.dtype.value} embedding array "
+                f"shaped {emb.shape} from {self.filepath}"
+            )
+
+            return text, emb
+
         npzfile = np.load(self.filepath)
 
         text, emb = npzfile[NPArrayName.text.value], npzfile[NPArrayName.emb.value]
@@ -43,3 +174,21 @@ class TextEmbLocalDataInterface:
         )
 
         return text, emb
+
+    def iter_chunks(self, chunk_size: int) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """Yields consecutive row slices of texts and embeddings. Only the rows
+        of the current slice are paged in from a directory store"""
+        if chunk_size < 1:
+            raise ValueError("Chunk size has to be a positive integer")
+
+        if not self.is_store:
+            text, emb = self.load()
+            for start in range(0, len(text), chunk_size):
+                yield text[start : start + chunk_size], emb[start : start + chunk_size]
+
+            return
+
+        emb, offsets, text_bytes = self._open_store()
+        for start in range(0, emb.shape[0], chunk_size):
+            end = min(start + chunk_size, emb.shape[0])
+            yield decode_text(offsets[start : end + 1], text_bytes), emb[start:end]
@@ -1,18 +1,129 @@
+import bisect
+import hashlib
+import io
 import logging
 import os
+from dataclasses import dataclass
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 import gspread
 import numpy as np
+import orjson
 import pandas as pd
 from dotenv import load_dotenv
 from pandas import DataFrame
+from pydantic import BaseModel, PrivateAttr
 
-from kronos.nodes.utils_data_interfaces import generate_timestamp
+from kronos.nodes.utils_data_interfaces import (
+    atomic_write_bytes,
+    generate_timestamp,
+    normalise_sheet_cells,
+)
 
 logger = logging.getLogger(__name__)
 
+# Manifest of saved versions kept next to the version directories
+CATALOG_FILENAME = "catalog.json"
+
+
+def content_hash(content: bytes) -> str:
+    return hashlib.blake2b(content, digest_size=16).hexdigest()
+
+
+@dataclass
+class SparseSheet:
+    """Non null cells of a sheet in coordinate format, sorted in row-major
+    order so that the position of a cell is its node id in a layout graph"""
+
+    i_row: np.ndarray
+    i_col: np.ndarray
+    value: np.ndarray
+    # Number of rows and columns of the dense sheet, including null padding
+    shape: Tuple[int, int]
+
+    @property
+    def n_cell(self) -> int:
+        return len(self.i_row)
+
+    @classmethod
+    def from_df(cls, df: DataFrame) -> "SparseSheet":
+        i_row, i_col = np.nonzero(df.notna().to_numpy())
+
+        return cls(
+            i_row=i_row.astype(np.int64),
+            i_col=i_col.astype(np.int64),
+            value=df.to_numpy(dtype=object)[i_row, i_col],
+            shape=(df.shape[0], df.shape[1]),
+        )
+
+    def to_df(self) -> DataFrame:
+        values = np.full(self.shape, np.nan, dtype=object)
+        values[self.i_row, self.i_col] = self.value
+
+        return DataFrame(values)
+
+
+class TimeTableVersion(BaseModel):
+    version: str
+    content_hash: str
+    n_row: int
+    n_col: int
+    saved_at: datetime
+
+
+class VersionCatalog(BaseModel):
+    """Saved versions ordered by version, which sorts chronologically for
+    generated timestamps, with lookups that avoid scanning version directories
+    """
+
+    entries: List[TimeTableVersion] = []
+
+    _version_to_entry: Dict[str, TimeTableVersion] = PrivateAttr(default_factory=dict)
+    _hash_to_entry: Dict[str, TimeTableVersion] = PrivateAttr(default_factory=dict)
+
+    def model_post_init(self, __context: Any) -> None:
+        self.entries.sort(key=lambda entry: entry.version)
+        for entry in self.entries:
+            self._index(entry)
+
+    def _index(self, entry: TimeTableVersion) -> None:
+        self._version_to_entry[entry.version] = entry
+        # The earliest version holding some content is kept for its hash
+        self._hash_to_entry.setdefault(entry.content_hash, entry)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def add(self, entry: TimeTableVersion) -> None:
+        if entry.version in self._version_to_entry:
+            self.entries.remove(self._version_to_entry[entry.version])
+            self._hash_to_entry = {}
+            for other in self.entries:
+                self._hash_to_entry.setdefault(other.content_hash, other)
+
+        bisect.insort(self.entries, entry, key=lambda other: other.version)
+        self._index(entry)
+
+    def latest(self) -> Optional[TimeTableVersion]:
+        return self.entries[-1] if len(self.entries) > 0 else None
+
+    def by_version(self, version: str) -> Optional[TimeTableVersion]:
+        return self._version_to_entry.get(version)
+
+    def by_hash(self, a_content_hash: str) -> Optional[TimeTableVersion]:
+        return self._hash_to_entry.get(a_content_hash)
+
+    def as_of(self, timestamp: str) -> Optional[TimeTableVersion]:
+        """Most recent version saved no later than a timestamp in the version
+        format, found by bisection"""
+        i = bisect.bisect_right(
+            self.entries, timestamp, key=lambda entry: entry.version
+        )
+
+        return self.entries[i - 1] if i > 0 else None
+
 
 class TimeTableDFDataInterface:
     ENV_KEY: str = "NewTimeTable2024Key"
@@ -40,19 +151,9 @@ class TimeTableDFDataInterface:
 
         # Parse as a dataframe with untidy data
         timetable_df = pd.DataFrame(sheet_values)
-        # Empty strings should be interpreted as nulls
-        timetable_df.replace("", np.nan, inplace=True)
-
-        # Year numbers should be interpreted as integers
-        def convert_to_str(val: Any) -> Any:
-            try:
-                # Attempt to convert to float first, then to int and to string
-                return str(int(float(val)))
-            except (ValueError, TypeError):
-                # Return the value as-is if it can't be converted
-                return val
-
-        timetable_df = timetable_df.map(convert_to_str)
+        # Empty strings should be interpreted as nulls and year numbers should
+        # be interpreted as integers
+        timetable_df = normalise_sheet_cells(timetable_df)
 
         logger.info(
             "Dataframe parsed from google sheet values has shape "
@@ -61,29 +162,150 @@ class TimeTableDFDataInterface:
 
         return timetable_df
 
-    def save(self, timetable_df: DataFrame) -> None:
+    @property
+    def path_catalog(self) -> Path:
+        return self.filepath / CATALOG_FILENAME
+
+    def _version_path(self, version: str) -> Path:
+        return self.filepath / version / self.filepath.name
+
+    def _scan_versions(self) -> List[str]:
+        """Versions saved under the directory sorted by name, which sorts
+        chronologically for generated timestamps, found without reading them"""
+        if not self.filepath.is_dir():
+            return []
+
+        return sorted(
+            name
+            for name in os.listdir(self.filepath)
+            if self._version_path(name).is_file()
+        )
+
+    def rebuild_catalog(self) -> VersionCatalog:
+        """Indexes versions saved before the catalog existed by reading and
+        hashing every one of them, so it is only called on save, which then
+        persists the catalog"""
+        catalog = VersionCatalog()
+        for version in self._scan_versions():
+            path_version = self._version_path(version)
+            content = path_version.read_bytes()
+            shape = pd.read_csv(
+                io.BytesIO(content), index_col=False, header=None, dtype=str
+            ).shape
+            catalog.add(
+                TimeTableVersion(
+                    version=version,
+                    content_hash=content_hash(content),
+                    n_row=shape[0],
+                    n_col=shape[1],
+                    saved_at=datetime.fromtimestamp(
+                        path_version.stat().st_mtime, tz=timezone.utc
+                    ),
+                )
+            )
+
+        logger.info(
+            f"Rebuilt a version catalog of {len(catalog)} versions from "
+            f"{self.filepath}"
+        )
+
+        return catalog
+
+    def load_catalog(self) -> VersionCatalog:
+        """Loads the catalog, rebuilding it in memory if versions were saved
+        before it existed. Reading versions does not need the catalog"""
+        if not self.path_catalog.is_file():
+            return self.rebuild_catalog()
+
+        with open(self.path_catalog, "rb") as f:
+            return VersionCatalog(**orjson.loads(f.read()))
+
+    def _save_catalog(self, catalog: VersionCatalog) -> None:
+        atomic_write_bytes(
+            path=self.path_catalog,
+            content=orjson.dumps(catalog.model_dump(mode="json")),
+        )
+
+    @staticmethod
+    def serialise(timetable_df: DataFrame) -> bytes:
+        # Timetable sheet does not have meaningful index or header
+        return timetable_df.to_csv(index=False, header=False).encode("utf-8")
+
+    @classmethod
+    def fingerprint(cls, timetable_df: DataFrame) -> str:
+        """Hash of the content a dataframe is saved as, which is comparable to
+        the content hashes of saved versions in the catalog"""
+        return content_hash(cls.serialise(timetable_df))
+
+    def save(self, timetable_df: DataFrame) -> str:
+        """Saves a new version unless no version is pinned and the content is
+        identical to that of the latest version. Returns the version holding
+        the content"""
+        content = self.serialise(timetable_df)
+        a_content_hash = content_hash(content)
+
+        is_catalog_rebuilt = not self.path_catalog.is_file()
+        catalog = self.load_catalog()
+        latest = catalog.latest()
+        if (
+            self.version is None
+            and latest is not None
+            and latest.content_hash == a_content_hash
+        ):
+            if is_catalog_rebuilt:
+                self._save_catalog(catalog)
+            logger.info(
+                f"Skipped saving a snapshot identical to the latest version "
+                f"{latest.version} in {self.filepath}"
+            )
+            return latest.version
+
         # Resolve save versioned path
-        if self.version is None:
-            filepath = self.filepath / generate_timestamp() / self.filepath.name
-        else:
-            filepath = self.filepath / self.version / self.filepath.name
+        version = generate_timestamp() if self.version is None else self.version
+        filepath = self._version_path(version)
 
         # Create directory tree if not exist
         if not filepath.exists():
             filepath.parent.mkdir(parents=True, exist_ok=True)
             logger.info(f"Creating {filepath.parent} because it does not yet exist")
 
-        with open(filepath, "w") as f:
-            # Timetable sheet does not have meaningful index or header
-            timetable_df.to_csv(f, index=False, header=False)
+        with open(filepath, "wb") as f:
+            f.write(content)
 
             logger.info(f"Saved a {type(timetable_df)} object to {self.filepath}")
 
-    def load(self) -> DataFrame:
+        catalog.add(
+            TimeTableVersion(
+                version=version,
+                content_hash=a_content_hash,
+                n_row=timetable_df.shape[0],
+                n_col=timetable_df.shape[1],
+                saved_at=datetime.now(tz=timezone.utc),
+            )
+        )
+        self._save_catalog(catalog)
+
+        return version
+
+    def versions(self) -> List[str]:
+        """Saved versions from the oldest to the most recent"""
+        if not self.path_catalog.is_file():
+            return self._scan_versions()
+
+        return [entry.version for entry in self.load_catalog().entries]
+
+    def _load_path(self) -> Path:
         # Resolve load version path
         if self.version is None:
-            filepaths = sorted(list(self.filepath.iterdir()), reverse=True)
-            filepath = filepaths[0] / self.filepath.name
+            versions = self.versions()
+            if len(versions) == 0:
+                raise FileNotFoundError(f"No version is saved in {self.filepath}")
+            return self._version_path(versions[-1])
+
+        return self._version_path(self.version)
+
+    def load(self) -> DataFrame:
+        filepath = self._load_path()
 
         with open(filepath, "r") as f:
             # Empty strings should be interpreted as empty strings
@@ -93,3 +315,38 @@ class TimeTableDFDataInterface:
             logger.info(f"Loaded a {type(timetable_df)} object from {self.filepath}")
 
             return timetable_df
+
+    def load_sparse(self, chunk_size: int = 10_000) -> SparseSheet:
+        """Loads only the non null cells, reading chunks of rows so that the
+        dense null padding of at most one chunk is held at any time"""
+        filepath = self._load_path()
+
+        i_row: List[np.ndarray] = []
+        i_col: List[np.ndarray] = []
+        value: List[np.ndarray] = []
+        n_row, n_col = 0, 0
+        with open(filepath, "r") as f:
+            # Nulls are parsed exactly as by load
+            for chunk in pd.read_csv(
+                f, index_col=False, header=None, dtype=str, chunksize=chunk_size
+            ):
+                i_row_chunk, i_col_chunk = np.nonzero(chunk.notna().to_numpy())
+                i_row.append(i_row_chunk + n_row)
+                i_col.append(i_col_chunk)
+                value.append(chunk.to_numpy(dtype=object)[i_row_chunk, i_col_chunk])
+                n_row += chunk.shape[0]
+                n_col = max(n_col, chunk.shape[1])
+
+        sparse_sheet = SparseSheet(
+            i_row=np.concatenate(i_row).astype(np.int64),
+            i_col=np.concatenate(i_col).astype(np.int64),
+            value=np.concatenate(value),
+            shape=(n_row, n_col),
+        )
+
+        logger.info(
+            f"Loaded {sparse_sheet.n_cell} non null cells of a timetable of shape "
+            f"{sparse_sheet.shape} from {self.filepath}"
+        )
+
+        return sparse_sheet
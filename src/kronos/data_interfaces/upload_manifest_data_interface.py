@@ -0,0 +1,44 @@
+import io
+import logging
+from pathlib import Path
+from typing import Iterable, Optional, Set
+
+import numpy as np
+
+from kronos.nodes.utils_data_interfaces import atomic_write_bytes
+
+logger = logging.getLogger(__name__)
+
+# Object ids are canonical uuid strings
+UUID_DTYPE = "S36"
+
+
+class UploadManifestDataInterface:
+    """Ids of the objects last uploaded to a collection, kept next to the
+    embeddings they were uploaded from, so that stale objects are found by
+    diffing ids locally instead of listing the collection"""
+
+    def __init__(self, filepath: Path) -> None:
+        self.filepath = filepath
+
+    def save(self, uuids: Iterable[str]) -> None:
+        array = np.array(sorted(uuids), dtype=UUID_DTYPE)
+        buffer = io.BytesIO()
+        np.save(buffer, array, allow_pickle=False)
+        atomic_write_bytes(path=self.filepath, content=buffer.getvalue())
+
+        logger.info(f"Saved an upload manifest of {len(array)} ids to {self.filepath}")
+
+    def load(self) -> Optional[Set[str]]:
+        """Returns None if nothing has been uploaded with a manifest yet"""
+        if not self.filepath.is_file():
+            return None
+
+        array = np.load(self.filepath, allow_pickle=False)
+        uuids = {a_uuid.decode("ascii") for a_uuid in array.tolist()}
+
+        logger.info(
+            f"Loaded an upload manifest of {len(uuids)} ids from {self.filepath}"
+        )
+
+        return uuids
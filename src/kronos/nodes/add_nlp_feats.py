@@ -1,294 +1,382 @@
 import logging
-from typing import List, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
 
+import numpy as np
+import pandas as pd
 from pandas import DataFrame
 from spacy.language import Language
+from spacy.tokens import Doc
 
 from kronos.data_interfaces.edge_dfs_data_interface import (
+    EdgeAttrKey,
     EdgeDF,
     EdgeDFs,
     EdgeType,
-    EntToCellTuple,
-    EntToLabelTuple,
-    TokenToCellTuple,
-    TokenToEntTuple,
 )
 from kronos.data_interfaces.node_dfs_data_interface import (
-    EntLabelTuple,
-    EntTuple,
     NodeAttrKey,
     NodeDF,
     NodeDFs,
     NodeType,
-    TokenTuple,
 )
+from kronos.data_interfaces.parse_cache_data_interface import (
+    ParseCacheDataInterface,
+    ParsedText,
+)
+from kronos.nodes.utils_columnar import (
+    EdgeDFBuilder,
+    edge_df_from_arrays,
+    int32_array,
+    node_df_from_texts,
+)
+from kronos.nodes.utils_interning import InternTable
 
 logger = logging.getLogger(__name__)
 
+# Number of texts spacy buffers per batch
+DEFAULT_BATCH_SIZE = 2000
 
-def assemble_nlp_ntuples_etuples(
-    token_text: List[str],
-    ent_text: List[str],
-    ent_label_text: List[str],
-    i_token_to_cell: List[Tuple[int, int]],
-    i_token_to_ent: List[Tuple[int, int]],
-    i_ent_to_cell: List[Tuple[int, int]],
-    i_ent_to_label: List[Tuple[int, int]],
-    i_token_in_doc: List[int],
-    i_token_in_ent: List[int],
-    i_ent_in_doc: List[int],
-) -> Tuple[
-    List[TokenTuple],
-    List[EntTuple],
-    List[EntLabelTuple],
-    List[TokenToCellTuple],
-    List[TokenToEntTuple],
-    List[EntToCellTuple],
-    List[EntToLabelTuple],
-]:
-    logger.info("Assembling node tuples and edge tuples based on derived nlp features")
-
-    # Assemble node tuples
-    token = []
-    for i, text in enumerate(token_text):
-        t_tuple = TokenTuple(nid=i, ntype=NodeType.token.value, text=text)
-        token.append(t_tuple)
-
-    ent = []
-    for i, text in enumerate(ent_text):
-        e_tuple = EntTuple(nid=i, ntype=NodeType.ent.value, text=text)
-        ent.append(e_tuple)
-
-    ent_label = []
-    for i, text in enumerate(ent_label_text):
-        el_tuple = EntLabelTuple(nid=i, ntype=NodeType.ent_label.value, text=text)
-        ent_label.append(el_tuple)
-
-    # Assemble edge tuples
-    token_to_cell = []
-    for ttc, tid in zip(i_token_to_cell, i_token_in_doc):
-        src_nid, dst_nid = ttc
-        src_ntype, etype, dst_ntype = (
-            NodeType.token.value,
-            EdgeType.token_to_cell.value,
-            NodeType.sheet_cell.value,
-        )
-        ttc_tuple = TokenToCellTuple(
-            src_nid=src_nid,
-            dst_nid=dst_nid,
-            src_ntype=src_ntype,
-            etype=etype,
-            dst_ntype=dst_ntype,
-            i_token_in_doc=tid,
-        )
-        token_to_cell.append(ttc_tuple)
-
-    token_to_ent = []
-    for tte, tie in zip(i_token_to_ent, i_token_in_ent):
-        src_nid, dst_nid = tte
-        src_ntype, etype, dst_ntype = (
-            NodeType.token.value,
-            EdgeType.token_to_ent.value,
-            NodeType.ent.value,
-        )
-        tte_tuple = TokenToEntTuple(
-            src_nid=src_nid,
-            dst_nid=dst_nid,
-            src_ntype=src_ntype,
-            etype=etype,
-            dst_ntype=dst_ntype,
-            i_token_in_ent=tie,
-        )
-        token_to_ent.append(tte_tuple)
-
-    ent_to_cell = []
-    for etc, eid in zip(i_ent_to_cell, i_ent_in_doc):
-        src_nid, dst_nid = etc
-        src_ntype, etype, dst_ntype = (
-            NodeType.ent.value,
-            EdgeType.ent_to_cell.value,
-            NodeType.sheet_cell.value,
-        )
-        etc_tuple = EntToCellTuple(
-            src_nid=src_nid,
-            dst_nid=dst_nid,
-            src_ntype=src_ntype,
-            etype=etype,
-            dst_ntype=dst_ntype,
-            i_ent_in_doc=eid,
-        )
-        ent_to_cell.append(etc_tuple)
-
-    ent_to_label = []
-    for etl in i_ent_to_label:
-        src_nid, dst_nid = etl
-        src_ntype, etype, dst_ntype = (
-            NodeType.ent.value,
-            EdgeType.ent_to_label.value,
-            NodeType.ent_label.value,
-        )
-        etl_tuple = EntToLabelTuple(
-            src_nid=src_nid,
-            dst_nid=dst_nid,
-            src_ntype=src_ntype,
-            etype=etype,
-            dst_ntype=dst_ntype,
-        )
-        ent_to_label.append(etl_tuple)
+
+def _token_to_cell_builder() -> EdgeDFBuilder:
+    return EdgeDFBuilder(
+        etype=EdgeType.token_to_cell,
+        src_ntype=NodeType.token,
+        dst_ntype=NodeType.sheet_cell,
+        attr_keys=(EdgeAttrKey.i_token_in_doc,),
+    )
+
+
+def _token_to_ent_builder() -> EdgeDFBuilder:
+    return EdgeDFBuilder(
+        etype=EdgeType.token_to_ent,
+        src_ntype=NodeType.token,
+        dst_ntype=NodeType.ent,
+        attr_keys=(EdgeAttrKey.i_token_in_ent,),
+    )
+
+
+def _ent_to_cell_builder() -> EdgeDFBuilder:
+    return EdgeDFBuilder(
+        etype=EdgeType.ent_to_cell,
+        src_ntype=NodeType.ent,
+        dst_ntype=NodeType.sheet_cell,
+        attr_keys=(EdgeAttrKey.i_ent_in_doc,),
+    )
+
+
+def _ent_to_label_builder() -> EdgeDFBuilder:
+    return EdgeDFBuilder(
+        etype=EdgeType.ent_to_label,
+        src_ntype=NodeType.ent,
+        dst_ntype=NodeType.ent_label,
+    )
+
+
+@dataclass
+class NLPFeats:
+    # Entities
+    token: InternTable = field(default_factory=InternTable)
+    ent: InternTable = field(default_factory=InternTable)
+    ent_label: InternTable = field(default_factory=InternTable)
+
+    # Relations between entities and their attributes
+    token_to_cell: EdgeDFBuilder = field(default_factory=_token_to_cell_builder)
+    token_to_ent: EdgeDFBuilder = field(default_factory=_token_to_ent_builder)
+    ent_to_cell: EdgeDFBuilder = field(default_factory=_ent_to_cell_builder)
+    ent_to_label: EdgeDFBuilder = field(default_factory=_ent_to_label_builder)
+
+
+def spacy_pipeline_name(spacy_pipeline: Language) -> str:
+    """Identity of a spacy pipeline by its name, version and enabled components,
+    e.g. en_core_web_lg-3.7.1[tok2vec,ner]"""
+    meta = spacy_pipeline.meta
 
     return (
-        token,
-        ent,
-        ent_label,
-        token_to_cell,
-        token_to_ent,
-        ent_to_cell,
-        ent_to_label,
+        f"{meta.get('lang', '')}_{meta.get('name', '')}-{meta.get('version', '')}"
+        f"[{','.join(spacy_pipeline.pipe_names)}]"
     )
 
 
-def prep_nlp_ntuples_etuples_input(
-    df: DataFrame, spacy_pipeline: Language
-) -> Tuple[  # TODO: Turn the returned object into a named tuple for readability
-    List[str],
-    List[str],
-    List[str],
-    List[Tuple[int, int]],
-    List[Tuple[int, int]],
-    List[Tuple[int, int]],
-    List[Tuple[int, int]],
-    List[int],
-    List[int],
-    List[int],
-]:
-    # Assume the input node dataframe has a text attribute
-    cell = df[NodeAttrKey.text.value].tolist()
+def parse_doc(doc: Doc) -> ParsedText:
+    return ParsedText(
+        tokens=tuple(t.text for t in doc),
+        ents=tuple((e.text, e.label_, e.start, e.end) for e in doc.ents),
+    )
 
-    logger.info(f"{len(cell)} layout graph nodes are to be processed for nlp features")
 
-    # Node ids are assumed to be identical to 0-indexed integer index
-    if df[NodeAttrKey.nid.value].tolist() != list(range(df.shape[0])):
-        raise ValueError(
-            f"{NodeAttrKey.nid.value} field is not a consecutive "
-            "sequence of 0-indexed integers"
-        )
+def shard_bounds(n_cell: int, n_shard: int) -> List[Tuple[int, int]]:
+    """Splits positions into at most n_shard contiguous near equal ranges"""
+    bounds = np.linspace(0, n_cell, max(1, min(n_shard, n_cell)) + 1).astype(int)
+
+    return list(zip(bounds[:-1].tolist(), bounds[1:].tolist()))
+
+
+# Spacy pipeline of a worker process, set once by the pool initializer so that
+# it is not sent along with every shard
+_worker_spacy_pipeline: Optional[Language] = None
 
-    # Initialise iterables to keep track of entities
-    token: List[str] = []
-    ent: List[str] = []
-    ent_label: List[str] = []
 
-    # Initialise iterables to keep track of relations between entities
-    i_token_to_cell: List[Tuple[int, int]] = []
-    i_token_to_ent: List[Tuple[int, int]] = []
-    i_ent_to_cell: List[Tuple[int, int]] = []
-    i_ent_to_label: List[Tuple[int, int]] = []
+def _init_worker(spacy_pipeline: Language) -> None:
+    global _worker_spacy_pipeline
+    _worker_spacy_pipeline = spacy_pipeline
 
-    # Initialise iterables to keep track of relation attributes
-    i_token_in_doc: List[int] = []
-    i_token_in_ent: List[int] = []
-    i_ent_in_doc: List[int] = []
 
-    # Use a small number of processes and a large batch size
-    # to reduce overhead and to improve platform compatibility
-    for doc in spacy_pipeline.pipe(texts=cell, n_process=2, batch_size=2000):
-        for t in doc:
-            # Collect token as a class of entities
-            if t.text not in token:
-                token.append(t.text)
+def parse_texts_shard(
+    text: List[str],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    spacy_pipeline: Optional[Language] = None,
+) -> List[ParsedText]:
+    """Parses a shard of texts into plain tuples, which are cheap to send back
+    from a worker process unlike spacy docs"""
+    spacy_pipeline = spacy_pipeline or _worker_spacy_pipeline
+    if spacy_pipeline is None:
+        raise ValueError("No spacy pipeline is given nor set for the worker")
 
-            # Collect token to cell as a class of relations
-            i_token_to_cell.append((token.index(t.text), cell.index(doc.text)))
+    return [
+        parse_doc(doc) for doc in spacy_pipeline.pipe(texts=text, batch_size=batch_size)
+    ]
 
-            # Collect token to cell attributes
-            i_token_in_doc.append(t.i)
 
-        for i_e_i_d, e in enumerate(doc.ents):
-            # Collect ner entity as a class of entities
-            if e.text not in ent:
-                ent.append(e.text)
+def parse_texts(
+    text: List[str],
+    spacy_pipeline: Language,
+    n_process: int = 1,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> List[ParsedText]:
+    """Parses texts in order, splitting them into contiguous shards parsed by a
+    pool of worker processes if more than one process is requested"""
+    if n_process <= 1 or len(text) == 0:
+        return parse_texts_shard(
+            text=text, batch_size=batch_size, spacy_pipeline=spacy_pipeline
+        )
 
-            # Collect ner label as a class of entities
-            if e.label_ not in ent_label:
-                ent_label.append(e.label_)
+    bounds = shard_bounds(n_cell=len(text), n_shard=n_process)
 
-            for et in e:
-                # Collect token to ner entity as a class of relations
-                i_token_to_ent.append((token.index(et.text), ent.index(e.text)))
+    logger.info(
+        f"Parsing {len(text)} texts in {len(bounds)} shards across "
+        f"{n_process} processes"
+    )
 
-                # Collect token to ner entity attributes
-                i_token_in_ent.append(et.i)
+    with ProcessPoolExecutor(
+        max_workers=n_process, initializer=_init_worker, initargs=(spacy_pipeline,)
+    ) as executor:
+        list_parsed_text = executor.map(
+            parse_texts_shard,
+            [text[start:end] for start, end in bounds],
+            [batch_size] * len(bounds),
+        )
 
-            # Collect ner entity to cell as a class of relations
-            i_ent_to_cell.append((ent.index(e.text), cell.index(doc.text)))
+        return [parsed_text for shard in list_parsed_text for parsed_text in shard]
+
+
+def parse_distinct_texts(
+    text: List[str],
+    spacy_pipeline: Language,
+    parse_cache: Optional[ParseCacheDataInterface] = None,
+    n_process: int = 1,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> List[ParsedText]:
+    """Parses distinct texts, looking them up in a parse cache first if given
+    and writing newly parsed texts back to it"""
+    if parse_cache is None:
+        return parse_texts(
+            text=text,
+            spacy_pipeline=spacy_pipeline,
+            n_process=n_process,
+            batch_size=batch_size,
+        )
 
-            # Collect ner entity to cell attributes
-            i_ent_in_doc.append(i_e_i_d)
+    pipeline_name = spacy_pipeline_name(spacy_pipeline)
+    text_to_parsed = parse_cache.get_many(pipeline_name=pipeline_name, text=text)
+    text_to_parse = [a_text for a_text in text if a_text not in text_to_parsed]
 
-            # Collect ner entity to ner label as a class of relations
-            i_ent_to_label.append((ent.index(e.text), ent_label.index(e.label_)))
+    logger.info(
+        f"{len(text_to_parsed)} distinct cell texts have cached parses of "
+        f"{pipeline_name} and {len(text_to_parse)} are to be parsed"
+    )
 
-    return (
-        token,
-        ent,
-        ent_label,
-        i_token_to_cell,
-        i_token_to_ent,
-        i_ent_to_cell,
-        i_ent_to_label,
-        i_token_in_doc,
-        i_token_in_ent,
-        i_ent_in_doc,
+    newly_parsed = parse_texts(
+        text=text_to_parse,
+        spacy_pipeline=spacy_pipeline,
+        n_process=n_process,
+        batch_size=batch_size,
+    )
+    parse_cache.put_many(
+        pipeline_name=pipeline_name, text_parsed=zip(text_to_parse, newly_parsed)
+    )
+    text_to_parsed.update(zip(text_to_parse, newly_parsed))
+
+    return [text_to_parsed[a_text] for a_text in text]
+
+
+def add_parsed_text_feats(
+    nlp_feats: NLPFeats, parsed_text: ParsedText, i_cell: int
+) -> None:
+    token, ent, ent_label = nlp_feats.token, nlp_feats.ent, nlp_feats.ent_label
+
+    i_tokens = [token.intern(t) for t in parsed_text.tokens]
+    for i_t_i_d, i_token in enumerate(i_tokens):
+        # Collect token as a class of entities and token to cell as a class
+        # of relations with the position of the token in the cell
+        nlp_feats.token_to_cell.append(i_token, i_cell, i_t_i_d)
+
+    for i_e_i_d, (e_text, e_label, start, end) in enumerate(parsed_text.ents):
+        # Collect ner entity and ner label as classes of entities
+        i_ent = ent.intern(e_text)
+        i_ent_label = ent_label.intern(e_label)
+
+        for i_t_i_d in range(start, end):
+            # Collect token to ner entity as a class of relations
+            nlp_feats.token_to_ent.append(i_tokens[i_t_i_d], i_ent, i_t_i_d)
+
+        # Collect ner entity to cell as a class of relations
+        nlp_feats.ent_to_cell.append(i_ent, i_cell, i_e_i_d)
+
+        # Collect ner entity to ner label as a class of relations
+        nlp_feats.ent_to_label.append(i_ent, i_ent_label)
+
+
+def fan_out_edges(
+    builder: EdgeDFBuilder,
+    counts: np.ndarray,
+    inverse: np.ndarray,
+    dst_is_cell: bool,
+) -> EdgeDF:
+    """Repeats the edges of every distinct text for every cell holding it
+
+    Edges of distinct texts are grouped by text in order with counts[u] edges
+    of text u, and inverse maps each cell to its distinct text"""
+    n_per_cell = counts[inverse]
+    cell_of_edge = np.repeat(np.arange(len(inverse), dtype=np.int32), n_per_cell)
+    text_starts = np.cumsum(counts) - counts
+    cell_starts = np.cumsum(n_per_cell) - n_per_cell
+    edge_idx = (
+        text_starts[inverse][cell_of_edge]
+        + np.arange(len(cell_of_edge))
+        - cell_starts[cell_of_edge]
     )
 
+    return edge_df_from_arrays(
+        etype=builder.etype,
+        src_ntype=builder.src_ntype,
+        dst_ntype=builder.dst_ntype,
+        src_nid=int32_array(builder.src_nid)[edge_idx],
+        dst_nid=(
+            cell_of_edge if dst_is_cell else int32_array(builder.dst_nid)[edge_idx]
+        ),
+        attrs={
+            attr_key: int32_array(attr_array)[edge_idx]
+            for attr_key, attr_array in builder.attrs.items()
+        },
+    )
+
+
+def fan_out_nlp_feats(
+    nlp_feats: NLPFeats, parsed_texts: List[ParsedText], inverse: np.ndarray
+) -> List[EdgeDF]:
+    """Expands nlp relations derived once per distinct text to every cell"""
+    n_token = np.array([len(p.tokens) for p in parsed_texts], dtype=np.int64)
+    n_ent = np.array([len(p.ents) for p in parsed_texts], dtype=np.int64)
+    n_ent_token = np.array(
+        [sum(end - start for _, _, start, end in p.ents) for p in parsed_texts],
+        dtype=np.int64,
+    )
+
+    return [
+        fan_out_edges(nlp_feats.token_to_cell, n_token, inverse, dst_is_cell=True),
+        fan_out_edges(nlp_feats.token_to_ent, n_ent_token, inverse, dst_is_cell=False),
+        fan_out_edges(nlp_feats.ent_to_cell, n_ent, inverse, dst_is_cell=True),
+        fan_out_edges(nlp_feats.ent_to_label, n_ent, inverse, dst_is_cell=False),
+    ]
 
-def assemble_nlp_ndfs_edfs(
-    token: List[TokenTuple],
-    ent: List[EntTuple],
-    ent_label: List[EntLabelTuple],
-    token_to_cell: List[TokenToCellTuple],
-    token_to_ent: List[TokenToEntTuple],
-    ent_to_cell: List[EntToCellTuple],
-    ent_to_label: List[EntToLabelTuple],
+
+def prep_nlp_feats(
+    df: DataFrame,
+    spacy_pipeline: Language,
+    parse_cache: Optional[ParseCacheDataInterface] = None,
+    n_process: int = 1,
+    batch_size: int = DEFAULT_BATCH_SIZE,
 ) -> Tuple[List[NodeDF], List[EdgeDF]]:
+    """Derives token, entity and entity label node dataframes and their edge
+    dataframes to cells, parsing and deriving features once per distinct text"""
+    # Assume the input node dataframe has a text attribute
+    cell = df[NodeAttrKey.text.value].tolist()
+
+    logger.info(f"{len(cell)} layout graph nodes are to be processed for nlp features")
+
+    # Node ids are assumed to be identical to 0-indexed integer index
+    if df[NodeAttrKey.nid.value].tolist() != list(range(df.shape[0])):
+        raise ValueError(
+            f"{NodeAttrKey.nid.value} field is not a consecutive "
+            "sequence of 0-indexed integers"
+        )
+
+    # Distinct texts in order of first appearance, so that tokens and entities
+    # are interned in the same order as in a pass over every cell
+    inverse, uniques = pd.factorize(pd.Series(cell, dtype=object), sort=False)
+    unique_text: List[str] = uniques.tolist()
+
     logger.info(
-        "Assembling node and edge dataframes based on " "parsed node and edge tuples"
+        f"{len(cell)} cells hold {len(unique_text)} distinct texts, a duplication "
+        f"factor of {len(cell) / max(len(unique_text), 1):.1f}"
     )
 
-    token_node_df = NodeDF(ntype=NodeType.token, df=DataFrame(token))
-    ent_node_df = NodeDF(ntype=NodeType.ent, df=DataFrame(ent))
-    ent_label_node_df = NodeDF(ntype=NodeType.ent_label, df=DataFrame(ent_label))
-
-    token_to_cell_edge_df = EdgeDF(
-        etype=EdgeType.token_to_cell, df=DataFrame(token_to_cell)
+    parsed_texts = parse_distinct_texts(
+        text=unique_text,
+        spacy_pipeline=spacy_pipeline,
+        parse_cache=parse_cache,
+        n_process=n_process,
+        batch_size=batch_size,
     )
-    token_to_ent_edge_df = EdgeDF(
-        etype=EdgeType.token_to_ent, df=DataFrame(token_to_ent)
+
+    # Derive features once per distinct text, treating it as a cell
+    nlp_feats = NLPFeats()
+    for i_text, parsed_text in enumerate(parsed_texts):
+        add_parsed_text_feats(
+            nlp_feats=nlp_feats, parsed_text=parsed_text, i_cell=i_text
+        )
+
+    logger.info(
+        "Assembling node and edge dataframes based on derived nlp features in "
+        "columnar form"
     )
-    ent_to_cell_edge_df = EdgeDF(etype=EdgeType.ent_to_cell, df=DataFrame(ent_to_cell))
-    ent_to_label_edge_df = EdgeDF(
-        etype=EdgeType.ent_to_label, df=DataFrame(ent_to_label)
+
+    list_nlp_node_df = assemble_nlp_ndfs(nlp_feats=nlp_feats)
+    # Edge dataframes are gathered from the per text edges directly
+    list_nlp_edge_df = fan_out_nlp_feats(
+        nlp_feats=nlp_feats, parsed_texts=parsed_texts, inverse=inverse
     )
 
-    return (
-        [token_node_df, ent_node_df, ent_label_node_df],
-        [
-            token_to_cell_edge_df,
-            token_to_ent_edge_df,
-            ent_to_cell_edge_df,
-            ent_to_label_edge_df,
-        ],
+    return list_nlp_node_df, list_nlp_edge_df
+
+
+def assemble_nlp_ndfs(nlp_feats: NLPFeats) -> List[NodeDF]:
+    token_node_df = node_df_from_texts(NodeType.token, nlp_feats.token.to_list())
+    ent_node_df = node_df_from_texts(NodeType.ent, nlp_feats.ent.to_list())
+    ent_label_node_df = node_df_from_texts(
+        NodeType.ent_label, nlp_feats.ent_label.to_list()
     )
 
+    return [token_node_df, ent_node_df, ent_label_node_df]
+
 
 def _add_nlp_feats(
-    node_dfs: NodeDFs, edge_dfs: EdgeDFs, spacy_pipeline: Language
+    node_dfs: NodeDFs,
+    edge_dfs: EdgeDFs,
+    spacy_pipeline: Language,
+    parse_cache: Optional[ParseCacheDataInterface] = None,
+    n_process: int = 1,
+    batch_size: int = DEFAULT_BATCH_SIZE,
 ) -> Tuple[NodeDFs, EdgeDFs]:
-    tuple_input = prep_nlp_ntuples_etuples_input(
-        df=node_dfs.to_dict()[NodeType.sheet_cell], spacy_pipeline=spacy_pipeline
+    list_nlp_node_df, list_nlp_edge_df = prep_nlp_feats(
+        df=node_dfs.to_dict()[NodeType.sheet_cell],
+        spacy_pipeline=spacy_pipeline,
+        parse_cache=parse_cache,
+        n_process=n_process,
+        batch_size=batch_size,
     )
-    ntuples_etuples = assemble_nlp_ntuples_etuples(*tuple_input)
-    list_nlp_node_df, list_nlp_edge_df = assemble_nlp_ndfs_edfs(*ntuples_etuples)
 
     node_dfs.members.extend(list_nlp_node_df)
     edge_dfs.members.extend(list_nlp_edge_df)
@@ -1,127 +1,111 @@
 import logging
-from typing import Any, Dict, List, Set, Tuple
+from typing import Any, Dict, Iterator, List, Tuple
 
 from networkx import DiGraph
 
 from kronos.data_interfaces.edge_dfs_data_interface import EdgeAttrKey, EdgeDF, EdgeDFs
+from kronos.data_interfaces.hetero_graph_data_interface import HeteroGraph
 from kronos.data_interfaces.node_dfs_data_interface import NodeAttrKey, NodeDF, NodeDFs
+from kronos.nodes.utils_columnar import iter_attr_dicts
+from kronos.nodes.utils_validation import describe_nids, missing_nids
 
 logger = logging.getLogger(__name__)
 
 
-# TODO: Strength data validation
 def validate_node_dfs_and_edge_dfs(node_dfs: NodeDFs, edge_dfs: EdgeDFs) -> None:
-    # Collect all unique (node type, node id) tuples
-    # e.g. (SheetCell, 0)
-    set_nodes: Set[Tuple[str, int]] = set()
-    for node_df in node_dfs.members:
-        df = node_df.df
-        set_nodes = set_nodes | set(
-            zip(df[NodeAttrKey.ntype.value], df[NodeAttrKey.nid.value])
-        )
+    # Node ids per node type, e.g. {"SheetCell": array([0, 1, ...])}
+    node_nids = node_dfs.nids_by_ntype
+    # Node ids per node type referenced by source or destination of any edge
+    edge_nids = edge_dfs.nids_by_ntype
 
-    # Collect all unique (node type, node id) tuples referenced in edge dataframes
-    set_nodes_in_edges: Set[Tuple[str, int]] = set()
-    for edge_df in edge_dfs.members:
-        df = edge_df.df
-        # Collect source nodes
-        set_nodes_in_edges = set_nodes_in_edges | set(
-            zip(df[EdgeAttrKey.src_ntype.value], df[EdgeAttrKey.src_nid.value])
-        )
-        # Collect destination nodes
-        set_nodes_in_edges = set_nodes_in_edges | set(
-            zip(df[EdgeAttrKey.dst_ntype.value], df[EdgeAttrKey.dst_nid.value])
-        )
+    # Edges referencing nodes absent from node dataframes
+    dangling = missing_nids(nids_by_ntype=edge_nids, reference_by_ntype=node_nids)
+    # Island nodes are not allowed
+    islands = missing_nids(nids_by_ntype=node_nids, reference_by_ntype=edge_nids)
 
-    if set_nodes != set_nodes_in_edges:  # Island nodes are not allowed
+    if len(dangling) > 0 or len(islands) > 0:
         raise ValueError(
-            f"The set of {len(set_nodes)} nodes in node datagrames and "
-            f"{len(set_nodes_in_edges)} nodes referenced in edge dataframes are "
-            "not identical"
+            "Nodes in node dataframes and nodes referenced in edge dataframes "
+            f"are not identical. Dangling references: {describe_nids(dangling)}. "
+            f"Island nodes: {describe_nids(islands)}"
         )
 
 
-def node_tuples_from_node_df(
-    node_df: NodeDF,
-) -> List[Tuple[Tuple[str, int], Dict[str, Any]]]:
-    df = node_df.df
+NodeTuple = Tuple[Tuple[str, int], Dict[str, Any]]
+EdgeTuple = Tuple[Tuple[str, int], Tuple[str, int], Dict[str, Any]]
 
-    node_tuples: List[Tuple[Tuple[str, int], Dict[str, Any]]] = []
-
-    for record in df.to_dict(orient="records"):
-        # e.g. [{"nid": ("SheetCell", 0), "ntype": ...}, ...]
-        nid = int(record.pop(NodeAttrKey.nid.value))
-        # Node type information is duplicated for convenience
-        ntype = str(record[NodeAttrKey.ntype.value])
-        # The rest is assumed all to be attributes
-        record_str_key = {str(k): v for k, v in record.items()}
-        # Use (NodeType, NID) to index nodes to facilitate DGL Graph conversion later
-        # Nodes in networkx share node id space, requiring tuple indices
-        node_tuple: Tuple[Tuple[str, int], Dict[str, Any]] = (
-            (ntype, nid),
-            record_str_key,
-        )
-        node_tuples.append(node_tuple)
+
+def iter_node_tuples_from_node_df(node_df: NodeDF) -> Iterator[NodeTuple]:
+    df = node_df.df
 
     logger.info(
-        f"Parsed {len(node_tuples)} node tuples from {node_df.ntype.value} "
-        "node dataframe"
+        f"Parsing {len(df)} node tuples from {node_df.ntype.value} node dataframe"
+    )
+
+    # Use (NodeType, NID) to index nodes to facilitate DGL Graph conversion later
+    # Nodes in networkx share node id space, requiring tuple indices
+    node_keys = zip(
+        map(str, df[NodeAttrKey.ntype.value].tolist()),
+        map(int, df[NodeAttrKey.nid.value].tolist()),
     )
+    # The rest is assumed all to be attributes, where node type information is
+    # duplicated for convenience
+    attr_keys = [col for col in df.columns if col != NodeAttrKey.nid.value]
+
+    yield from zip(node_keys, iter_attr_dicts(df=df, attr_keys=attr_keys))
 
-    return node_tuples
 
+def node_tuples_from_node_df(node_df: NodeDF) -> List[NodeTuple]:
+    return list(iter_node_tuples_from_node_df(node_df=node_df))
 
-def node_tuples_from_node_dfs(
-    node_dfs: NodeDFs,
-) -> List[Tuple[Tuple[str, int], Dict[str, Any]]]:
-    node_tuples: List[Tuple[Tuple[str, int], Dict[str, Any]]] = []
 
+def iter_node_tuples_from_node_dfs(node_dfs: NodeDFs) -> Iterator[NodeTuple]:
     for node_df in node_dfs.members:
-        node_tuples.extend(node_tuples_from_node_df(node_df=node_df))
+        yield from iter_node_tuples_from_node_df(node_df=node_df)
 
-    return node_tuples
 
+def node_tuples_from_node_dfs(node_dfs: NodeDFs) -> List[NodeTuple]:
+    return list(iter_node_tuples_from_node_dfs(node_dfs=node_dfs))
 
-def edge_tuples_from_edge_df(
-    edge_df: EdgeDF,
-) -> List[Tuple[Tuple[str, int], Tuple[str, int], Dict[str, Any]]]:
-    df = edge_df.df
 
-    edge_tuples: List[Tuple[Tuple[str, int], Tuple[str, int], Dict[str, Any]]] = []
-
-    for record in df.to_dict(orient="records"):
-        # e.g. [{"src_nid": 0, "dst_nid": 1, "src_ntype": "SheetCell", "etype": "Up",
-        # "dst_ntype": "SheetCell", ...}, ...]
-        u = int(record.pop(EdgeAttrKey.src_nid.value))
-        ntype_u = str(record.pop(EdgeAttrKey.src_ntype.value))
-        v = int(record.pop(EdgeAttrKey.dst_nid.value))
-        ntype_v = str(record.pop(EdgeAttrKey.dst_ntype.value))
-        # The rest is assumed all to be attributes
-        record_str_key = {str(k): v for k, v in record.items()}
-        edge_tuple: Tuple[Tuple[str, int], Tuple[str, int], Dict[str, Any]] = (
-            (ntype_u, u),
-            (ntype_v, v),
-            record_str_key,
-        )
-        edge_tuples.append(edge_tuple)
+def iter_edge_tuples_from_edge_df(edge_df: EdgeDF) -> Iterator[EdgeTuple]:
+    df = edge_df.df
 
     logger.info(
-        f"Parsed {len(edge_tuples)} edge tuples from {edge_df.etype.value} "
-        "edge dataframe"
+        f"Parsing {len(df)} edge tuples from {edge_df.etype.value} edge dataframe"
     )
 
-    return edge_tuples
+    src_keys = zip(
+        map(str, df[EdgeAttrKey.src_ntype.value].tolist()),
+        map(int, df[EdgeAttrKey.src_nid.value].tolist()),
+    )
+    dst_keys = zip(
+        map(str, df[EdgeAttrKey.dst_ntype.value].tolist()),
+        map(int, df[EdgeAttrKey.dst_nid.value].tolist()),
+    )
+    # The rest is assumed all to be attributes
+    endpoint_keys = {
+        EdgeAttrKey.src_nid.value,
+        EdgeAttrKey.src_ntype.value,
+        EdgeAttrKey.dst_nid.value,
+        EdgeAttrKey.dst_ntype.value,
+    }
+    attr_keys = [col for col in df.columns if col not in endpoint_keys]
+
+    yield from zip(src_keys, dst_keys, iter_attr_dicts(df=df, attr_keys=attr_keys))
+
 
+def edge_tuples_from_edge_df(edge_df: EdgeDF) -> List[EdgeTuple]:
+    return list(iter_edge_tuples_from_edge_df(edge_df=edge_df))
 
-def edge_tuples_from_edge_dfs(
-    edge_dfs: EdgeDFs,
-) -> List[Tuple[Tuple[str, int], Tuple[str, int], Dict[str, Any]]]:
-    edge_tuples: List[Tuple[Tuple[str, int], Tuple[str, int], Dict[str, Any]]] = []
 
+def iter_edge_tuples_from_edge_dfs(edge_dfs: EdgeDFs) -> Iterator[EdgeTuple]:
     for edge_df in edge_dfs.members:
-        edge_tuples.extend(edge_tuples_from_edge_df(edge_df=edge_df))
+        yield from iter_edge_tuples_from_edge_df(edge_df=edge_df)
 
-    return edge_tuples
+
+def edge_tuples_from_edge_dfs(edge_dfs: EdgeDFs) -> List[EdgeTuple]:
+    return list(iter_edge_tuples_from_edge_dfs(edge_dfs=edge_dfs))
 
 
 def _assemble_kg(node_dfs: NodeDFs, edge_dfs: EdgeDFs) -> DiGraph:
@@ -132,14 +116,11 @@ def _assemble_kg(node_dfs: NodeDFs, edge_dfs: EdgeDFs) -> DiGraph:
     # Sanity check coherence between input
     validate_node_dfs_and_edge_dfs(node_dfs=node_dfs, edge_dfs=edge_dfs)
 
-    # Transform graph elements into networkx graph compatible form
-    node_tuples = node_tuples_from_node_dfs(node_dfs=node_dfs)
-    edge_tuples = edge_tuples_from_edge_dfs(edge_dfs=edge_dfs)
-
-    # Initialise the knowledge graph
+    # Initialise the knowledge graph with graph elements transformed into
+    # networkx graph compatible form one at a time
     nx_g = DiGraph()
-    nx_g.add_nodes_from(node_tuples)
-    nx_g.add_edges_from(edge_tuples)
+    nx_g.add_nodes_from(iter_node_tuples_from_node_dfs(node_dfs=node_dfs))
+    nx_g.add_edges_from(iter_edge_tuples_from_edge_dfs(edge_dfs=edge_dfs))
 
     logger.info(
         f"Initialised knowledge graph has {nx_g.number_of_nodes()} nodes "
@@ -147,3 +128,14 @@ def _assemble_kg(node_dfs: NodeDFs, edge_dfs: EdgeDFs) -> DiGraph:
     )
 
     return nx_g
+
+
+def _assemble_hetero_graph(node_dfs: NodeDFs, edge_dfs: EdgeDFs) -> HeteroGraph:
+    # Validate input
+    node_dfs.validate()
+    edge_dfs.validate()
+
+    # Sanity check coherence between input
+    validate_node_dfs_and_edge_dfs(node_dfs=node_dfs, edge_dfs=edge_dfs)
+
+    return HeteroGraph.from_dfs(node_dfs=node_dfs, edge_dfs=edge_dfs)
@@ -1,5 +1,5 @@
 import logging
-from typing import Dict, List, Tuple
+from typing import List, NamedTuple, Tuple
 
 import numpy as np
 import pandas as pd
@@ -19,69 +19,144 @@ from kronos.data_interfaces.node_dfs_data_interface import (
 logger = logging.getLogger(__name__)
 
 
-def element_wise_sum_coords(coord: List[List[int]]) -> List[int]:
-    """e.g. pd.Series([[1, 0], [0, 1]]) row-wise aggregation to [[1, 1]]"""
-    # Aggregate coord values by adding corresponding elements
-    return np.sum(np.array(coord), axis=0).tolist()  # type: ignore[no-any-return]
+class ContractionGroups(NamedTuple):
+    # Group id of each row, -1 for rows with missing key values
+    codes: np.ndarray
+    # Row positions ordered by group id
+    order: np.ndarray
+    # Offsets into order at which each group starts
+    starts: np.ndarray
 
 
-def concat_nid(nid: pd.Series) -> list:
-    return nid.tolist()
+def contraction_groups(df: DataFrame, keys: List[str]) -> ContractionGroups:
+    """Assigns rows sharing key values to groups numbered in sorted key order"""
+    # Rows with missing key values are not assigned to any group
+    codes = df.groupby(keys, sort=True).ngroup().fillna(-1).to_numpy(dtype=np.int64)
+    n_group = int(codes.max()) + 1 if len(codes) > 0 else 0
+
+    order = np.argsort(codes, kind="stable")
+    order = order[codes[order] >= 0]
+    starts = np.searchsorted(codes[order], np.arange(n_group))
+
+    return ContractionGroups(codes=codes, order=order, starts=starts)
+
+
+def sum_coords_by_group(coord: pd.Series, groups: ContractionGroups) -> List[list]:
+    """Sums coordinates element-wise within each group"""
+    if len(groups.starts) == 0:
+        return []
+
+    # Stack coordinates as an integer matrix and sum consecutive runs of rows
+    stacked = np.array(coord.tolist(), dtype=np.int64)[groups.order]
+    summed: List[list] = np.add.reduceat(stacked, groups.starts, axis=0).tolist()
+
+    return summed
+
+
+def collect_by_group(values: pd.Series, groups: ContractionGroups) -> List[list]:
+    """Collects values of each group into a list"""
+    if len(groups.starts) == 0:
+        return []
+
+    collected = np.split(values.to_numpy()[groups.order], groups.starts[1:])
+
+    return [a_group.tolist() for a_group in collected]
 
 
 # TODO: Refactor the following function into a factory merge node function
 # supporting custom attribute aggregation logic
 def merge_sheet_cell_nodes(
     df_sheet_cell: DataFrame,
-) -> Tuple[DataFrame, Dict[int, int]]:
+) -> Tuple[DataFrame, np.ndarray]:
+    """Returns merged nodes and a dense lookup array whose value at an old node
+    id is the new node id, or -1 where an old node id does not exist"""
     logger.info(f"Merging dataframe shaped {df_sheet_cell.shape} based on text...")
 
     # Nodes with identical node type and text values set to be merged
-    grouped = df_sheet_cell.groupby([NodeAttrKey.ntype.value, NodeAttrKey.text.value])
+    keys = [NodeAttrKey.ntype.value, NodeAttrKey.text.value]
+    groups = contraction_groups(df=df_sheet_cell, keys=keys)
 
     # Custom aggregation logic for each node attribute
-    df_merged = grouped.apply(
-        lambda x: pd.Series(
-            {
-                # Node ids are concatenated as graph element merging input
-                NodeAttrKey.nid.value: concat_nid(x[NodeAttrKey.nid.value]),
-                NodeAttrKey.coord.value: element_wise_sum_coords(
-                    x[NodeAttrKey.coord.value].tolist()
-                ),
-            }
-        )
-    ).reset_index()[df_sheet_cell.columns]
+    df_merged = (
+        df_sheet_cell[keys].iloc[groups.order[groups.starts]].reset_index(drop=True)
+    )
+    # Node ids are concatenated as graph element merging input
+    df_merged[NodeAttrKey.nid.value] = collect_by_group(
+        values=df_sheet_cell[NodeAttrKey.nid.value], groups=groups
+    )
+    df_merged[NodeAttrKey.coord.value] = sum_coords_by_group(
+        coord=df_sheet_cell[NodeAttrKey.coord.value], groups=groups
+    )
+    df_merged = df_merged[df_sheet_cell.columns]
 
     # Map old node ids to new node ids
-    nid_mapping: Dict[int, int] = {
-        i_old: i_new
-        for i_new in df_merged.index
-        for i_old in df_merged.loc[i_new, NodeAttrKey.nid.value]
-    }
+    nid_lookup = nid_lookup_from_codes(
+        nid=df_sheet_cell[NodeAttrKey.nid.value].to_numpy(dtype=np.int64),
+        codes=groups.codes,
+    )
 
     # Set node ids with 0-indexed consecutive integer sequence
     df_merged[NodeAttrKey.nid.value] = df_merged.index
 
-    return df_merged, nid_mapping
+    return df_merged, nid_lookup
+
 
+def nid_lookup_from_codes(nid: np.ndarray, codes: np.ndarray) -> np.ndarray:
+    """Scatters new node ids into an array indexed by old node ids"""
+    if len(nid) > 0 and nid.min() < 0:
+        raise ValueError("Node ids to be remapped cannot be negative")
 
-def update_nids_in_df_edge(
-    df_edge: DataFrame, nid_mapping: Dict[int, int]
-) -> DataFrame:
+    nid_lookup = np.full(int(nid.max()) + 1 if len(nid) > 0 else 0, -1, np.int64)
+    nid_lookup[nid] = codes
+
+    return nid_lookup
+
+
+def remap_nids(nid: np.ndarray, nid_lookup: np.ndarray) -> np.ndarray:
+    """Replaces old node ids with new node ids by indexing into a lookup array"""
+    is_known = (nid >= 0) & (nid < len(nid_lookup))
+    new_nid = np.full(len(nid), -1, dtype=np.int64)
+    new_nid[is_known] = nid_lookup[nid[is_known]]
+
+    is_missing = new_nid < 0
+    if is_missing.any():
+        raise ValueError(
+            f"{int(is_missing.sum())} node references have no merged node, "
+            f"e.g. node ids {np.unique(nid[is_missing])[:10].tolist()}"
+        )
+
+    return new_nid
+
+
+def update_nids_in_df_edges(
+    list_df_edge: List[DataFrame], nid_lookup: np.ndarray
+) -> List[DataFrame]:
+    """Remaps node references of several edge dataframes with a single lookup
+    and a single validation over their concatenated node id columns"""
     logger.info(
-        f"Updating edge df shaped {df_edge.shape} "
+        f"Updating {len(list_df_edge)} edge dfs with "
+        f"{sum(len(df_edge) for df_edge in list_df_edge)} edges in total "
         "based on merged node nid mapping..."
     )
 
-    # Update src_nid and dst_nid based on the nid_mapping
-    df_edge[EdgeAttrKey.src_nid.value] = df_edge[EdgeAttrKey.src_nid.value].apply(
-        lambda x: nid_mapping[x]
-    )
-    df_edge[EdgeAttrKey.dst_nid.value] = df_edge[EdgeAttrKey.dst_nid.value].apply(
-        lambda x: nid_mapping[x]
-    )
+    attr_keys = (EdgeAttrKey.src_nid.value, EdgeAttrKey.dst_nid.value)
+    columns = [
+        df_edge[attr_key].to_numpy(dtype=np.int64)
+        for df_edge in list_df_edge
+        for attr_key in attr_keys
+    ]
+    if len(columns) == 0:
+        return list_df_edge
+
+    new_nid = remap_nids(nid=np.concatenate(columns), nid_lookup=nid_lookup)
+    offsets = np.cumsum([len(column) for column in columns])[:-1]
+    new_columns = iter(np.split(new_nid, offsets))
+
+    for df_edge in list_df_edge:
+        for attr_key in attr_keys:
+            df_edge[attr_key] = next(new_columns)
 
-    return df_edge
+    return list_df_edge
 
 
 def _contract_sheet_cell_nodes(
@@ -94,19 +169,21 @@ def _contract_sheet_cell_nodes(
     i = node_dfs.ntypes.index(ntype_to_merge)
 
     # Merge nodes based on common text
-    node_dfs.members[i].df, nid_mapping = merge_sheet_cell_nodes(
+    node_dfs.members[i].df, nid_lookup = merge_sheet_cell_nodes(
         df_sheet_cell=node_dfs.members[i].df
     )
 
     # Replace node references in edge dataframes
-    for i in range(len(edge_dfs.members)):
-        if edge_dfs.members[i].etype in TraversalEdgeTypes:
-            logger.info(
-                f"{edge_dfs.members[i].etype.value} edge dataframe is set "
-                "to be updated based on merged node mapping"
-            )
-            edge_dfs.members[i].df = update_nids_in_df_edge(
-                df_edge=edge_dfs.members[i].df, nid_mapping=nid_mapping
-            )
+    traversal_edge_dfs = [
+        edge_df for edge_df in edge_dfs.members if edge_df.etype in TraversalEdgeTypes
+    ]
+    logger.info(
+        f"{[edge_df.etype.value for edge_df in traversal_edge_dfs]} edge "
+        "dataframes are set to be updated based on merged node mapping"
+    )
+    update_nids_in_df_edges(
+        list_df_edge=[edge_df.df for edge_df in traversal_edge_dfs],
+        nid_lookup=nid_lookup,
+    )
 
     return node_dfs, edge_dfs
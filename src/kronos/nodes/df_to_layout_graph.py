@@ -3,6 +3,7 @@ from collections import namedtuple
 from enum import Enum
 from typing import Dict, List, Optional, Tuple, Type
 
+import numpy as np
 import pandas as pd
 from pandas import DataFrame
 
@@ -23,6 +24,8 @@ from kronos.data_interfaces.node_dfs_data_interface import (
     NodeType,
     SheetCellTuple,
 )
+from kronos.data_interfaces.timetable_df_data_interface import SparseSheet
+from kronos.nodes.diff_timetable_df import CellDiff, _diff_timetable_dfs
 from kronos.nodes.utils_df_to_layout_graph import squeeze_tuple
 
 logger = logging.getLogger(__name__)
@@ -38,6 +41,24 @@ class Direction(str, Enum):
     right = "right"
 
 
+class LayoutEngine(str, Enum):
+    # Legacy cell by cell scan kept for comparison during migration
+    iloc = "iloc"
+    # Nearest non-null neighbours derived from a boolean mask in one pass
+    numpy = "numpy"
+    # Nearest non-null neighbours derived from non null cells sorted by row
+    # and by column, scaling with the number of filled cells
+    sparse = "sparse"
+
+
+DIRECTION_TO_ETYPE: Dict[Direction, EdgeType] = {
+    Direction.up: EdgeType.up,
+    Direction.down: EdgeType.down,
+    Direction.left: EdgeType.left,
+    Direction.right: EdgeType.right,
+}
+
+
 def find_first_non_null(  # noqa: C901
     df: DataFrame, start_row: int, start_col: int, direction: Direction
 ) -> Optional[TraDstTuple]:
@@ -67,15 +88,9 @@ def find_first_non_null(  # noqa: C901
 
 
 # TODO: Break the following function down to smaller chunks
-def _df_to_layout_graph(df: DataFrame) -> Tuple[NodeDF, EdgeDFs]:
+def _df_to_layout_graph_iloc(df: DataFrame) -> Tuple[NodeDF, EdgeDFs]:
     sheet_cells: List[SheetCellTuple] = []
     traversals: List[TraversalTuple] = []
-    direction_to_etype: Dict[Direction, EdgeType] = {
-        Direction.up: EdgeType.up,
-        Direction.down: EdgeType.down,
-        Direction.left: EdgeType.left,
-        Direction.right: EdgeType.right,
-    }
     direction_to_ttuple_type: Dict[Direction, Type[TraversalTuple]] = {
         Direction.up: UpTuple,
         Direction.down: DownTuple,
@@ -127,7 +142,7 @@ def _df_to_layout_graph(df: DataFrame) -> Tuple[NodeDF, EdgeDFs]:
                 dst_ntype = indexed_df_sheet_cell.loc[
                     (r_dst, c_dst), NodeAttrKey.ntype.value
                 ]
-                etype = direction_to_etype[direction].value
+                etype = DIRECTION_TO_ETYPE[direction].value
                 traversal_tuple = traversal_tuple_type(
                     src_nid, dst_nid, src_ntype, etype, dst_ntype, dis
                 )
@@ -149,3 +164,309 @@ def _df_to_layout_graph(df: DataFrame) -> Tuple[NodeDF, EdgeDFs]:
         )
 
     return sheet_cell_node_df, traversal_edge_dfs
+
+
+def nearest_non_null(mask: np.ndarray) -> Dict[Direction, np.ndarray]:
+    """For every cell of a 2D boolean not-null mask, returns the row (up, down)
+    or column (left, right) index of the first not-null cell in each direction,
+    with -1 marking the absence of one"""
+    rows, cols = mask.shape
+    i_row = np.broadcast_to(np.arange(rows)[:, None], mask.shape)
+    i_col = np.broadcast_to(np.arange(cols)[None, :], mask.shape)
+
+    # Running max/min of not-null indices fills each cell with the index of
+    # the closest not-null cell at or before/after it along an axis
+    prev_row = np.maximum.accumulate(np.where(mask, i_row, -1), axis=0)
+    next_row = np.minimum.accumulate(np.where(mask, i_row, rows)[::-1], axis=0)[::-1]
+    prev_col = np.maximum.accumulate(np.where(mask, i_col, -1), axis=1)
+    next_col = np.minimum.accumulate(np.where(mask, i_col, cols)[:, ::-1], axis=1)[
+        :, ::-1
+    ]
+
+    # Shift by one cell so that a cell is never its own neighbour
+    up = np.full(mask.shape, -1)
+    up[1:, :] = prev_row[:-1, :]
+    down = np.full(mask.shape, -1)
+    down[:-1, :] = np.where(next_row[1:, :] == rows, -1, next_row[1:, :])
+    left = np.full(mask.shape, -1)
+    left[:, 1:] = prev_col[:, :-1]
+    right = np.full(mask.shape, -1)
+    right[:, :-1] = np.where(next_col[:, 1:] == cols, -1, next_col[:, 1:])
+
+    return {
+        Direction.up: up,
+        Direction.down: down,
+        Direction.left: left,
+        Direction.right: right,
+    }
+
+
+def traversal_edge_dfs_from_arrays(
+    src_nid: Dict[Direction, np.ndarray],
+    dst_nid: Dict[Direction, np.ndarray],
+    distance: Dict[Direction, np.ndarray],
+    position: Dict[Direction, np.ndarray],
+) -> EdgeDFs:
+    """Assembles one edge dataframe per traversal edge type from columnar arrays,
+    indexed by each edge's position in a row-major, per-direction enumeration"""
+    traversal_edge_dfs = EdgeDFs(members=[])
+
+    # Edge dataframes are ordered by edge type value as a groupby would
+    for direction in sorted(Direction, key=lambda d: DIRECTION_TO_ETYPE[d].value):
+        if len(src_nid[direction]) == 0:
+            continue
+
+        etype = DIRECTION_TO_ETYPE[direction]
+        df_by_etype = DataFrame(
+            {
+                EdgeAttrKey.src_nid.value: src_nid[direction],
+                EdgeAttrKey.dst_nid.value: dst_nid[direction],
+                EdgeAttrKey.src_ntype.value: NodeType.sheet_cell.value,
+                EdgeAttrKey.etype.value: etype.value,
+                EdgeAttrKey.dst_ntype.value: NodeType.sheet_cell.value,
+                EdgeAttrKey.distance.value: distance[direction],
+            },
+            index=position[direction],
+        )
+        traversal_edge_dfs.members.append(EdgeDF(etype=etype, df=df_by_etype))
+        logger.info(
+            f"Factored out {etype} edge dataframe has shape {df_by_etype.shape}"
+        )
+
+    return traversal_edge_dfs
+
+
+def _df_to_layout_graph_numpy(df: DataFrame) -> Tuple[NodeDF, EdgeDFs]:
+    mask = df.notna().to_numpy()
+    values = df.to_numpy()
+
+    # Non null cells are numbered in row-major order
+    i_row, i_col = np.nonzero(mask)
+    n_cell = len(i_row)
+    nid_grid = np.full(mask.shape, -1, dtype=np.int64)
+    nid_grid[i_row, i_col] = np.arange(n_cell)
+
+    df_sheet_cell = DataFrame(
+        {
+            NodeAttrKey.nid.value: np.arange(n_cell, dtype=np.int64),
+            NodeAttrKey.ntype.value: NodeType.sheet_cell.value,
+            NodeAttrKey.text.value: values[i_row, i_col],
+            NodeAttrKey.coord.value: list(zip(i_row.tolist(), i_col.tolist())),
+        }
+    )
+
+    logger.info(
+        f"{NodeType.sheet_cell.value} node dataframe has shape "
+        f"{df_sheet_cell.shape}"
+    )
+
+    sheet_cell_node_df = NodeDF(ntype=NodeType.sheet_cell, df=df_sheet_cell)
+
+    # Gather the nearest neighbour of every non null cell in each direction
+    neighbour = nearest_non_null(mask)
+    dst_index: Dict[Direction, np.ndarray] = {
+        direction: grid[i_row, i_col] for direction, grid in neighbour.items()
+    }
+    has_edge = np.stack([dst_index[direction] >= 0 for direction in Direction], axis=1)
+
+    # Number edges as if enumerated cell by cell and direction by direction
+    edge_position = (np.cumsum(has_edge.ravel()) - 1).reshape(has_edge.shape)
+
+    src_nid: Dict[Direction, np.ndarray] = {}
+    dst_nid: Dict[Direction, np.ndarray] = {}
+    distance: Dict[Direction, np.ndarray] = {}
+    position: Dict[Direction, np.ndarray] = {}
+    for i_direction, direction in enumerate(Direction):
+        selected = has_edge[:, i_direction]
+        r_src, c_src = i_row[selected], i_col[selected]
+        dst = dst_index[direction][selected]
+        if direction in (Direction.up, Direction.down):
+            r_dst, c_dst = dst, c_src
+            distance[direction] = np.abs(r_src - r_dst).astype(np.int64)
+        else:
+            r_dst, c_dst = r_src, dst
+            distance[direction] = np.abs(c_src - c_dst).astype(np.int64)
+        src_nid[direction] = nid_grid[r_src, c_src]
+        dst_nid[direction] = nid_grid[r_dst, c_dst]
+        position[direction] = edge_position[selected, i_direction]
+
+    logger.info(f"Traversal edge dataframes have {int(has_edge.sum())} rows in total")
+
+    traversal_edge_dfs = traversal_edge_dfs_from_arrays(
+        src_nid=src_nid, dst_nid=dst_nid, distance=distance, position=position
+    )
+
+    return sheet_cell_node_df, traversal_edge_dfs
+
+
+def sparse_nearest_neighbours(sparse_sheet: SparseSheet) -> Dict[Direction, np.ndarray]:
+    """For every non null cell, returns the position in the sheet of the first
+    non null cell in each direction, with -1 marking the absence of one
+
+    Consecutive cells in row-major order sharing a row are left and right
+    neighbours, and consecutive cells in column-major order sharing a column
+    are up and down neighbours"""
+    n_cell = sparse_sheet.n_cell
+    i_row, i_col = sparse_sheet.i_row, sparse_sheet.i_col
+    neighbour = {
+        direction: np.full(n_cell, -1, dtype=np.int64) for direction in Direction
+    }
+
+    same_row = i_row[1:] == i_row[:-1]
+    position = np.arange(n_cell, dtype=np.int64)
+    neighbour[Direction.left][1:][same_row] = position[:-1][same_row]
+    neighbour[Direction.right][:-1][same_row] = position[1:][same_row]
+
+    # Stable sort keeps cells of a column in row order
+    col_order = np.argsort(i_col, kind="stable")
+    same_col = i_col[col_order][1:] == i_col[col_order][:-1]
+    neighbour[Direction.up][col_order[1:][same_col]] = col_order[:-1][same_col]
+    neighbour[Direction.down][col_order[:-1][same_col]] = col_order[1:][same_col]
+
+    return neighbour
+
+
+def _sparse_sheet_to_layout_graph(
+    sparse_sheet: SparseSheet,
+) -> Tuple[NodeDF, EdgeDFs]:
+    # Non null cells are numbered in row-major order, i.e. by their position
+    i_row, i_col = sparse_sheet.i_row, sparse_sheet.i_col
+    n_cell = sparse_sheet.n_cell
+
+    df_sheet_cell = DataFrame(
+        {
+            NodeAttrKey.nid.value: np.arange(n_cell, dtype=np.int64),
+            NodeAttrKey.ntype.value: NodeType.sheet_cell.value,
+            NodeAttrKey.text.value: sparse_sheet.value,
+            NodeAttrKey.coord.value: list(zip(i_row.tolist(), i_col.tolist())),
+        }
+    )
+
+    logger.info(
+        f"{NodeType.sheet_cell.value} node dataframe has shape "
+        f"{df_sheet_cell.shape} for a sheet of shape {sparse_sheet.shape}"
+    )
+
+    sheet_cell_node_df = NodeDF(ntype=NodeType.sheet_cell, df=df_sheet_cell)
+
+    neighbour = sparse_nearest_neighbours(sparse_sheet=sparse_sheet)
+    has_edge = np.stack([neighbour[direction] >= 0 for direction in Direction], axis=1)
+
+    # Number edges as if enumerated cell by cell and direction by direction
+    edge_position = (np.cumsum(has_edge.ravel()) - 1).reshape(has_edge.shape)
+
+    src_nid: Dict[Direction, np.ndarray] = {}
+    dst_nid: Dict[Direction, np.ndarray] = {}
+    distance: Dict[Direction, np.ndarray] = {}
+    position: Dict[Direction, np.ndarray] = {}
+    for i_direction, direction in enumerate(Direction):
+        selected = has_edge[:, i_direction]
+        src = np.flatnonzero(selected)
+        dst = neighbour[direction][selected]
+        i_along = i_row if direction in (Direction.up, Direction.down) else i_col
+        src_nid[direction] = src
+        dst_nid[direction] = dst
+        distance[direction] = np.abs(i_along[src] - i_along[dst])
+        position[direction] = edge_position[selected, i_direction]
+
+    logger.info(f"Traversal edge dataframes have {int(has_edge.sum())} rows in total")
+
+    traversal_edge_dfs = traversal_edge_dfs_from_arrays(
+        src_nid=src_nid, dst_nid=dst_nid, distance=distance, position=position
+    )
+
+    return sheet_cell_node_df, traversal_edge_dfs
+
+
+def _df_to_layout_graph(
+    df: DataFrame, engine: LayoutEngine = LayoutEngine.sparse
+) -> Tuple[NodeDF, EdgeDFs]:
+    logger.info(f"Parsing a layout graph with the {engine.value} engine")
+
+    if engine == LayoutEngine.iloc:
+        return _df_to_layout_graph_iloc(df=df)
+    if engine == LayoutEngine.numpy:
+        return _df_to_layout_graph_numpy(df=df)
+
+    return _sparse_sheet_to_layout_graph(sparse_sheet=SparseSheet.from_df(df))
+
+
+def layout_matches_timetable_df(sheet_cell_node_df: NodeDF, df: DataFrame) -> bool:
+    """Whether sheet cell nodes are exactly the non null cells of a timetable
+    dataframe numbered in row-major order, as parsed by _df_to_layout_graph"""
+    df_sheet_cell = sheet_cell_node_df.df
+    i_row, i_col = np.nonzero(df.notna().to_numpy())
+    if len(i_row) != len(df_sheet_cell):
+        return False
+
+    coord = np.array(
+        df_sheet_cell[NodeAttrKey.coord.value].tolist(), dtype=np.int64
+    ).reshape(-1, 2)
+    nid = df_sheet_cell[NodeAttrKey.nid.value].to_numpy(dtype=np.int64)
+    text = df_sheet_cell[NodeAttrKey.text.value].to_numpy(dtype=object)
+
+    return bool(
+        (nid == np.arange(len(nid))).all()
+        and (coord[:, 0] == i_row).all()
+        and (coord[:, 1] == i_col).all()
+        and (text == df.to_numpy(dtype=object)[i_row, i_col]).all()
+    )
+
+
+def patch_sheet_cell_texts(
+    sheet_cell_node_df: NodeDF, df: DataFrame, cell_diff: CellDiff
+) -> NodeDF:
+    """Overwrites texts of changed cells given that the set of non null cells,
+    and hence node ids and traversal edges, is unchanged"""
+    df_sheet_cell = sheet_cell_node_df.df.copy()
+    if len(cell_diff.changed) == 0:
+        return NodeDF(ntype=NodeType.sheet_cell, df=df_sheet_cell)
+
+    coord = np.array(
+        df_sheet_cell[NodeAttrKey.coord.value].tolist(), dtype=np.int64
+    ).reshape(-1, 2)
+    nid_grid = np.full(df.shape, -1, dtype=np.int64)
+    nid_grid[coord[:, 0], coord[:, 1]] = df_sheet_cell[NodeAttrKey.nid.value]
+
+    r_changed, c_changed = cell_diff.changed[:, 0], cell_diff.changed[:, 1]
+    text = df_sheet_cell[NodeAttrKey.text.value].to_numpy(dtype=object).copy()
+    text[nid_grid[r_changed, c_changed]] = df.to_numpy(dtype=object)[
+        r_changed, c_changed
+    ]
+    df_sheet_cell[NodeAttrKey.text.value] = text
+
+    return NodeDF(ntype=NodeType.sheet_cell, df=df_sheet_cell)
+
+
+def _df_to_layout_graph_incremental(
+    df: DataFrame,
+    previous_df: DataFrame,
+    previous_sheet_cell_node_df: NodeDF,
+    previous_traversal_edge_dfs: EdgeDFs,
+    engine: LayoutEngine = LayoutEngine.sparse,
+) -> Tuple[NodeDF, EdgeDFs]:
+    """Derives a layout graph from the one of the previous timetable version
+
+    Cells whose text changed are patched in place and traversal edges are kept.
+    Added or removed cells renumber every later node in row-major order, so the
+    layout graph is then parsed anew with the vectorised engine"""
+    if not layout_matches_timetable_df(
+        sheet_cell_node_df=previous_sheet_cell_node_df, df=previous_df
+    ):
+        logger.warning(
+            "Previous layout graph was not parsed from the previous timetable "
+            "version and is discarded"
+        )
+        return _df_to_layout_graph(df=df, engine=engine)
+
+    cell_diff = _diff_timetable_dfs(df_old=previous_df, df_new=df)
+    if not cell_diff.is_text_only:
+        logger.info("Non null cells were added or removed, parsing all cells")
+        return _df_to_layout_graph(df=df, engine=engine)
+
+    logger.info(f"Patching texts of {len(cell_diff.changed)} changed cells")
+    sheet_cell_node_df = patch_sheet_cell_texts(
+        sheet_cell_node_df=previous_sheet_cell_node_df, df=df, cell_diff=cell_diff
+    )
+
+    return sheet_cell_node_df, previous_traversal_edge_dfs
@@ -0,0 +1,80 @@
+import logging
+from dataclasses import dataclass
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CellDiff:
+    # Coordinates shaped (n, 2) of cells non null in both versions whose text
+    # differs
+    changed: np.ndarray
+    # Coordinates of cells only non null in the new version
+    added: np.ndarray
+    # Coordinates of cells only non null in the old version
+    removed: np.ndarray
+
+    @property
+    def is_empty(self) -> bool:
+        return len(self.changed) + len(self.added) + len(self.removed) == 0
+
+    @property
+    def is_text_only(self) -> bool:
+        """Whether the set of non null cells, thus the layout, is unchanged"""
+        return len(self.added) + len(self.removed) == 0
+
+    @property
+    def affected_rows(self) -> np.ndarray:
+        """Rows in which nearest non null neighbours may have changed"""
+        return np.unique(np.concatenate([self.added[:, 0], self.removed[:, 0]]))
+
+    @property
+    def affected_cols(self) -> np.ndarray:
+        """Columns in which nearest non null neighbours may have changed"""
+        return np.unique(np.concatenate([self.added[:, 1], self.removed[:, 1]]))
+
+    def report(self) -> None:
+        logger.info(
+            f"{len(self.changed)} cells changed, {len(self.added)} cells added and "
+            f"{len(self.removed)} cells removed across {len(self.affected_rows)} "
+            f"rows and {len(self.affected_cols)} columns"
+        )
+
+
+def align_timetable_dfs(
+    df_old: DataFrame, df_new: DataFrame
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Pads two timetable dataframes with nulls to a common shape and returns
+    their values as object arrays"""
+    n_row = max(df_old.shape[0], df_new.shape[0])
+    n_col = max(df_old.shape[1], df_new.shape[1])
+
+    def pad(df: DataFrame) -> np.ndarray:
+        values = np.full((n_row, n_col), np.nan, dtype=object)
+        values[: df.shape[0], : df.shape[1]] = df.to_numpy(dtype=object)
+        return values
+
+    return pad(df_old), pad(df_new)
+
+
+def _diff_timetable_dfs(df_old: DataFrame, df_new: DataFrame) -> CellDiff:
+    """Compares two versions of a timetable dataframe cell by cell"""
+    values_old, values_new = align_timetable_dfs(df_old=df_old, df_new=df_new)
+    mask_old, mask_new = pd.notna(values_old), pd.notna(values_new)
+
+    both = mask_old & mask_new
+    changed = both & (values_old != values_new)
+
+    cell_diff = CellDiff(
+        changed=np.argwhere(changed),
+        added=np.argwhere(mask_new & ~mask_old),
+        removed=np.argwhere(mask_old & ~mask_new),
+    )
+    cell_diff.report()
+
+    return cell_diff
@@ -0,0 +1,352 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generator,
+    Iterable,
+    List,
+    Optional,
+    Protocol,
+    Union,
+)
+from urllib.parse import quote
+
+import httpx
+from google.auth.transport.requests import Request
+from google.oauth2.service_account import Credentials
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+SHEETS_API_URL = "https://sheets.googleapis.com"
+SHEETS_READONLY_SCOPE = "https://www.googleapis.com/auth/spreadsheets.readonly"
+
+# Statuses answered to requests which may succeed if sent again later
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+
+class SheetTarget(BaseModel):
+    # Name of the snapshot directory to which the worksheet is saved
+    name: str
+    spreadsheet_key: str
+    # Worksheet index, as in gspread's get_worksheet, or worksheet title
+    worksheet: Union[int, str] = 0
+
+
+class DownloadConfig(BaseModel):
+    # Number of targets downloaded concurrently
+    max_workers: int = 4
+    # Sustained request rate, which Sheets API read quotas cap at 60 requests
+    # per minute per user by default
+    requests_per_s: float = 1.0
+    # Number of requests which can be sent at once after being idle
+    burst: int = 4
+    # Number of times a target which failed with a retryable error is retried
+    max_retries: int = 5
+    # Delay before the first retry, doubled on every further retry
+    backoff_s: float = 1.0
+    max_backoff_s: float = 32.0
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled at a fixed rate up to its capacity.
+
+    Every acquisition reserves a token, possibly one refilled in the future, so
+    that concurrent callers are served in the order they arrive and sleep
+    outside of the lock until their token is due.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        if rate <= 0:
+            raise ValueError("Token bucket rate has to be positive")
+        if capacity < 1:
+            raise ValueError("Token bucket capacity has to be at least 1")
+
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.sleep = sleep
+
+        self._tokens = float(capacity)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = self.clock()
+        self._tokens = min(
+            float(self.capacity), self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    def acquire(self) -> float:
+        """Blocks until a token is available and returns the time waited"""
+        with self._lock:
+            self._refill()
+            self._tokens -= 1
+            wait_s = max(0.0, -self._tokens / self.rate)
+
+        if wait_s > 0:
+            self.sleep(wait_s)
+
+        return wait_s
+
+    def pause(self, delay_s: float) -> None:
+        """Withholds tokens from every caller for a delay, e.g. the one asked
+        for by a rate limited response"""
+        with self._lock:
+            self._refill()
+            self._tokens = min(self._tokens, 0.0) - delay_s * self.rate
+
+
+class SheetsTransport(Protocol):
+    def get_values(
+        self, spreadsheet_key: str, worksheet: Union[int, str]
+    ) -> List[List[Any]]:
+        """Returns the cell values of a worksheet as rows of equal length"""
+        ...
+
+
+class GoogleCredentialsAuth(httpx.Auth):
+    """Attaches the access token of service account credentials to requests,
+    refreshing it once for all threads when it expires"""
+
+    def __init__(self, credentials: Credentials) -> None:
+        self.credentials = credentials
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_service_account_file(
+        cls, path_service_account_json: Path
+    ) -> "GoogleCredentialsAuth":
+        return cls(
+            Credentials.from_service_account_file(
+                str(path_service_account_json), scopes=[SHEETS_READONLY_SCOPE]
+            )
+        )
+
+    def auth_flow(
+        self, request: httpx.Request
+    ) -> Generator[httpx.Request, httpx.Response, None]:
+        with self._lock:
+            if not self.credentials.valid:
+                self.credentials.refresh(Request())
+            token = self.credentials.token
+
+        request.headers["Authorization"] = f"Bearer {token}"
+        yield request
+
+
+def a1_sheet_range(title: str) -> str:
+    """A1 notation range covering a whole worksheet"""
+    return "'" + title.replace("'", "''") + "'"
+
+
+def pad_rows(rows: List[List[Any]]) -> List[List[Any]]:
+    """Pads rows, from which the Sheets API trims trailing empty cells, with
+    empty strings to the width of the widest row"""
+    n_col = max((len(row) for row in rows), default=0)
+
+    return [row + [""] * (n_col - len(row)) for row in rows]
+
+
+class RestSheetsTransport:
+    """Reads worksheet values from the Sheets API v4 over a pool of keep-alive
+    connections shared across threads, sending each request only once a token
+    bucket grants it"""
+
+    def __init__(
+        self,
+        base_url: str = SHEETS_API_URL,
+        auth: Optional[httpx.Auth] = None,
+        token_bucket: Optional[TokenBucket] = None,
+        timeout_s: float = 60.0,
+        max_connections: int = 16,
+    ) -> None:
+        self.client = httpx.Client(
+            base_url=base_url,
+            auth=auth,
+            timeout=timeout_s,
+            limits=httpx.Limits(max_connections=max_connections),
+        )
+        self.token_bucket = token_bucket
+
+        # Worksheet titles in order per spreadsheet, which are only needed to
+        # resolve worksheet indices
+        self._titles: Dict[str, List[str]] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, url: str, **kwargs: Any) -> Any:
+        if self.token_bucket is not None:
+            self.token_bucket.acquire()
+
+        response = self.client.get(url, **kwargs)
+        if response.status_code == 429 and self.token_bucket is not None:
+            retry_after_s = parse_retry_after(response.headers.get("Retry-After"))
+            if retry_after_s is not None:
+                self.token_bucket.pause(retry_after_s)
+        response.raise_for_status()
+
+        return response.json()
+
+    def worksheet_titles(self, spreadsheet_key: str) -> List[str]:
+        with self._lock:
+            titles = self._titles.get(spreadsheet_key)
+        if titles is None:
+            spreadsheet = self._get(
+                f"/v4/spreadsheets/{quote(spreadsheet_key, safe='')}",
+                params={"fields": "sheets.properties"},
+            )
+            sheets = sorted(
+                spreadsheet.get("sheets", []),
+                key=lambda sheet: sheet["properties"].get("index", 0),
+            )
+            titles = [sheet["properties"]["title"] for sheet in sheets]
+            with self._lock:
+                self._titles[spreadsheet_key] = titles
+
+        return titles
+
+    def get_values(
+        self, spreadsheet_key: str, worksheet: Union[int, str]
+    ) -> List[List[Any]]:
+        if isinstance(worksheet, int):
+            titles = self.worksheet_titles(spreadsheet_key)
+            if not 0 <= worksheet < len(titles):
+                raise IndexError(
+                    f"Spreadsheet {spreadsheet_key} has no worksheet {worksheet}"
+                )
+            worksheet = titles[worksheet]
+
+        value_range = self._get(
+            f"/v4/spreadsheets/{quote(spreadsheet_key, safe='')}/values/"
+            f"{quote(a1_sheet_range(worksheet), safe='')}"
+        )
+
+        # Values are omitted altogether from the response of an empty worksheet
+        return pad_rows(value_range.get("values", []))
+
+    def close(self) -> None:
+        self.client.close()
+
+    def __enter__(self) -> "RestSheetsTransport":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait given by a Retry-After header, if in delay seconds"""
+    try:
+        return max(0.0, float(value)) if value is not None else None
+    except ValueError:
+        return None
+
+
+def is_retryable(e: Exception) -> bool:
+    if isinstance(e, httpx.HTTPStatusError):
+        return e.response.status_code in RETRYABLE_STATUS_CODES
+
+    # The whole request failed, e.g. a timeout or a dropped connection
+    return isinstance(e, (httpx.TransportError, OSError))
+
+
+@dataclass
+class SheetDownload:
+    target: SheetTarget
+    # None if the target still failed after all retries
+    sheet_values: Optional[List[List[Any]]]
+    n_retry: int
+    latency_s: float
+    error: Optional[str] = None
+
+
+def download_with_retry(
+    transport: SheetsTransport,
+    target: SheetTarget,
+    download_config: DownloadConfig,
+) -> SheetDownload:
+    """Downloads a target, retrying retryable errors with exponential backoff"""
+    start = time.perf_counter()
+    n_retry = 0
+    error: Optional[str] = None
+
+    for attempt in range(download_config.max_retries + 1):
+        if attempt > 0:
+            n_retry += 1
+            time.sleep(
+                min(
+                    download_config.backoff_s * 2 ** (attempt - 1),
+                    download_config.max_backoff_s,
+                )
+            )
+
+        try:
+            sheet_values = transport.get_values(
+                spreadsheet_key=target.spreadsheet_key, worksheet=target.worksheet
+            )
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            logger.debug(f"Target {target.name} attempt {attempt} failed with {error}")
+            if not is_retryable(e):
+                break
+            continue
+
+        return SheetDownload(
+            target=target,
+            sheet_values=sheet_values,
+            n_retry=n_retry,
+            latency_s=time.perf_counter() - start,
+        )
+
+    return SheetDownload(
+        target=target,
+        sheet_values=None,
+        n_retry=n_retry,
+        latency_s=time.perf_counter() - start,
+        error=error,
+    )
+
+
+def download_targets(
+    transport: SheetsTransport,
+    targets: Iterable[SheetTarget],
+    download_config: Optional[DownloadConfig] = None,
+) -> Generator[SheetDownload, None, None]:
+    """Downloads targets over a bounded pool of threads sharing one transport,
+    yielding each download as soon as it completes"""
+    if download_config is None:
+        download_config = DownloadConfig()
+
+    with ThreadPoolExecutor(max_workers=download_config.max_workers) as executor:
+        futures = [
+            executor.submit(download_with_retry, transport, target, download_config)
+            for target in targets
+        ]
+        for future in as_completed(futures):
+            sheet_download = future.result()
+            if sheet_download.error is None:
+                logger.info(
+                    f"Downloaded {sheet_download.target.name} in "
+                    f"{sheet_download.latency_s:.2f}s after "
+                    f"{sheet_download.n_retry} retries"
+                )
+            else:
+                logger.warning(
+                    f"Failed to download {sheet_download.target.name} after "
+                    f"{sheet_download.n_retry} retries: {sheet_download.error}"
+                )
+
+            yield sheet_download
@@ -1,13 +1,32 @@
+import hashlib
 import logging
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
 from enum import Enum
-from typing import Dict, List, Optional
-
+from itertools import islice
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Protocol,
+    Set,
+    Tuple,
+)
+
+import httpx
 import numpy as np
+import orjson
 from pydantic import BaseModel, HttpUrl
 from pydantic_core import Url
 from weaviate import WeaviateClient
 from weaviate.classes.config import DataType, Property
+from weaviate.classes.query import Filter
 from weaviate.connect import ConnectionParams
+from weaviate.util import generate_uuid5
 
 logger = logging.getLogger(__name__)
 logging.getLogger("httpx").setLevel(logging.WARNING)
@@ -48,6 +67,7 @@ class CollectionName(str, Enum):
 class PropertyName(str, Enum):
     text = "text"
     # ntype = "ntype"
+    emb_hash = "emb_hash"
 
 
 class PropertySchema(BaseModel):  # type: ignore[no-any-unimported]
@@ -62,6 +82,15 @@ class CollectionSchema(BaseModel):
     properties: List[PropertySchema]
 
 
+def get_emb_hash_property_schema() -> PropertySchema:
+    return PropertySchema(
+        name=PropertyName.emb_hash,
+        description="Digest of the embedding with which unchanged embeddings are "
+        "skipped during upsert",
+        data_type=DataType.TEXT,
+    )
+
+
 def get_word_collection_schema() -> CollectionSchema:
     word_collection = CollectionSchema(
         name=CollectionName.word,
@@ -71,7 +100,8 @@ def get_word_collection_schema() -> CollectionSchema:
                 name=PropertyName.text,
                 description="Text from which average word vector is derived",
                 data_type=DataType.TEXT,
-            )
+            ),
+            get_emb_hash_property_schema(),
         ],
     )
 
@@ -88,6 +118,7 @@ def get_sent_collection_schema() -> CollectionSchema:
                 description="Text from which sentence transformer embedding is derived",
                 data_type=DataType.TEXT,
             ),
+            get_emb_hash_property_schema(),
         ],
     )
 
@@ -100,6 +131,234 @@ NameToSchema: Dict[CollectionName, CollectionSchema] = {
 }
 
 
+#
+# Ingestion
+#
+
+
+class IngestConfig(BaseModel):
+    # Number of objects per request
+    batch_size: int = 100
+    # Number of requests awaiting a response at any time, beyond which reading
+    # further objects is paused
+    max_in_flight: int = 4
+    # Number of times objects which failed are resent
+    max_retries: int = 3
+    # Delay before the first retry, doubled on every further retry
+    backoff_s: float = 0.5
+    max_backoff_s: float = 8.0
+
+
+@dataclass
+class BatchMetrics:
+    i_batch: int
+    n_object: int
+    # Objects which still failed after all retries
+    n_failed: int
+    n_retry: int
+    latency_s: float
+
+    @property
+    def objects_per_s(self) -> float:
+        return self.n_object / self.latency_s if self.latency_s > 0 else 0.0
+
+
+@dataclass
+class IngestReport:
+    batches: List[BatchMetrics] = field(default_factory=list)
+    elapsed_s: float = 0.0
+
+    @property
+    def n_object(self) -> int:
+        return sum(metrics.n_object for metrics in self.batches)
+
+    @property
+    def n_failed(self) -> int:
+        return sum(metrics.n_failed for metrics in self.batches)
+
+    @property
+    def n_retry(self) -> int:
+        return sum(metrics.n_retry for metrics in self.batches)
+
+    @property
+    def objects_per_s(self) -> float:
+        return self.n_object / self.elapsed_s if self.elapsed_s > 0 else 0.0
+
+    def add(self, metrics: BatchMetrics) -> None:
+        self.batches.append(metrics)
+
+        logger.info(
+            f"Batch {metrics.i_batch} sent {metrics.n_object} objects in "
+            f"{metrics.latency_s:.3f}s ({metrics.objects_per_s:.0f} objects/s) "
+            f"with {metrics.n_retry} retries and {metrics.n_failed} failed objects"
+        )
+
+    def report(self) -> None:
+        latency = np.array([metrics.latency_s for metrics in self.batches])
+        p50, p95 = np.percentile(latency, [50, 95]) if len(latency) > 0 else (0, 0)
+
+        logger.info(
+            f"Ingested {self.n_object - self.n_failed} of {self.n_object} objects "
+            f"in {len(self.batches)} batches within {self.elapsed_s:.2f}s "
+            f"({self.objects_per_s:.0f} objects/s), batch latency p50 {p50:.3f}s "
+            f"p95 {p95:.3f}s, {self.n_retry} retries"
+        )
+        if self.n_failed > 0:
+            logger.warning(f"{self.n_failed} objects failed after all retries")
+
+
+class BatchTransport(Protocol):
+    def send(self, objects: List[Dict[str, Any]]) -> List[Optional[str]]:
+        """Sends objects in a single request and returns an error message, or
+        None on success, per object"""
+        ...
+
+
+class RestBatchTransport:
+    """Sends objects to the REST batch endpoint of a vector database over a
+    pool of keep-alive connections shared across threads"""
+
+    PATH: str = "/v1/batch/objects"
+
+    def __init__(
+        self,
+        end_point: Optional[VectorDBEndPoint] = None,
+        timeout_s: float = 60.0,
+        max_connections: int = 16,
+    ) -> None:
+        if end_point is None:
+            end_point = VectorDBEndPoint()
+
+        self.client = httpx.Client(
+            base_url=str(end_point.url),
+            timeout=timeout_s,
+            limits=httpx.Limits(max_connections=max_connections),
+        )
+
+    def send(self, objects: List[Dict[str, Any]]) -> List[Optional[str]]:
+        response = self.client.post(
+            self.PATH,
+            content=orjson.dumps(
+                {"objects": objects}, option=orjson.OPT_SERIALIZE_NUMPY
+            ),
+            headers={"Content-Type": "application/json"},
+        )
+        response.raise_for_status()
+
+        return [batch_error(result) for result in response.json()]
+
+    def close(self) -> None:
+        self.client.close()
+
+    def __enter__(self) -> "RestBatchTransport":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+
+def batch_error(result: Dict[str, Any]) -> Optional[str]:
+    """Error message of an object in a batch response, if any"""
+    errors = (result.get("result") or {}).get("errors")
+    if not errors:
+        return None
+
+    return "; ".join(str(error.get("message")) for error in errors.get("error", []))
+
+
+def iter_batches(
+    objects: Iterable[Dict[str, Any]], batch_size: int
+) -> Iterator[List[Dict[str, Any]]]:
+    iterator = iter(objects)
+    while batch := list(islice(iterator, batch_size)):
+        yield batch
+
+
+def send_with_retry(
+    transport: BatchTransport,
+    batch: List[Dict[str, Any]],
+    i_batch: int,
+    ingest_config: IngestConfig,
+) -> BatchMetrics:
+    """Sends a batch, resending only failed objects with exponential backoff"""
+    start = time.perf_counter()
+    pending = batch
+    n_retry = 0
+
+    for attempt in range(ingest_config.max_retries + 1):
+        if attempt > 0:
+            n_retry += 1
+            time.sleep(
+                min(
+                    ingest_config.backoff_s * 2 ** (attempt - 1),
+                    ingest_config.max_backoff_s,
+                )
+            )
+
+        try:
+            errors = transport.send(pending)
+        except (httpx.HTTPError, OSError) as e:
+            # The whole request failed, e.g. a timeout or an unavailable server
+            errors = [str(e)] * len(pending)
+
+        failed = [obj for obj, error in zip(pending, errors) if error is not None]
+        if len(failed) > 0:
+            logger.debug(
+                f"Batch {i_batch} attempt {attempt} has {len(failed)} failed "
+                f"objects, e.g. {next(e for e in errors if e is not None)}"
+            )
+        pending = failed
+        if len(pending) == 0:
+            break
+
+    return BatchMetrics(
+        i_batch=i_batch,
+        n_object=len(batch),
+        n_failed=len(pending),
+        n_retry=n_retry,
+        latency_s=time.perf_counter() - start,
+    )
+
+
+def ingest(
+    objects: Iterable[Dict[str, Any]],
+    transport: BatchTransport,
+    ingest_config: Optional[IngestConfig] = None,
+) -> IngestReport:
+    """Sends objects in fixed size batches with a bounded number of concurrent
+    requests. Objects are read lazily, only as fast as batches complete"""
+    if ingest_config is None:
+        ingest_config = IngestConfig()
+
+    report = IngestReport()
+    start = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=ingest_config.max_in_flight) as executor:
+        in_flight: Set[Future[BatchMetrics]] = set()
+        for i_batch, batch in enumerate(
+            iter_batches(objects=objects, batch_size=ingest_config.batch_size)
+        ):
+            # Backpressure
+            if len(in_flight) >= ingest_config.max_in_flight:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    report.add(future.result())
+
+            in_flight.add(
+                executor.submit(
+                    send_with_retry, transport, batch, i_batch, ingest_config
+                )
+            )
+
+        for future in in_flight:
+            report.add(future.result())
+
+    report.elapsed_s = time.perf_counter() - start
+    report.report()
+
+    return report
+
+
 #
 # Declaratives
 #
@@ -121,26 +380,24 @@ def add_collections(  # type: ignore[no-any-unimported]
         logger.info(f"Added schema for collection {schema.name.value}")
 
 
-# TODO: Add a test for this function once the dev understands how batch.dynamic() works
 def batch_import(  # type: ignore[no-any-unimported]
     client: WeaviateClient,
     collection_name: CollectionName,
     text: np.ndarray,
     emb: np.ndarray,
-) -> None:
+    transport: BatchTransport,
+    ingest_config: Optional[IngestConfig] = None,
+) -> IngestReport:
     logger.info(
         f"Batch importing text array shaped {text.shape} and "
         f"embedding array shaped {emb.shape} to a vector database"
     )
 
-    # Execute batch import
-    with client.batch.dynamic() as batch:
-        for i in range(len(text)):
-            _ = batch.add_object(
-                collection=collection_name.value,
-                properties={"name": text[i], "data_type": DataType.TEXT},
-                vector=emb[i],
-            )
+    objects = validated_objects(
+        collection_name=collection_name,
+        objects=iter_objects(collection_name=collection_name, text=text, emb=emb),
+    )
+    report = ingest(objects=objects, transport=transport, ingest_config=ingest_config)
 
     dict_n_imported = client.collections.get(collection_name.value).aggregate.over_all(
         total_count=True
@@ -150,6 +407,242 @@ def batch_import(  # type: ignore[no-any-unimported]
         f"in collection {collection_name.value}"
     )
 
+    return report
+
+
+class ImportMode(str, Enum):
+    # Drop and recreate the collection before importing every embedding
+    replace_all = "replace"
+    # Insert or overwrite only objects whose embedding changed
+    upsert = "upsert"
+
+
+# Number of object ids per filter when querying or deleting objects by id
+IDS_PER_REQUEST = 1000
+
+
+def object_uuids(collection_name: CollectionName, text: np.ndarray) -> List[str]:
+    """Deterministic object ids so that the same text always maps to the same
+    object of a collection"""
+    return [
+        generate_uuid5(identifier=a_text, namespace=collection_name.value)
+        for a_text in text.tolist()
+    ]
+
+
+def emb_hashes(emb: np.ndarray) -> List[str]:
+    """Digests of embedding rows, invariant to the stored floating point type"""
+    emb_f32 = np.ascontiguousarray(emb, dtype=np.float32)
+
+    return [
+        hashlib.blake2b(row.tobytes(), digest_size=16).hexdigest() for row in emb_f32
+    ]
+
+
+# Python types of property values accepted for each data type of a schema
+DATA_TYPE_TO_PYTHON_TYPES: Dict[DataType, Tuple[type, ...]] = {  # type: ignore[no-any-unimported]
+    DataType.TEXT: (str,),
+    DataType.INT: (int,),
+    DataType.NUMBER: (int, float),
+    DataType.BOOL: (bool,),
+}
+
+
+def object_properties(a_text: str, a_hash: str) -> Dict[str, Any]:
+    """Properties of an object sent to a collection, the single definition
+    which objects are built and validated from"""
+    return {
+        PropertyName.text.value: a_text,
+        PropertyName.emb_hash.value: a_hash,
+    }
+
+
+def validate_object_properties(
+    collection_name: CollectionName, properties: Dict[str, Any]
+) -> None:
+    """Checks the properties of an object actually sent against the names and
+    data types of the schema of its collection"""
+    schema = NameToSchema[collection_name]
+    name_to_data_type = {
+        property_schema.name.value: property_schema.data_type
+        for property_schema in schema.properties
+    }
+    if set(properties) != set(name_to_data_type):
+        raise ValueError(
+            f"Object properties {sorted(properties)} do not match properties "
+            f"{sorted(name_to_data_type)} of collection {collection_name.value}"
+        )
+
+    for name, value in properties.items():
+        python_types = DATA_TYPE_TO_PYTHON_TYPES.get(name_to_data_type[name])
+        if python_types is not None and not isinstance(value, python_types):
+            raise ValueError(
+                f"Object property {name} holds a {type(value).__name__} which does "
+                f"not match data type {name_to_data_type[name]} of collection "
+                f"{collection_name.value}"
+            )
+
+
+def validated_objects(
+    collection_name: CollectionName, objects: Iterable[Dict[str, Any]]
+) -> Iterator[Dict[str, Any]]:
+    """Validates the first object against the schema before any is sent, as
+    every object is built alike"""
+    iterator = iter(objects)
+    for first in iterator:
+        validate_object_properties(
+            collection_name=collection_name, properties=first["properties"]
+        )
+        yield first
+        break
+    yield from iterator
+
+
+def iter_objects(
+    collection_name: CollectionName,
+    text: np.ndarray,
+    emb: np.ndarray,
+    uuids: Optional[List[str]] = None,
+    hashes: Optional[List[str]] = None,
+) -> Iterator[Dict[str, Any]]:
+    """Objects whose vectors are row views of a single C-contiguous float32 copy
+    of the embedding matrix, serialised without per row copies. Ids and
+    embedding digests already computed by the caller are reused"""
+    emb_f32 = np.ascontiguousarray(emb, dtype=np.float32)
+    if uuids is None:
+        uuids = object_uuids(collection_name=collection_name, text=text)
+    if hashes is None:
+        hashes = emb_hashes(emb_f32)
+
+    for a_uuid, a_text, a_hash, vector in zip(uuids, text.tolist(), hashes, emb_f32):
+        yield {
+            "class": collection_name.value,
+            "id": a_uuid,
+            "properties": object_properties(a_text=a_text, a_hash=a_hash),
+            "vector": vector,
+        }
+
+
+def fetch_emb_hashes(  # type: ignore[no-any-unimported]
+    client: WeaviateClient, collection_name: CollectionName, uuids: List[str]
+) -> Dict[str, Optional[str]]:
+    """Embedding digests of the objects among the given ids which exist"""
+    collection = client.collections.get(collection_name.value)
+
+    uuid_to_hash: Dict[str, Optional[str]] = {}
+    for start in range(0, len(uuids), IDS_PER_REQUEST):
+        some_uuids = uuids[start : start + IDS_PER_REQUEST]
+        response = collection.query.fetch_objects(
+            filters=Filter.by_id().contains_any(some_uuids),
+            limit=len(some_uuids),
+            return_properties=[PropertyName.emb_hash.value],
+        )
+        for obj in response.objects:
+            a_hash = obj.properties.get(PropertyName.emb_hash.value)
+            uuid_to_hash[str(obj.uuid)] = None if a_hash is None else str(a_hash)
+
+    return uuid_to_hash
+
+
+def scan_object_uuids(  # type: ignore[no-any-unimported]
+    client: WeaviateClient, collection_name: CollectionName
+) -> Set[str]:
+    """Ids of every object of a collection, listed one page at a time"""
+    collection = client.collections.get(collection_name.value)
+
+    return {str(obj.uuid) for obj in collection.iterator(return_properties=[])}
+
+
+def del_objects(  # type: ignore[no-any-unimported]
+    client: WeaviateClient, collection_name: CollectionName, uuids: List[str]
+) -> int:
+    collection = client.collections.get(collection_name.value)
+    for start in range(0, len(uuids), IDS_PER_REQUEST):
+        collection.data.delete_many(
+            where=Filter.by_id().contains_any(uuids[start : start + IDS_PER_REQUEST])
+        )
+
+    return len(uuids)
+
+
+@dataclass
+class UpsertReport:
+    ingest_report: IngestReport
+    # Ids of every object of the texts upserted, to be recorded as uploaded
+    uuids: Set[str]
+    n_deleted: int
+
+
+def batch_upsert(  # type: ignore[no-any-unimported]
+    client: WeaviateClient,
+    collection_name: CollectionName,
+    chunks: Iterable[Tuple[np.ndarray, np.ndarray]],
+    transport: BatchTransport,
+    ingest_config: Optional[IngestConfig] = None,
+    previous_uuids: Optional[Set[str]] = None,
+) -> UpsertReport:
+    """Streams chunks of texts and embeddings into a collection, sending only
+    objects which are missing or whose embedding changed, and deletes objects of
+    texts no longer present
+
+    Stale objects are those uploaded previously, as recorded by an upload
+    manifest, whose texts are absent now. Without a manifest the collection is
+    listed once instead"""
+    seen: Set[str] = set()
+
+    def iter_changed_objects() -> Iterator[Dict[str, Any]]:
+        for text, emb in chunks:
+            uuids = object_uuids(collection_name=collection_name, text=text)
+            hashes = emb_hashes(emb)
+            uuid_to_hash = fetch_emb_hashes(
+                client=client, collection_name=collection_name, uuids=uuids
+            )
+            changed = [
+                i
+                for i, (a_uuid, a_hash) in enumerate(zip(uuids, hashes))
+                if uuid_to_hash.get(a_uuid) != a_hash
+            ]
+            seen.update(uuids)
+            logger.info(f"{len(changed)} of {len(uuids)} objects in chunk changed")
+
+            yield from iter_objects(
+                collection_name=collection_name,
+                text=text[changed],
+                emb=emb[changed],
+                uuids=[uuids[i] for i in changed],
+                hashes=[hashes[i] for i in changed],
+            )
+
+    report = ingest(
+        objects=validated_objects(
+            collection_name=collection_name, objects=iter_changed_objects()
+        ),
+        transport=transport,
+        ingest_config=ingest_config,
+    )
+
+    if previous_uuids is None:
+        logger.warning(
+            f"No upload manifest of collection {collection_name.value} is given, "
+            "so the collection is listed to find stale objects"
+        )
+        previous_uuids = scan_object_uuids(
+            client=client, collection_name=collection_name
+        )
+    n_deleted = del_objects(
+        client=client,
+        collection_name=collection_name,
+        uuids=sorted(previous_uuids - seen),
+    )
+    logger.info(
+        f"Upsert into collection {collection_name.value} sent {report.n_object} "
+        f"changed objects, skipped {len(seen) - report.n_object} unchanged "
+        f"objects and deleted {n_deleted} stale objects. Failed objects are "
+        "retried on the next run"
+    )
+
+    return UpsertReport(ingest_report=report, uuids=seen, n_deleted=n_deleted)
+
 
 def collection_exists(  # type: ignore[no-any-unimported]
     client: WeaviateClient,
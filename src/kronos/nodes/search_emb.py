@@ -0,0 +1,301 @@
+import hashlib
+import logging
+from dataclasses import dataclass
+from enum import Enum
+from typing import List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Number of embedding rows scored per matrix multiplication
+DEFAULT_BLOCK_SIZE = 16_384
+
+
+class SearchIndexType(str, Enum):
+    # Blocked matrix multiplication over every embedding
+    exact = "exact"
+    # Inverted file index over k-means clusters of embeddings
+    ivf = "ivf"
+
+
+class SearchResult(NamedTuple):
+    # Cosine similarities shaped (n_query, k) in descending order
+    scores: np.ndarray
+    # Embedding row indices shaped (n_query, k), -1 where fewer than k exist
+    indices: np.ndarray
+
+
+def normalise_rows(emb: np.ndarray) -> np.ndarray:
+    """Casts to float32 and scales rows to unit length, leaving zero rows"""
+    emb_f32 = np.asarray(emb, dtype=np.float32)
+    norm = np.linalg.norm(emb_f32, axis=1, keepdims=True)
+
+    return emb_f32 / np.where(norm > 0, norm, 1)
+
+
+def merge_top_k(
+    scores: np.ndarray, indices: np.ndarray, k: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Keeps the k highest scores of every row, sorted in descending order"""
+    if scores.shape[1] > k:
+        part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        scores = np.take_along_axis(scores, part, axis=1)
+        indices = np.take_along_axis(indices, part, axis=1)
+
+    order = np.argsort(-scores, axis=1, kind="stable")
+
+    return (
+        np.take_along_axis(scores, order, axis=1),
+        np.take_along_axis(indices, order, axis=1),
+    )
+
+
+def pad_result(scores: np.ndarray, indices: np.ndarray, k: int) -> SearchResult:
+    n_missing = k - scores.shape[1]
+    if n_missing > 0:
+        scores = np.pad(scores, ((0, 0), (0, n_missing)), constant_values=-np.inf)
+        indices = np.pad(indices, ((0, 0), (0, n_missing)), constant_values=-1)
+
+    return SearchResult(scores=scores, indices=indices)
+
+
+def exact_search(
+    query: np.ndarray,
+    emb: np.ndarray,
+    k: int,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+) -> SearchResult:
+    """Top k cosine similarities of queries against all embeddings. Embeddings
+    are normalised block by block, so a memory-mapped matrix is paged in one
+    block at a time"""
+    query_norm = normalise_rows(np.atleast_2d(query))
+    scores = np.zeros((len(query_norm), 0), dtype=np.float32)
+    indices = np.zeros((len(query_norm), 0), dtype=np.int64)
+
+    for start in range(0, emb.shape[0], block_size):
+        block = normalise_rows(emb[start : start + block_size])
+        block_scores = query_norm @ block.T
+        block_indices = np.broadcast_to(
+            np.arange(start, start + len(block)), block_scores.shape
+        )
+        scores, indices = merge_top_k(
+            scores=np.concatenate([scores, block_scores], axis=1),
+            indices=np.concatenate([indices, block_indices], axis=1),
+            k=k,
+        )
+
+    return pad_result(scores=scores, indices=indices, k=k)
+
+
+def emb_digest(emb: np.ndarray, block_size: int = DEFAULT_BLOCK_SIZE) -> str:
+    """Digest of the shape, dtype and every value of an embedding matrix, used
+    to detect stale indices. Blocks of rows are hashed in turn so that only
+    one block of a memory-mapped matrix is paged in at a time"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{emb.shape}{emb.dtype}".encode("utf-8"))
+    for start in range(0, emb.shape[0], block_size):
+        digest.update(np.ascontiguousarray(emb[start : start + block_size]).data)
+
+    return digest.hexdigest()
+
+
+def assign_to_centroids(
+    emb: np.ndarray, centroids: np.ndarray, block_size: int = DEFAULT_BLOCK_SIZE
+) -> np.ndarray:
+    """Index of the most similar centroid of every embedding"""
+    return np.concatenate(
+        [
+            np.argmax(normalise_rows(emb[start : start + block_size]) @ centroids.T, 1)
+            for start in range(0, emb.shape[0], block_size)
+        ]
+    )
+
+
+def update_centroids(
+    sample: np.ndarray, assignment: np.ndarray, centroids: np.ndarray
+) -> np.ndarray:
+    """Spherical k-means step. Clusters left empty keep their centroid"""
+    order = np.argsort(assignment, kind="stable")
+    counts = np.bincount(assignment, minlength=len(centroids))
+    is_filled = counts > 0
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])[is_filled]
+
+    sums = centroids.copy()
+    sums[is_filled] = np.add.reduceat(sample[order], starts, axis=0)
+
+    return normalise_rows(sums)
+
+
+@dataclass
+class IVFIndex:
+    # Unit length cluster centroids shaped (n_list, dim)
+    centroids: np.ndarray
+    # Embedding row indices grouped by cluster
+    order: np.ndarray
+    # Offsets into order at which each cluster starts, shaped (n_list + 1,)
+    starts: np.ndarray
+    # Fingerprint of the embeddings the index was built from
+    digest: str
+
+    @property
+    def n_list(self) -> int:
+        return len(self.centroids)
+
+    @classmethod
+    def build(
+        cls,
+        emb: np.ndarray,
+        n_list: int,
+        n_iter: int = 10,
+        n_sample_per_list: int = 64,
+        block_size: int = DEFAULT_BLOCK_SIZE,
+        seed: int = 0,
+        digest: Optional[str] = None,
+    ) -> "IVFIndex":
+        """Clusters embeddings with spherical k-means trained on a sample. The
+        digest of the embeddings is computed unless already known"""
+        n_row = emb.shape[0]
+        if n_row == 0:
+            raise ValueError("An IVF index cannot be built from no embeddings")
+
+        rng = np.random.default_rng(seed)
+        n_list = max(1, min(n_list, n_row))
+
+        n_sample = min(n_row, n_list * n_sample_per_list)
+        sample_rows = np.sort(rng.choice(n_row, size=n_sample, replace=False))
+        sample = normalise_rows(emb[sample_rows])
+        centroids = sample[rng.choice(n_sample, size=n_list, replace=False)]
+
+        for _ in range(n_iter):
+            assignment = np.argmax(sample @ centroids.T, axis=1)
+            centroids = update_centroids(
+                sample=sample, assignment=assignment, centroids=centroids
+            )
+
+        assignment = assign_to_centroids(
+            emb=emb, centroids=centroids, block_size=block_size
+        )
+        order = np.argsort(assignment, kind="stable")
+        starts = np.zeros(n_list + 1, dtype=np.int64)
+        np.cumsum(np.bincount(assignment, minlength=n_list), out=starts[1:])
+
+        logger.info(
+            f"Built an IVF index of {n_list} lists over {n_row} embeddings, "
+            f"largest list has {int(np.diff(starts).max())} embeddings"
+        )
+
+        return cls(
+            centroids=centroids,
+            order=order,
+            starts=starts,
+            digest=(
+                emb_digest(emb=emb, block_size=block_size) if digest is None else digest
+            ),
+        )
+
+    def search(
+        self, query: np.ndarray, emb: np.ndarray, k: int, n_probe: int = 8
+    ) -> SearchResult:
+        """Scores only embeddings in the n_probe lists closest to each query.
+        Every probed list is paged in and normalised once for all queries
+        probing it"""
+        query_norm = normalise_rows(np.atleast_2d(query))
+        n_probe = max(1, min(n_probe, self.n_list))
+        probes = np.argsort(-(query_norm @ self.centroids.T), axis=1)[:, :n_probe]
+
+        # Query indices grouped by the list they probe
+        probe_queries = np.argsort(probes.ravel(), kind="stable") // n_probe
+        probe_counts = np.bincount(probes.ravel(), minlength=self.n_list)
+        probe_starts = np.concatenate([[0], np.cumsum(probe_counts)])
+
+        query_scores: List[List[np.ndarray]] = [[] for _ in range(len(query_norm))]
+        query_indices: List[List[np.ndarray]] = [[] for _ in range(len(query_norm))]
+        for i in np.flatnonzero(probe_counts):
+            rows = self.order[self.starts[i] : self.starts[i + 1]]
+            queries = probe_queries[probe_starts[i] : probe_starts[i + 1]]
+            scores, indices = merge_top_k(
+                scores=query_norm[queries] @ normalise_rows(emb[rows]).T,
+                indices=np.broadcast_to(rows, (len(queries), len(rows))),
+                k=k,
+            )
+            for j, a_query in enumerate(queries):
+                query_scores[a_query].append(scores[j])
+                query_indices[a_query].append(indices[j])
+
+        results = [
+            pad_result(
+                *merge_top_k(
+                    scores=np.concatenate(a_scores)[None, :],
+                    indices=np.concatenate(a_indices)[None, :],
+                    k=k,
+                ),
+                k=k,
+            )
+            for a_scores, a_indices in zip(query_scores, query_indices)
+        ]
+
+        return SearchResult(
+            scores=np.concatenate([result.scores for result in results]),
+            indices=np.concatenate([result.indices for result in results]),
+        )
+
+
+def recall_at_k(approx_indices: np.ndarray, exact_indices: np.ndarray) -> float:
+    """Fraction of exact top k neighbours retrieved by an approximate search"""
+    n_hit = sum(
+        len(np.intersect1d(a, e[e >= 0])) for a, e in zip(approx_indices, exact_indices)
+    )
+    n_total = int((exact_indices >= 0).sum())
+
+    return n_hit / n_total if n_total > 0 else 1.0
+
+
+class EmbSearcher:
+    """Batch top k nearest neighbour search over a text embedding array"""
+
+    def __init__(
+        self,
+        text: np.ndarray,
+        emb: np.ndarray,
+        ivf_index: Optional[IVFIndex] = None,
+        block_size: int = DEFAULT_BLOCK_SIZE,
+        digest: Optional[str] = None,
+    ) -> None:
+        if ivf_index is not None:
+            if digest is None:
+                digest = emb_digest(emb=emb, block_size=block_size)
+            if ivf_index.digest != digest:
+                raise ValueError("IVF index was built from different embeddings")
+
+        self.text = text
+        self.emb = emb
+        self.ivf_index = ivf_index
+        self.block_size = block_size
+
+    def search(self, query: np.ndarray, k: int, n_probe: int = 8) -> SearchResult:
+        if self.ivf_index is None:
+            return exact_search(
+                query=query, emb=self.emb, k=k, block_size=self.block_size
+            )
+
+        return self.ivf_index.search(query=query, emb=self.emb, k=k, n_probe=n_probe)
+
+    def query_emb_of_texts(self, query_text: List[str]) -> np.ndarray:
+        """Embeddings of queries which are texts present in the embedding array"""
+        text_to_row = {a_text: i for i, a_text in enumerate(self.text.tolist())}
+        missing = [a_text for a_text in query_text if a_text not in text_to_row]
+        if len(missing) > 0:
+            raise ValueError(f"Query texts {missing} have no embedding")
+
+        return np.asarray(self.emb[[text_to_row[a_text] for a_text in query_text]])
+
+    def neighbour_texts(self, result: SearchResult) -> List[List[Tuple[str, float]]]:
+        return [
+            [
+                (str(self.text[i]), float(score))
+                for i, score in zip(indices, scores)
+                if i >= 0
+            ]
+            for indices, scores in zip(result.indices, result.scores)
+        ]
@@ -0,0 +1,38 @@
+from typing import List
+
+import numpy as np
+
+
+def token_budget_batches(
+    lengths: np.ndarray, max_batch_tokens: int, max_batch_size: int = 256
+) -> List[np.ndarray]:
+    """Groups positions of texts into batches of similar token lengths.
+
+    Positions are sorted by length and greedily appended to the current batch
+    while the batch padded to its longest text stays within the token budget.
+    A text longer than the budget on its own still forms a batch of one.
+    """
+    if max_batch_tokens < 1 or max_batch_size < 1:
+        raise ValueError("Token budget and batch size have to be positive")
+
+    order = np.argsort(lengths, kind="stable")
+
+    batches: List[np.ndarray] = []
+    start = 0
+    for end in range(1, len(order) + 1):
+        # Lengths are ascending so the padded size is the count times the last
+        n = end - start
+        is_full = n >= max_batch_size or (
+            end < len(order) and (n + 1) * int(lengths[order[end]]) > max_batch_tokens
+        )
+        if end == len(order) or is_full:
+            batches.append(order[start:end])
+            start = end
+
+    return batches
+
+
+def padded_token_count(lengths: np.ndarray, batches: List[np.ndarray]) -> int:
+    """Number of token positions processed when each batch is padded to its
+    longest text, padding included"""
+    return sum(len(batch) * int(lengths[batch].max()) for batch in batches)
@@ -0,0 +1,139 @@
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+from kronos.data_interfaces.edge_dfs_data_interface import EdgeAttrKey, EdgeDF, EdgeType
+from kronos.data_interfaces.node_dfs_data_interface import (
+    NodeAttrKey,
+    NodeDF,
+    NodeType,
+)
+
+# Type code of growable int32 buffers
+INT32_TYPECODE = "i"
+
+
+def int32_array(buffer: array) -> np.ndarray:
+    """Views a growable int32 buffer as a numpy array without copying"""
+    return np.frombuffer(buffer, dtype=np.int32)
+
+
+def constant_categorical(value: str, n: int) -> pd.Categorical:
+    """Repeats a single string n times as a one category categorical"""
+    return pd.Categorical.from_codes(
+        np.zeros(n, dtype=np.int8), categories=pd.Index([value])
+    )
+
+
+def iter_attr_dicts(df: DataFrame, attr_keys: List[str]) -> Iterator[Dict[str, Any]]:
+    """Builds one attribute dict per row from whole columns converted to native
+    python values at once rather than from per row records"""
+    keys = [str(attr_key) for attr_key in attr_keys]
+    columns = [df[attr_key].tolist() for attr_key in attr_keys]
+
+    if len(columns) == 0:  # Rows without attributes still need a dict each
+        for _ in range(len(df)):
+            yield {}
+
+        return
+
+    for values in zip(*columns):
+        yield dict(zip(keys, values))
+
+
+def node_df_from_texts(ntype: NodeType, texts: Sequence[str]) -> NodeDF:
+    """Materialises a node dataframe whose node ids are positions of texts"""
+    n = len(texts)
+    df = DataFrame(
+        {
+            NodeAttrKey.nid.value: np.arange(n, dtype=np.int32),
+            NodeAttrKey.ntype.value: constant_categorical(ntype.value, n),
+            NodeAttrKey.text.value: pd.Series(list(texts), dtype=object),
+        }
+    )
+
+    return NodeDF(ntype=ntype, df=df)
+
+
+def edge_df_from_arrays(
+    etype: EdgeType,
+    src_ntype: NodeType,
+    dst_ntype: NodeType,
+    src_nid: np.ndarray,
+    dst_nid: np.ndarray,
+    attrs: Dict[EdgeAttrKey, np.ndarray],
+) -> EdgeDF:
+    """Materialises an edge dataframe of one canonical edge type from int32
+    columns, with constant node and edge types as one category categoricals"""
+    n = len(src_nid)
+    data = {
+        EdgeAttrKey.src_nid.value: src_nid,
+        EdgeAttrKey.dst_nid.value: dst_nid,
+        EdgeAttrKey.src_ntype.value: constant_categorical(src_ntype.value, n),
+        EdgeAttrKey.etype.value: constant_categorical(etype.value, n),
+        EdgeAttrKey.dst_ntype.value: constant_categorical(dst_ntype.value, n),
+    }
+    for attr_key, attr_array in attrs.items():
+        data[attr_key.value] = attr_array
+
+    return EdgeDF(etype=etype, df=DataFrame(data))
+
+
+class EdgeDFBuilder:
+    """Accumulates edges of one canonical edge type into growable int32 columns
+    and materialises them as an edge dataframe once at the end"""
+
+    def __init__(
+        self,
+        etype: EdgeType,
+        src_ntype: NodeType,
+        dst_ntype: NodeType,
+        attr_keys: Tuple[EdgeAttrKey, ...] = (),
+    ) -> None:
+        self.etype = etype
+        self.src_ntype = src_ntype
+        self.dst_ntype = dst_ntype
+        self.attr_keys = attr_keys
+
+        self.src_nid = array(INT32_TYPECODE)
+        self.dst_nid = array(INT32_TYPECODE)
+        self.attrs: Dict[EdgeAttrKey, array] = {
+            attr_key: array(INT32_TYPECODE) for attr_key in attr_keys
+        }
+
+    def append(self, src_nid: int, dst_nid: int, *attr_values: int) -> None:
+        self.src_nid.append(src_nid)
+        self.dst_nid.append(dst_nid)
+        for attr_key, attr_value in zip(self.attr_keys, attr_values):
+            self.attrs[attr_key].append(attr_value)
+
+    def extend(
+        self,
+        src_nid: Iterable[int],
+        dst_nid: Iterable[int],
+        *attr_values: Iterable[int],
+    ) -> None:
+        self.src_nid.extend(src_nid)
+        self.dst_nid.extend(dst_nid)
+        for attr_key, attr_value in zip(self.attr_keys, attr_values):
+            self.attrs[attr_key].extend(attr_value)
+
+    def __len__(self) -> int:
+        return len(self.src_nid)
+
+    def to_edge_df(self) -> EdgeDF:
+        # Dataframe construction copies the buffers so builders can be reused
+        return edge_df_from_arrays(
+            etype=self.etype,
+            src_ntype=self.src_ntype,
+            dst_ntype=self.dst_ntype,
+            src_nid=int32_array(self.src_nid),
+            dst_nid=int32_array(self.dst_nid),
+            attrs={
+                attr_key: int32_array(attr_array)
+                for attr_key, attr_array in self.attrs.items()
+            },
+        )
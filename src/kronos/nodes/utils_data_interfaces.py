@@ -1,4 +1,12 @@
+import os
+import tempfile
 from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
 
 VERSION_FORMAT = "%Y-%m-%dT%H.%M.%S.%fZ"
 
@@ -12,3 +20,74 @@ def generate_timestamp() -> str:
     """
     current_ts = datetime.now(tz=timezone.utc).strftime(VERSION_FORMAT)
     return current_ts[:-4] + current_ts[-1:]  # Don't keep microseconds
+
+
+def atomic_write_bytes(path: Path, content: bytes) -> None:
+    """Writes to a temporary file in the same directory first and swaps it in,
+    so that readers never see a partially written file. The temporary file is
+    removed if writing fails"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile(
+        "wb", dir=path.parent, prefix=f".{path.name}.", suffix=".tmp", delete=False
+    ) as f:
+        path_tmp = Path(f.name)
+    try:
+        path_tmp.write_bytes(content)
+        os.replace(path_tmp, path)
+    except BaseException:
+        path_tmp.unlink(missing_ok=True)
+        raise
+
+
+# Strings which python's float() may parse although pandas does not, e.g. with
+# digit group underscores or non-ascii digits
+FLOAT_LIKE_PATTERN = r"\s*[+\-]?[\d_.]+(?:[eE][+\-]?[\d_]+)?\s*"
+
+
+def convert_to_str(val: Any) -> Any:
+    """Truncates a number or a numeric string to an integer string, returning
+    anything else as-is"""
+    try:
+        # Attempt to convert to float first, then to int and to string
+        return str(int(float(val)))
+    except (ValueError, TypeError, OverflowError):
+        # Return the value as-is if it can't be converted
+        return val
+
+
+def normalise_sheet_cells(df: DataFrame) -> DataFrame:
+    """Replaces empty strings with nulls and rewrites every cell holding a
+    finite number as an integer string, e.g. year numbers read as 2024.0,
+    leaving other cells untouched
+
+    Sheets repeat the same strings over and over, so every distinct value is
+    parsed once and all distinct values are parsed at once by pandas. Only
+    the few strings pandas cannot parse but which look numeric fall back to
+    conversion one by one"""
+    values = df.to_numpy(dtype=object).ravel()
+    # Nulls are coded as -1 and left untouched
+    codes, uniques = pd.factorize(values)
+    uniques = np.asarray(uniques, dtype=object)
+
+    numbers = pd.to_numeric(pd.Series(uniques, dtype=object), errors="coerce")
+    numbers_f64 = numbers.to_numpy(dtype=np.float64)
+    is_finite = np.isfinite(numbers_f64)
+
+    normalised = uniques.copy()
+    normalised[is_finite] = [str(int(number)) for number in numbers_f64[is_finite]]
+
+    is_float_like = (
+        pd.Series(uniques, dtype=object)
+        .str.fullmatch(FLOAT_LIKE_PATTERN, na=False)
+        .to_numpy(dtype=bool)
+    )
+    fallback = np.flatnonzero(is_float_like & np.isnan(numbers_f64))
+    normalised[fallback] = [convert_to_str(v) for v in uniques[fallback]]
+
+    normalised[uniques == ""] = np.nan
+
+    return DataFrame(
+        np.where(codes >= 0, normalised[codes], values).reshape(df.shape),
+        index=df.index,
+        columns=df.columns,
+    ).infer_objects()
@@ -1,7 +1,14 @@
+from enum import Enum
 from io import StringIO
-from typing import Any
+from pathlib import Path
+from typing import Any, Dict, List, Optional
 
+import orjson
 import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
 from pandas import DataFrame
 
 
@@ -19,3 +26,135 @@ def df_type_hook(json_str_df: str) -> DataFrame:
     df = pd.read_json(StringIO(json_str_df), orient="table")
 
     return df
+
+
+#
+# Directory-based binary columnar storage
+#
+
+
+class DFsFormat(str, Enum):
+    json = "json"
+    parquet = "parquet"
+    arrow = "arrow"
+
+
+MANIFEST_NAME = "manifest.json"
+
+
+def dfs_format_from_path(filepath: Path) -> DFsFormat:
+    """Infers the storage format from the path suffix, defaulting to json"""
+    try:
+        return DFsFormat(filepath.suffix.lstrip(".").lower())
+    except ValueError:
+        return DFsFormat.json
+
+
+def save_dfs_dir(
+    dirpath: Path, member_key: str, members: Dict[str, DataFrame], fmt: DFsFormat
+) -> None:
+    """Saves one binary file per member dataframe plus a small manifest"""
+    if fmt == DFsFormat.json:
+        raise ValueError("Directory-based storage only supports binary formats")
+
+    dirpath.mkdir(parents=True, exist_ok=True)
+
+    manifest_members: List[Dict[str, Any]] = []
+    for name, df in members.items():
+        filename = f"{name}.{fmt.value}"
+        table = pa.Table.from_pandas(df)
+        if fmt == DFsFormat.parquet:
+            pq.write_table(table, dirpath / filename)
+        else:
+            # Uncompressed buffers can be memory-mapped without decoding
+            feather.write_feather(table, dirpath / filename, compression="uncompressed")
+        manifest_members.append(
+            {
+                member_key: name,
+                "file": filename,
+                "shape": list(df.shape),
+                "columns": [str(column) for column in df.columns],
+            }
+        )
+
+    manifest = {"format": fmt.value, "members": manifest_members}
+    with open(dirpath / MANIFEST_NAME, "wb") as f:
+        f.write(orjson.dumps(manifest, option=orjson.OPT_INDENT_2))
+
+
+def load_manifest(dirpath: Path) -> Dict[str, Any]:
+    with open(dirpath / MANIFEST_NAME, "rb") as f:
+        manifest: Dict[str, Any] = orjson.loads(f.read())
+
+    return manifest
+
+
+def _index_columns(schema: pa.Schema) -> List[str]:  # type: ignore[no-any-unimported]
+    # Range indices are stored as metadata rather than as columns
+    pandas_metadata = schema.pandas_metadata or {}
+    return [
+        column
+        for column in pandas_metadata.get("index_columns", [])
+        if isinstance(column, str)
+    ]
+
+
+def _list_columns_to_lists(  # type: ignore[no-any-unimported]
+    df: DataFrame, schema: pa.Schema
+) -> DataFrame:
+    # Nested values are restored as lists to match json deserialised dataframes
+    for arrow_field in schema:
+        if pa.types.is_list(arrow_field.type) and arrow_field.name in df.columns:
+            df[arrow_field.name] = [
+                value.tolist() if value is not None else None
+                for value in df[arrow_field.name]
+            ]
+
+    return df
+
+
+def load_df_file(
+    filepath: Path,
+    fmt: DFsFormat,
+    columns: Optional[List[str]] = None,
+    memory_map: bool = False,
+) -> DataFrame:
+    """Loads a single binary dataframe file, optionally reading only a subset
+    of columns through a memory map"""
+    if fmt == DFsFormat.parquet:
+        schema = pq.read_schema(filepath)
+    else:
+        with pa.memory_map(str(filepath)) as source:
+            schema = ipc.open_file(source).schema
+
+    read_columns: Optional[List[str]] = None
+    if columns is not None:
+        read_columns = [column for column in columns if column in schema.names]
+        read_columns.extend(_index_columns(schema))
+
+    if fmt == DFsFormat.parquet:
+        table = pq.read_table(filepath, columns=read_columns, memory_map=memory_map)
+    else:
+        table = feather.read_table(
+            filepath, columns=read_columns, memory_map=memory_map
+        )
+
+    return _list_columns_to_lists(table.to_pandas(), schema)
+
+
+def load_dfs_dir(
+    dirpath: Path,
+    member_key: str,
+    columns: Optional[List[str]] = None,
+    memory_map: bool = False,
+) -> Dict[str, DataFrame]:
+    """Loads member dataframes of a directory in manifest order"""
+    manifest = load_manifest(dirpath)
+    fmt = DFsFormat(manifest["format"])
+
+    return {
+        member[member_key]: load_df_file(
+            dirpath / member["file"], fmt=fmt, columns=columns, memory_map=memory_map
+        )
+        for member in manifest["members"]
+    }
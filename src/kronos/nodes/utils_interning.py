@@ -0,0 +1,40 @@
+from typing import Dict, Iterable, Iterator, List
+
+
+class InternTable:
+    """Maps strings to 0-indexed integer ids in order of first appearance.
+
+    Lookups are backed by a dict so interning is constant time regardless of
+    vocabulary size. Ids double as node ids of the node type being interned.
+    """
+
+    def __init__(self, texts: Iterable[str] = ()) -> None:
+        self._text_to_id: Dict[str, int] = {}
+        for text in texts:
+            self.intern(text)
+
+    def intern(self, text: str) -> int:
+        """Returns the id of a string, assigning the next free id if unseen"""
+        i = self._text_to_id.get(text)
+        if i is None:
+            i = len(self._text_to_id)
+            self._text_to_id[text] = i
+
+        return i
+
+    def id_of(self, text: str) -> int:
+        """Returns the id of a string which is expected to be interned already"""
+        return self._text_to_id[text]
+
+    def to_list(self) -> List[str]:
+        """Returns interned strings ordered by their ids"""
+        return list(self._text_to_id)
+
+    def __contains__(self, text: object) -> bool:
+        return text in self._text_to_id
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._text_to_id)
+
+    def __len__(self) -> int:
+        return len(self._text_to_id)
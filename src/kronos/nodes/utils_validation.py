@@ -0,0 +1,94 @@
+from typing import Dict, Iterable, List
+
+import numpy as np
+import pandas as pd
+
+# Number of offending ids quoted per node type in error messages
+N_EXAMPLE_IDS = 10
+
+
+def nids_by_ntype(ntype: pd.Series, nid: pd.Series) -> Dict[str, np.ndarray]:
+    """Splits node ids into one int64 array per node type value"""
+    codes, uniques = pd.factorize(ntype, sort=True)
+    nid_array = nid.to_numpy(dtype=np.int64)
+    if len(uniques) == 1 and (codes == 0).all():  # Common single node type case
+        return {str(uniques[0]): nid_array}
+
+    order = np.argsort(codes, kind="stable")
+    starts = np.searchsorted(codes[order], np.arange(len(uniques)))
+    groups = np.split(nid_array[order], starts[1:])
+
+    return {str(a_ntype): group for a_ntype, group in zip(uniques, groups)}
+
+
+def concat_nids_by_ntype(
+    list_nids_by_ntype: Iterable[Dict[str, np.ndarray]],
+) -> Dict[str, np.ndarray]:
+    """Concatenates node id arrays of identical node types"""
+    parts: Dict[str, List[np.ndarray]] = {}
+    for a_nids_by_ntype in list_nids_by_ntype:
+        for ntype, nids in a_nids_by_ntype.items():
+            parts.setdefault(ntype, []).append(nids)
+
+    return {ntype: np.concatenate(arrays) for ntype, arrays in parts.items()}
+
+
+def sorted_unique(nids: np.ndarray) -> np.ndarray:
+    """Sort based alternative to np.unique, which hashes large arrays slowly"""
+    sorted_nids = np.sort(nids)
+    is_first = np.ones(len(sorted_nids), dtype=bool)
+    is_first[1:] = sorted_nids[1:] != sorted_nids[:-1]
+
+    return sorted_nids[is_first]
+
+
+def isin_sorted(nids: np.ndarray, sorted_reference: np.ndarray) -> np.ndarray:
+    """Membership test of node ids in a sorted array of unique node ids"""
+    if len(sorted_reference) == 0:
+        return np.zeros(len(nids), dtype=bool)
+
+    positions = np.searchsorted(sorted_reference, nids)
+    positions[positions == len(sorted_reference)] = 0
+
+    return sorted_reference[positions] == nids  # type: ignore[no-any-return]
+
+
+def duplicate_nids(nids_by_ntype: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """Node ids occurring more than once per node type"""
+    duplicates: Dict[str, np.ndarray] = {}
+    for ntype, nids in nids_by_ntype.items():
+        sorted_nids = np.sort(nids)
+        is_repeat = sorted_nids[1:] == sorted_nids[:-1]
+        if is_repeat.any():
+            duplicates[ntype] = sorted_unique(sorted_nids[1:][is_repeat])
+
+    return duplicates
+
+
+def missing_nids(
+    nids_by_ntype: Dict[str, np.ndarray], reference_by_ntype: Dict[str, np.ndarray]
+) -> Dict[str, np.ndarray]:
+    """Sorted unique node ids per node type which do not occur in the reference
+    node ids"""
+    missing: Dict[str, np.ndarray] = {}
+    for ntype, nids in nids_by_ntype.items():
+        unique_nids = sorted_unique(nids)
+        reference = sorted_unique(
+            reference_by_ntype.get(ntype, np.zeros(0, dtype=np.int64))
+        )
+        a_missing = unique_nids[~isin_sorted(unique_nids, reference)]
+        if len(a_missing) > 0:
+            missing[ntype] = a_missing
+
+    return missing
+
+
+def describe_nids(nids_by_ntype: Dict[str, np.ndarray]) -> str:
+    """e.g. 'SheetCell: 3 ids such as [1, 4, 7]'"""
+    if len(nids_by_ntype) == 0:
+        return "none"
+
+    return "; ".join(
+        f"{ntype}: {len(nids)} ids such as {nids[:N_EXAMPLE_IDS].tolist()}"
+        for ntype, nids in nids_by_ntype.items()
+    )
@@ -1,13 +1,28 @@
+import hashlib
 import logging
 import multiprocessing
+import os
+import time
 from contextlib import contextmanager
-from typing import Generator, Iterable, List, Tuple
+from enum import Enum
+from pathlib import Path
+from typing import (
+    Callable,
+    Collection,
+    Dict,
+    Generator,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+)
 
 import numpy as np
 import pandas as pd
 from sentence_transformers import SentenceTransformer
 from spacy.language import Language
 
+from kronos.data_interfaces.emb_cache_data_interface import EmbCacheDataInterface
 from kronos.data_interfaces.node_dfs_data_interface import (
     TX_NTYPES,
     WV_NTYPES,
@@ -15,6 +30,8 @@ from kronos.data_interfaces.node_dfs_data_interface import (
     NodeDF,
     NodeDFs,
 )
+from kronos.nodes.add_nlp_feats import spacy_pipeline_name
+from kronos.nodes.utils_batching import padded_token_count, token_budget_batches
 
 logger = logging.getLogger(__name__)
 
@@ -42,14 +59,116 @@ def prep_emb_input(list_node_df: List[NodeDF]) -> List[str]:
     return text
 
 
+#
+# Embedding Cache
+#
+
+# Config, tokenizer and weights files of a sentence transformer directory,
+# which determine the embeddings it computes
+SENT_TX_MODEL_FILE_SUFFIXES = frozenset(
+    {".json", ".txt", ".model", ".safetensors", ".bin", ".pt", ".pth"}
+)
+
+
+def model_files_digest(
+    path_dir: Path, suffixes: Optional[Collection[str]] = None
+) -> str:
+    """Hash of the relative paths and contents of files in a model directory,
+    optionally only of those with given suffixes"""
+    digest = hashlib.blake2b(digest_size=16)
+    for path in sorted(path_dir.rglob("*")):
+        if not path.is_file() or (suffixes is not None and path.suffix not in suffixes):
+            continue
+
+        digest.update(path.relative_to(path_dir).as_posix().encode("utf-8") + b"\0")
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+
+    return digest.hexdigest()
+
+
+def sentence_transformer_identity(path_sentence_transformer: Path) -> str:
+    """Identity of a sentence transformer keying its cached embeddings, e.g.
+    all-MiniLM-L6-v2@<digest of its config, tokenizer and weights files>, so
+    that a retrained model saved to the same directory never hits stale ones"""
+    if not path_sentence_transformer.is_dir():
+        logger.warning(
+            f"{path_sentence_transformer} is not a local directory, so cached "
+            "embeddings are keyed by its name only"
+        )
+        return str(path_sentence_transformer)
+
+    digest = model_files_digest(
+        path_dir=path_sentence_transformer, suffixes=SENT_TX_MODEL_FILE_SUFFIXES
+    )
+
+    return f"{path_sentence_transformer.name}@{digest}"
+
+
+def spacy_pipeline_identity(spacy_pipeline: Language, path_spacy_pipeline: Path) -> str:
+    """Identity of a spacy pipeline keying its cached embeddings by its name,
+    version and enabled components plus a digest of its config and of the
+    files it was loaded from, which hold its weights and word vectors"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(spacy_pipeline.config.to_str().encode("utf-8") + b"\0")
+    if path_spacy_pipeline.is_dir():
+        digest.update(model_files_digest(path_dir=path_spacy_pipeline).encode("utf-8"))
+
+    return f"{spacy_pipeline_name(spacy_pipeline)}@{digest.hexdigest()}"
+
+
+def embed_with_cache(
+    text: List[str],
+    embed: Callable[[List[str]], Iterable[Tuple[str, np.ndarray]]],
+    emb_cache: EmbCacheDataInterface,
+    model_name: Optional[str],
+) -> Iterable[Tuple[str, np.ndarray]]:
+    """Looks texts up in the cache first and only embeds the misses, whose
+    embeddings are written back. Pairs are yielded in the order of input texts"""
+    if model_name is None:
+        raise ValueError("A model name is required to look up an embedding cache")
+
+    cached = emb_cache.get_many(model_name=model_name, text=text)
+    misses = [a_text for a_text in text if a_text not in cached]
+
+    logger.info(
+        f"{len(cached)} of {len(text)} texts are found in the embedding cache "
+        f"and {len(misses)} texts are to be embedded by {model_name}"
+    )
+
+    computed: Dict[str, np.ndarray] = {}
+    if len(misses) > 0:
+        computed = dict(embed(misses))
+        emb_cache.put_many(model_name=model_name, text_emb=computed.items())
+
+    for a_text in text:
+        yield a_text, cached[a_text] if a_text in cached else computed[a_text]
+
+
 #
 # Average Word Vectors
 #
 
 
 def embed_with_avg_word_vec(
-    text: List[str], spacy_pipeline: Language
+    text: List[str],
+    spacy_pipeline: Language,
+    emb_cache: Optional[EmbCacheDataInterface] = None,
+    model_name: Optional[str] = None,
 ) -> Iterable[Tuple[str, np.ndarray]]:
+    if emb_cache is not None:
+        yield from embed_with_cache(
+            text=text,
+            embed=lambda misses: embed_with_avg_word_vec(
+                text=misses, spacy_pipeline=spacy_pipeline
+            ),
+            emb_cache=emb_cache,
+            model_name=model_name,
+        )
+
+        return
+
     logger.info(
         f"Embedding text array shaped of length {len(text)} "
         "with average word vectors"
@@ -64,7 +183,10 @@ def embed_with_avg_word_vec(
 
 
 def _vectorise_with_word_vector(
-    node_dfs: NodeDFs, spacy_pipeline: Language
+    node_dfs: NodeDFs,
+    spacy_pipeline: Language,
+    emb_cache: Optional[EmbCacheDataInterface] = None,
+    model_name: Optional[str] = None,
 ) -> Iterable[Tuple[str, np.ndarray]]:
     text = prep_emb_input(
         list_node_df=[
@@ -77,7 +199,12 @@ def _vectorise_with_word_vector(
         f"following node types: {WV_NTYPES}"
     )
 
-    return embed_with_avg_word_vec(text=text, spacy_pipeline=spacy_pipeline)
+    return embed_with_avg_word_vec(
+        text=text,
+        spacy_pipeline=spacy_pipeline,
+        emb_cache=emb_cache,
+        model_name=model_name,
+    )
 
 
 #
@@ -85,13 +212,48 @@ def _vectorise_with_word_vector(
 #
 
 
+class SentTxEncodeMode(str, Enum):
+    single = "single"
+    multi = "multi"
+    bucketed = "bucketed"
+
+
+# Padded token positions per batch in bucketed mode
+DEFAULT_MAX_BATCH_TOKENS = 4096
+
+
+# Environment variables read by torch and its math libraries in worker processes
+THREAD_ENV_VARS = ("OMP_NUM_THREADS", "MKL_NUM_THREADS")
+
+
+def plan_cpu_workers(n_cpu: int, max_worker: int = 4) -> Tuple[int, int]:
+    """Splits cores between worker processes and intra-op threads per worker so
+    that their product does not oversubscribe the available cores"""
+    n_worker = max(1, min(max_worker, n_cpu // 2))
+    n_thread = max(1, n_cpu // n_worker)
+
+    return n_worker, n_thread
+
+
 @contextmanager
 def multi_process_context(  # type: ignore[no-any-unimported]
     sent_tx: SentenceTransformer,
+    target_devices: Optional[List[str]] = None,
+    n_thread: Optional[int] = None,
 ) -> Generator[dict, None, None]:
-    pool = (
-        sent_tx.start_multi_process_pool()
-    )  # Default either with all CUDA or four CPUs
+    # Worker processes inherit thread limits from the environment at start up
+    saved_env = {key: os.environ.get(key) for key in THREAD_ENV_VARS}
+    if n_thread is not None:
+        os.environ.update({key: str(n_thread) for key in THREAD_ENV_VARS})
+    try:
+        # Default either with all CUDA or four CPUs
+        pool = sent_tx.start_multi_process_pool(target_devices=target_devices)
+    finally:
+        for key, value in saved_env.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
 
     try:  # Use try-finally block to make sure resources are stopped regardless
         yield pool
@@ -99,13 +261,133 @@ def multi_process_context(  # type: ignore[no-any-unimported]
         sent_tx.stop_multi_process_pool(pool)
 
 
+def encode_multi_process_streaming(  # type: ignore[no-any-unimported]
+    text: List[str],
+    sent_tx: SentenceTransformer,
+    pool: dict,
+    window_size: int = 4096,
+    chunk_size: int = 256,
+) -> Iterable[Tuple[str, np.ndarray]]:
+    """Encodes consecutive windows of texts with a live worker pool. Texts in a
+    window are sorted by length before being split into chunks for workers so
+    that batches are padded to similar lengths. Pairs are yielded in original
+    order and at most one window of embeddings is held in memory at a time"""
+    for start in range(0, len(text), window_size):
+        text_window = text[start : start + window_size]
+        order = np.argsort([len(a_text) for a_text in text_window], kind="stable")
+
+        emb_sorted = np.asarray(
+            sent_tx.encode_multi_process(
+                sentences=[text_window[i] for i in order],
+                pool=pool,
+                batch_size=64,  # Double default batch size
+                chunk_size=chunk_size,
+            )
+        )
+
+        # Scatter embeddings back to the positions of their texts
+        emb_window = np.empty_like(emb_sorted)
+        emb_window[order] = emb_sorted
+        for i_text, a_text in enumerate(text_window):
+            yield a_text, emb_window[i_text]
+
+
+def token_lengths(  # type: ignore[no-any-unimported]
+    text: List[str], sent_tx: SentenceTransformer
+) -> np.ndarray:
+    """Numbers of tokens of texts as the model sees them after truncation"""
+    if len(text) == 0:
+        return np.zeros(0, dtype=np.int64)
+
+    input_ids = sent_tx.tokenizer(
+        text, truncation=True, max_length=sent_tx.max_seq_length
+    )["input_ids"]
+
+    return np.array([len(ids) for ids in input_ids], dtype=np.int64)
+
+
+def encode_bucketed(  # type: ignore[no-any-unimported]
+    text: List[str], sent_tx: SentenceTransformer, max_batch_tokens: int
+) -> Iterable[Tuple[str, np.ndarray]]:
+    """Encodes texts in batches of similar token lengths formed under a token
+    budget instead of a fixed count, and yields pairs in original order"""
+    lengths = token_lengths(text=text, sent_tx=sent_tx)
+    batches = token_budget_batches(lengths=lengths, max_batch_tokens=max_batch_tokens)
+
+    logger.info(
+        f"Formed {len(batches)} batches under a budget of {max_batch_tokens} "
+        f"tokens, padding to {padded_token_count(lengths, batches)} token "
+        f"positions for {int(lengths.sum())} tokens"
+    )
+
+    emb: Optional[np.ndarray] = None
+    for batch in batches:
+        emb_batch = np.asarray(
+            sent_tx.encode(sentences=[text[i] for i in batch], batch_size=len(batch))
+        )
+        if emb is None:
+            emb = np.empty((len(text), *emb_batch.shape[1:]), dtype=emb_batch.dtype)
+        emb[batch] = emb_batch
+
+    if emb is None:
+        return
+
+    for i_text, a_text in enumerate(text):
+        yield a_text, emb[i_text]
+
+
+def log_throughput(
+    text_emb: Iterable[Tuple[str, np.ndarray]],
+) -> Iterable[Tuple[str, np.ndarray]]:
+    """Passes text-embedding pairs through and logs the rate they arrived at"""
+    n_text = 0
+    start = time.perf_counter()
+    for pair in text_emb:
+        n_text += 1
+        yield pair
+    elapsed = time.perf_counter() - start
+
+    logger.info(
+        f"Embedded {n_text} texts in {elapsed:.2f}s "
+        f"({n_text / elapsed if elapsed > 0 else 0.0:.1f} sentences/sec)"
+    )
+
+
 def embed_with_sent_tx(  # type: ignore[no-any-unimported]
-    text: List[str], sent_tx: SentenceTransformer, use_multi: bool = False
+    text: List[str],
+    sent_tx: SentenceTransformer,
+    use_multi: bool = False,
+    emb_cache: Optional[EmbCacheDataInterface] = None,
+    model_name: Optional[str] = None,
+    max_batch_tokens: Optional[int] = None,
 ) -> Iterable[Tuple[str, np.ndarray]]:
+    if emb_cache is not None:
+        yield from embed_with_cache(
+            text=text,
+            embed=lambda misses: embed_with_sent_tx(
+                text=misses,
+                sent_tx=sent_tx,
+                use_multi=use_multi,
+                max_batch_tokens=max_batch_tokens,
+            ),
+            emb_cache=emb_cache,
+            model_name=model_name,
+        )
+
+        return
+
     logger.info(
         f"Embedding text array of length {len(text)} with a sentence transformer"
     )
 
+    # Batch by token lengths when a token budget is given
+    if not use_multi and max_batch_tokens is not None:
+        yield from encode_bucketed(
+            text=text, sent_tx=sent_tx, max_batch_tokens=max_batch_tokens
+        )
+
+        return
+
     # Use one process for small data
     if not use_multi:
         emb = sent_tx.encode(sentences=text, show_progress_bar=True)
@@ -114,38 +396,33 @@ def embed_with_sent_tx(  # type: ignore[no-any-unimported]
 
         return
 
-    # Calculate the total number of batches
-    batch_size = min(512, len(text))
-    n_batch = len(text) // batch_size + (0 if len(text) % batch_size == 0 else 1)
+    # Let the library pick all CUDA devices, otherwise bound CPU workers
+    if str(sent_tx.device).startswith("cuda"):
+        target_devices, n_thread = None, None
+    else:
+        n_worker, n_thread = plan_cpu_workers(n_cpu=multiprocessing.cpu_count())
+        target_devices = ["cpu"] * n_worker
 
     # Use context manager to prevent resource leak
-    with multi_process_context(sent_tx=sent_tx) as pool:
+    with multi_process_context(
+        sent_tx=sent_tx, target_devices=target_devices, n_thread=n_thread
+    ) as pool:
         logger.info(
             "Using the following pool configuration for sentence "
-            f"transformer multi encoding:\n{pool}"
+            f"transformer multi encoding with {n_thread} threads per "
+            f"worker:\n{pool}"
         )
 
-        # Batch encode input
-        for i_batch in range(n_batch):
-            # Calculate start and end index for the current batch
-            start_idx = i_batch * batch_size
-            end_idx = min(start_idx + batch_size, len(text))
-
-            # Identify input chunk
-            text_chunk = text[start_idx:end_idx]
-
-            # Execute embedding calculation
-            emb_chunk = sent_tx.encode_multi_process(
-                sentences=text, pool=pool, batch_size=64
-            )  # Double default batch size
-
-            # Yield one pairs of text-embedding at a time
-            for i_text in range(len(text_chunk)):
-                yield text_chunk[i_text], emb_chunk[i_text]
+        # Keep the pool alive across windows of input
+        yield from encode_multi_process_streaming(text=text, sent_tx=sent_tx, pool=pool)
 
 
 def _vectorise_with_sentence_transformer(  # type: ignore[no-any-unimported]
-    node_dfs: NodeDFs, sentence_transformer: SentenceTransformer
+    node_dfs: NodeDFs,
+    sentence_transformer: SentenceTransformer,
+    emb_cache: Optional[EmbCacheDataInterface] = None,
+    model_name: Optional[str] = None,
+    encode_mode: SentTxEncodeMode = SentTxEncodeMode.single,
 ) -> Iterable[Tuple[str, np.ndarray]]:
     text = prep_emb_input(
         list_node_df=[
@@ -158,4 +435,17 @@ def _vectorise_with_sentence_transformer(  # type: ignore[no-any-unimported]
         f"following node types: {TX_NTYPES}"
     )
 
-    return embed_with_sent_tx(text=text, sent_tx=sentence_transformer)
+    return log_throughput(
+        embed_with_sent_tx(
+            text=text,
+            sent_tx=sentence_transformer,
+            use_multi=encode_mode == SentTxEncodeMode.multi,
+            emb_cache=emb_cache,
+            model_name=model_name,
+            max_batch_tokens=(
+                DEFAULT_MAX_BATCH_TOKENS
+                if encode_mode == SentTxEncodeMode.bucketed
+                else None
+            ),
+        )
+    )
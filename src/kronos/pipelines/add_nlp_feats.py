@@ -1,11 +1,13 @@
 from pathlib import Path
+from typing import Optional
 
 from kronos.data_interfaces.edge_dfs_data_interface import EdgeDFsDataInterface
 from kronos.data_interfaces.node_dfs_data_interface import NodeDFsDataInterface
+from kronos.data_interfaces.parse_cache_data_interface import ParseCacheDataInterface
 from kronos.data_interfaces.spacy_pipeline_data_interface import (
     SpacyPipelineDataInterface,
 )
-from kronos.nodes.add_nlp_feats import _add_nlp_feats
+from kronos.nodes.add_nlp_feats import DEFAULT_BATCH_SIZE, _add_nlp_feats
 
 
 def add_nlp_feats(
@@ -14,6 +16,10 @@ def add_nlp_feats(
     path_spacy_pipeline: Path,
     path_semantics_node_dfs: Path,
     path_semantics_edge_dfs: Path,
+    path_parse_cache: Optional[Path] = None,
+    max_cache_entries: int = 1_000_000,
+    n_process: int = 1,
+    batch_size: int = DEFAULT_BATCH_SIZE,
 ) -> None:
     # Data Access - Input
     layout_node_dfs_data_interface = NodeDFsDataInterface(filepath=path_layout_node_dfs)
@@ -31,13 +37,28 @@ def add_nlp_feats(
         enable=["tok2vec", "ner"]  # NER component cannot work without tok2vec
     )
 
+    parse_cache = (
+        None
+        if path_parse_cache is None
+        else ParseCacheDataInterface(
+            filepath=path_parse_cache, max_entries=max_cache_entries
+        )
+    )
+
     # Task Processing
     semantics_node_dfs, semantics_edge_dfs = _add_nlp_feats(
         node_dfs=layout_node_dfs,
         edge_dfs=layout_edge_dfs,
         spacy_pipeline=spacy_pipeline,
+        parse_cache=parse_cache,
+        n_process=n_process,
+        batch_size=batch_size,
     )
 
+    if parse_cache is not None:
+        parse_cache.log_stats()
+        parse_cache.close()
+
     # Data Access - Output
     semantics_node_dfs.validate()
     semantics_node_dfs.report()
@@ -102,6 +123,43 @@ if __name__ == "__main__":
         required=True,
         help="Path to which edge dataframes of a semantics graph are saved",
     )
+    parser.add_argument(
+        "-ppc",
+        "--path_parse_cache",
+        type=Path,
+        required=False,
+        default=None,
+        help="Path to a sqlite cache of parsed texts keyed by spacy pipeline "
+        "name, version and text. Only distinct texts absent from it are parsed "
+        "and then added to it",
+    )
+    parser.add_argument(
+        "-mce",
+        "--max_cache_entries",
+        type=int,
+        required=False,
+        default=1_000_000,
+        help="Number of parsed texts beyond which least recently used cache "
+        "entries are evicted",
+    )
+    parser.add_argument(
+        "-np",
+        "--n_process",
+        type=int,
+        required=False,
+        default=1,
+        help="Number of processes parsing contiguous shards of distinct texts "
+        "missing from the parse cache, whose tokens and entities are interned "
+        "in text order by the main process",
+    )
+    parser.add_argument(
+        "-bs",
+        "--batch_size",
+        type=int,
+        required=False,
+        default=DEFAULT_BATCH_SIZE,
+        help="Number of cell texts buffered per spacy batch",
+    )
 
     args = parser.parse_args()
 
@@ -111,4 +169,8 @@ if __name__ == "__main__":
         path_spacy_pipeline=args.path_spacy_pipeline,
         path_semantics_node_dfs=args.path_semantics_node_dfs,
         path_semantics_edge_dfs=args.path_semantics_edge_dfs,
+        path_parse_cache=args.path_parse_cache,
+        max_cache_entries=args.max_cache_entries,
+        n_process=args.n_process,
+        batch_size=args.batch_size,
     )
@@ -0,0 +1,71 @@
+from pathlib import Path
+
+from kronos.data_interfaces.edge_dfs_data_interface import EdgeDFsDataInterface
+from kronos.data_interfaces.hetero_graph_data_interface import (
+    HeteroGraphDataInterface,
+)
+from kronos.data_interfaces.node_dfs_data_interface import NodeDFsDataInterface
+from kronos.nodes.assemble_kg import _assemble_hetero_graph
+
+
+def assemble_hetero_graph(
+    path_node_dfs: Path, path_edge_dfs: Path, path_hetero_graph: Path
+) -> None:
+    # Data Access - Input
+    node_dfs_data_interface = NodeDFsDataInterface(filepath=path_node_dfs)
+    node_dfs = node_dfs_data_interface.load()
+    node_dfs.validate()
+
+    edge_dfs_data_interface = EdgeDFsDataInterface(filepath=path_edge_dfs)
+    edge_dfs = edge_dfs_data_interface.load()
+    edge_dfs.validate()
+
+    # Task Processing
+    hetero_graph = _assemble_hetero_graph(node_dfs=node_dfs, edge_dfs=edge_dfs)
+
+    # Data Access - Output
+    hetero_graph_data_interface = HeteroGraphDataInterface(filepath=path_hetero_graph)
+    hetero_graph_data_interface.save(hetero_graph=hetero_graph)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from kronos.nodes.project_logging import default_logging
+
+    default_logging()
+
+    parser = argparse.ArgumentParser(
+        description="Assembles a compact heterogeneous graph with typed edge "
+        "arrays from graph element dataframes"
+    )
+    parser.add_argument(
+        "-pnd",
+        "--path_node_dfs",
+        type=Path,
+        required=True,
+        help="Path from which node dataframes are loaded",
+    )
+    parser.add_argument(
+        "-ped",
+        "--path_edge_dfs",
+        type=Path,
+        required=True,
+        help="Path from which edge dataframes are loaded",
+    )
+    parser.add_argument(
+        "-phg",
+        "--path_hetero_graph",
+        type=Path,
+        required=True,
+        help="Path to a directory to which a constructed heterogeneous graph is "
+        "saved",
+    )
+
+    args = parser.parse_args()
+
+    assemble_hetero_graph(
+        path_node_dfs=args.path_node_dfs,
+        path_edge_dfs=args.path_edge_dfs,
+        path_hetero_graph=args.path_hetero_graph,
+    )
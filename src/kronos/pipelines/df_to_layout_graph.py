@@ -1,20 +1,75 @@
 from pathlib import Path
 
 from kronos.data_interfaces.edge_dfs_data_interface import EdgeDFsDataInterface
-from kronos.data_interfaces.node_dfs_data_interface import NodeDFs, NodeDFsDataInterface
+from kronos.data_interfaces.node_dfs_data_interface import (
+    NodeDFs,
+    NodeDFsDataInterface,
+    NodeType,
+)
 from kronos.data_interfaces.timetable_df_data_interface import TimeTableDFDataInterface
-from kronos.nodes.df_to_layout_graph import _df_to_layout_graph
+from kronos.nodes.df_to_layout_graph import (
+    LayoutEngine,
+    _df_to_layout_graph,
+    _df_to_layout_graph_incremental,
+    _sparse_sheet_to_layout_graph,
+)
 
 
 def df_to_layout_graph(
-    path_timetable_df: Path, path_node_dfs: Path, path_edge_dfs: Path
+    path_timetable_df: Path,
+    path_node_dfs: Path,
+    path_edge_dfs: Path,
+    engine: LayoutEngine = LayoutEngine.sparse,
+    incremental: bool = False,
 ) -> None:
     # Data Access - Input
     timetable_df_data_interface = TimeTableDFDataInterface(filepath=path_timetable_df)
-    timetable_df = timetable_df_data_interface.load()
+
+    # The layout graph saved by the previous run is reused given the timetable
+    # version it was parsed from
+    previous_versions = (
+        timetable_df_data_interface.versions()[:-1] if incremental else []
+    )
+    incremental = (
+        incremental
+        and len(previous_versions) > 0
+        and path_node_dfs.exists()
+        and path_edge_dfs.exists()
+    )
+    # Only non null cells are loaded unless versions are diffed cell by cell
+    # or another engine scans the dense sheet
+    sparse = not incremental and engine == LayoutEngine.sparse
+    if sparse:
+        sparse_sheet = timetable_df_data_interface.load_sparse()
+    else:
+        timetable_df = timetable_df_data_interface.load()
+
+    if incremental:
+        previous_timetable_df = TimeTableDFDataInterface(
+            filepath=path_timetable_df, version=previous_versions[-1]
+        ).load()
+        previous_node_dfs = NodeDFsDataInterface(filepath=path_node_dfs).load()
+        previous_edge_dfs = EdgeDFsDataInterface(filepath=path_edge_dfs).load()
 
     # Task Processing
-    sheet_cell_node_df, traversal_edge_dfs = _df_to_layout_graph(df=timetable_df)
+    if incremental:
+        sheet_cell_node_df, traversal_edge_dfs = _df_to_layout_graph_incremental(
+            df=timetable_df,
+            previous_df=previous_timetable_df,
+            previous_sheet_cell_node_df=previous_node_dfs.members[
+                previous_node_dfs.ntypes.index(NodeType.sheet_cell)
+            ],
+            previous_traversal_edge_dfs=previous_edge_dfs,
+            engine=engine,
+        )
+    elif sparse:
+        sheet_cell_node_df, traversal_edge_dfs = _sparse_sheet_to_layout_graph(
+            sparse_sheet=sparse_sheet
+        )
+    else:
+        sheet_cell_node_df, traversal_edge_dfs = _df_to_layout_graph(
+            df=timetable_df, engine=engine
+        )
 
     # Data Access - Output
     node_dfs = NodeDFs(members=[sheet_cell_node_df])
@@ -64,6 +119,22 @@ if __name__ == "__main__":
         required=True,
         help="Path to which layout edge dataframes are saved",
     )
+    parser.add_argument(
+        "-e",
+        "--engine",
+        type=LayoutEngine,
+        required=False,
+        default=LayoutEngine.sparse,
+        help="Engine with which nearest non null neighbours of cells are found. "
+        "The sparse engine loads only non null cells",
+    )
+    parser.add_argument(
+        "-i",
+        "--incremental",
+        action="store_true",
+        help="Derive the layout graph from the one previously saved to the output "
+        "paths by diffing the two most recent timetable versions",
+    )
 
     args = parser.parse_args()
 
@@ -71,4 +142,6 @@ if __name__ == "__main__":
         path_timetable_df=args.path_timetable_df,
         path_node_dfs=args.path_node_dfs,
         path_edge_dfs=args.path_edge_dfs,
+        engine=args.engine,
+        incremental=args.incremental,
     )
@@ -1,29 +1,92 @@
+import logging
+from datetime import datetime, timezone
 from pathlib import Path
 from typing import Optional
 
+from kronos.data_interfaces.marker_data_interface import (
+    ConsumedMarkerDataInterface,
+    RefreshMarker,
+    RefreshMarkerDataInterface,
+    RefreshStatus,
+)
 from kronos.data_interfaces.timetable_df_data_interface import TimeTableDFDataInterface
 
+logger = logging.getLogger(__name__)
+
+# Exit status of the command line when asked to tell orchestration that the
+# sheet is unchanged, distinct from 1 and 2 for errors and usage errors
+EXIT_STATUS_UNCHANGED = 3
+
 
 def download_df_timetable(
     path_service_account_json: Path,
     path_timetable_df: Path,
     version: Optional[str] = None,
-) -> None:
-    # Task Processing
+    path_refresh_marker: Optional[Path] = None,
+    path_consumed_marker: Optional[Path] = None,
+) -> RefreshMarker:
+    # Data Access - Input
     timetable_df_data_interface = TimeTableDFDataInterface(
         filepath=path_timetable_df, version=version
     )
+    # Only the name of the latest version is needed, which is found without
+    # the catalog that save loads
+    versions = timetable_df_data_interface.versions()
+    previous_version = versions[-1] if len(versions) > 0 else None
+    # Without a consumed marker, downstream stages are never known to be up
+    # to date and every refresh is reported as changed
+    consumed_marker = (
+        None
+        if path_consumed_marker is None
+        else ConsumedMarkerDataInterface(filepath=path_consumed_marker).load()
+    )
+
+    # Task Processing
     sheet_values = timetable_df_data_interface.download(
         path_service_account_json=path_service_account_json
     )
     timetable_df = timetable_df_data_interface.preprocess(sheet_values=sheet_values)
+    fingerprint = timetable_df_data_interface.fingerprint(timetable_df=timetable_df)
+
+    # Compared against what downstream stages consumed rather than against the
+    # latest version, so that a version saved by a refresh whose downstream
+    # stages then failed keeps being reported as changed until it is consumed.
+    # A pinned version is always reported as changed
+    unchanged = (
+        version is None
+        and consumed_marker is not None
+        and consumed_marker.content_hash == fingerprint
+    )
 
     # Data Access - Output
-    timetable_df_data_interface.save(timetable_df=timetable_df)
+    # Content identical to that of the latest version is not saved again
+    saved_version = timetable_df_data_interface.save(timetable_df=timetable_df)
+    if unchanged and consumed_marker is not None:
+        logger.info(
+            f"Timetable is unchanged since version {consumed_marker.version} was "
+            "consumed, so downstream stages can be skipped"
+        )
+
+    refresh_marker = RefreshMarker(
+        status=RefreshStatus.unchanged if unchanged else RefreshStatus.changed,
+        version=saved_version,
+        content_hash=fingerprint,
+        previous_version=previous_version,
+        consumed_version=None if consumed_marker is None else consumed_marker.version,
+        checked_at=datetime.now(tz=timezone.utc),
+    )
+    if path_refresh_marker is not None:
+        refresh_marker_data_interface = RefreshMarkerDataInterface(
+            filepath=path_refresh_marker
+        )
+        refresh_marker_data_interface.save(marker=refresh_marker)
+
+    return refresh_marker
 
 
 if __name__ == "__main__":
     import argparse
+    import sys
 
     from kronos.nodes.project_logging import default_logging
 
@@ -46,10 +109,45 @@ if __name__ == "__main__":
         required=True,
         help="Path to which timetable dataframe is serialised",
     )
+    parser.add_argument(
+        "-prm",
+        "--path_refresh_marker",
+        type=Path,
+        required=False,
+        default=None,
+        help="Path to which a json marker is written with whether the sheet "
+        "changed, the version holding it and its content hash",
+    )
+    parser.add_argument(
+        "-pcm",
+        "--path_consumed_marker",
+        type=Path,
+        required=False,
+        default=None,
+        help="Path from which the marker written by "
+        "kronos.pipelines.mark_timetable_consumed is loaded, recording the "
+        "version downstream stages last completed on",
+    )
+    parser.add_argument(
+        "-ec",
+        "--exit_code",
+        action="store_true",
+        help=f"Exit with status {EXIT_STATUS_UNCHANGED} if the sheet is "
+        "identical to the version downstream stages last consumed, so that "
+        "downstream stages chained with && are skipped",
+    )
 
     args = parser.parse_args()
 
-    download_df_timetable(
+    if args.exit_code and args.path_consumed_marker is None:
+        parser.error("--exit_code requires --path_consumed_marker")
+
+    refresh_marker = download_df_timetable(
         path_service_account_json=args.path_service_account_json,
         path_timetable_df=args.path_timetable_df,
+        path_refresh_marker=args.path_refresh_marker,
+        path_consumed_marker=args.path_consumed_marker,
     )
+
+    if args.exit_code and refresh_marker.status == RefreshStatus.unchanged:
+        sys.exit(EXIT_STATUS_UNCHANGED)
@@ -0,0 +1,168 @@
+import logging
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import orjson
+
+from kronos.data_interfaces.timetable_df_data_interface import TimeTableDFDataInterface
+from kronos.nodes.download_sheets import (
+    SHEETS_API_URL,
+    DownloadConfig,
+    GoogleCredentialsAuth,
+    RestSheetsTransport,
+    SheetTarget,
+    TokenBucket,
+    download_targets,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def download_timetable_dfs(
+    path_targets_json: Path,
+    path_dir_timetable_df: Path,
+    path_service_account_json: Optional[Path] = None,
+    download_config: Optional[DownloadConfig] = None,
+    base_url: str = SHEETS_API_URL,
+) -> Dict[str, str]:
+    # Data Access - Input
+    with open(path_targets_json, "rb") as f:
+        targets = [SheetTarget(**target) for target in orjson.loads(f.read())]
+
+    names = [target.name for target in targets]
+    if len(set(names)) != len(names):
+        raise ValueError("Names of targets have to be unique")
+
+    if download_config is None:
+        download_config = DownloadConfig()
+
+    auth = (
+        None
+        if path_service_account_json is None
+        else GoogleCredentialsAuth.from_service_account_file(
+            path_service_account_json=path_service_account_json
+        )
+    )
+    token_bucket = TokenBucket(
+        rate=download_config.requests_per_s, capacity=download_config.burst
+    )
+
+    # Task Processing
+    name_to_version: Dict[str, str] = {}
+    failed: List[str] = []
+    with RestSheetsTransport(
+        base_url=base_url,
+        auth=auth,
+        token_bucket=token_bucket,
+        max_connections=download_config.max_workers,
+    ) as transport:
+        for sheet_download in download_targets(
+            transport=transport, targets=targets, download_config=download_config
+        ):
+            if sheet_download.sheet_values is None:
+                failed.append(sheet_download.target.name)
+                continue
+
+            timetable_df = TimeTableDFDataInterface.preprocess(
+                sheet_values=sheet_download.sheet_values
+            )
+
+            # Data Access - Output
+            timetable_df_data_interface = TimeTableDFDataInterface(
+                filepath=path_dir_timetable_df / f"{sheet_download.target.name}.csv"
+            )
+            name_to_version[sheet_download.target.name] = (
+                timetable_df_data_interface.save(timetable_df=timetable_df)
+            )
+
+    logger.info(
+        f"Saved {len(name_to_version)} of {len(targets)} targets to "
+        f"{path_dir_timetable_df}"
+    )
+    if len(failed) > 0:
+        raise RuntimeError(f"Failed to download targets {', '.join(sorted(failed))}")
+
+    return name_to_version
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from kronos.nodes.project_logging import default_logging
+
+    default_logging()
+
+    parser = argparse.ArgumentParser(
+        description="Downloads several google worksheets concurrently before "
+        "serialising each into a versioned csv"
+    )
+    parser.add_argument(
+        "-ptj",
+        "--path_targets_json",
+        type=Path,
+        required=True,
+        help="Path from which a json list of targets, each with a name, a "
+        "spreadsheet_key and a worksheet index or title, is loaded",
+    )
+    parser.add_argument(
+        "-pdtd",
+        "--path_dir_timetable_df",
+        type=Path,
+        required=True,
+        help="Path to a directory in which the timetable dataframe of each "
+        "target is serialised under <name>.csv",
+    )
+    parser.add_argument(
+        "-psj",
+        "--path_service_account_json",
+        type=Path,
+        required=True,
+        help="Path from which a google sheet service account credential file is loaded",
+    )
+    parser.add_argument(
+        "-mw",
+        "--max_workers",
+        type=int,
+        required=False,
+        default=DownloadConfig().max_workers,
+        help="Number of targets downloaded concurrently",
+    )
+    parser.add_argument(
+        "-rps",
+        "--requests_per_s",
+        type=float,
+        required=False,
+        default=DownloadConfig().requests_per_s,
+        help="Sustained rate of requests across all targets",
+    )
+    parser.add_argument(
+        "-b",
+        "--burst",
+        type=int,
+        required=False,
+        default=DownloadConfig().burst,
+        help="Number of requests which can be sent at once after being idle",
+    )
+    parser.add_argument(
+        "-mr",
+        "--max_retries",
+        type=int,
+        required=False,
+        default=DownloadConfig().max_retries,
+        help="Number of times a target which failed with a rate limit, server "
+        "or connection error is retried with exponential backoff",
+    )
+
+    args = parser.parse_args()
+
+    download_timetable_dfs(
+        path_targets_json=args.path_targets_json,
+        path_dir_timetable_df=args.path_dir_timetable_df,
+        path_service_account_json=args.path_service_account_json,
+        download_config=DownloadConfig(
+            max_workers=args.max_workers,
+            requests_per_s=args.requests_per_s,
+            burst=args.burst,
+            max_retries=args.max_retries,
+        ),
+    )
@@ -1,31 +1,87 @@
 from pathlib import Path
+from typing import Optional
 
 from pydantic_core import Url
 
 from kronos.data_interfaces.text_emb_local_data_interface import (
     TextEmbLocalDataInterface,
 )
+from kronos.data_interfaces.upload_manifest_data_interface import (
+    UploadManifestDataInterface,
+)
 from kronos.nodes.operate_vector_db import (
     CollectionName,
+    ImportMode,
+    IngestConfig,
     NameToSchema,
+    RestBatchTransport,
     VectorDBEndPoint,
     add_collections,
     batch_import,
+    batch_upsert,
     collection_exists,
     del_collection,
     instantiate_client,
+    object_uuids,
 )
 
 
+def default_path_upload_manifest(
+    path_text_emb: Path, collection_name: CollectionName
+) -> Path:
+    """Upload manifest kept next to the embedding file it was uploaded from"""
+    return path_text_emb.with_name(
+        f"{path_text_emb.name}.{collection_name.value}.uploaded.npy"
+    )
+
+
 def emb_to_db(
-    path_text_emb: Path, collection_name: CollectionName, end_point: VectorDBEndPoint
+    path_text_emb: Path,
+    collection_name: CollectionName,
+    end_point: VectorDBEndPoint,
+    mode: ImportMode = ImportMode.replace_all,
+    chunk_size: int = 10_000,
+    ingest_config: Optional[IngestConfig] = None,
+    path_upload_manifest: Optional[Path] = None,
 ) -> None:
     # Data Access - Input
     text_emb_local_data_interface = TextEmbLocalDataInterface(filepath=path_text_emb)
-    text, emb = text_emb_local_data_interface.load()
+    upload_manifest_data_interface = UploadManifestDataInterface(
+        filepath=(
+            default_path_upload_manifest(
+                path_text_emb=path_text_emb, collection_name=collection_name
+            )
+            if path_upload_manifest is None
+            else path_upload_manifest
+        )
+    )
+    # Upsert streams chunks of the embedding file instead of loading it whole
+    if mode == ImportMode.replace_all:
+        text, emb = text_emb_local_data_interface.load()
 
     # Task Processing
-    with instantiate_client(end_point=end_point) as client:
+    with instantiate_client(end_point=end_point) as client, RestBatchTransport(
+        end_point=end_point
+    ) as transport:
+        if mode == ImportMode.upsert:
+            if not collection_exists(client=client, collection_name=collection_name):
+                add_collections(
+                    client=client, collections_schema=[NameToSchema[collection_name]]
+                )
+
+            upsert_report = batch_upsert(
+                client=client,
+                collection_name=collection_name,
+                chunks=text_emb_local_data_interface.iter_chunks(chunk_size=chunk_size),
+                transport=transport,
+                ingest_config=ingest_config,
+                previous_uuids=upload_manifest_data_interface.load(),
+            )
+
+            # Data Access - Output
+            upload_manifest_data_interface.save(uuids=upsert_report.uuids)
+            return
+
         if collection_exists(client=client, collection_name=collection_name):
             del_collection(client=client, collection_name=collection_name)
 
@@ -34,7 +90,19 @@ def emb_to_db(
         )
 
         # Task Processing
-        batch_import(client=client, collection_name=collection_name, text=text, emb=emb)
+        batch_import(
+            client=client,
+            collection_name=collection_name,
+            text=text,
+            emb=emb,
+            transport=transport,
+            ingest_config=ingest_config,
+        )
+
+    # Data Access - Output
+    upload_manifest_data_interface.save(
+        uuids=object_uuids(collection_name=collection_name, text=text)
+    )
 
 
 if __name__ == "__main__":
@@ -71,6 +139,58 @@ if __name__ == "__main__":
         default=VectorDBEndPoint(),
         help="End point to connect to a running vector database instance",
     )
+    parser.add_argument(
+        "-m",
+        "--mode",
+        type=ImportMode,
+        required=False,
+        default=ImportMode.replace_all,
+        help="Whether the collection is recreated from all embeddings or only "
+        "objects with new or changed embeddings are upserted",
+    )
+    parser.add_argument(
+        "-cs",
+        "--chunk_size",
+        type=int,
+        required=False,
+        default=10_000,
+        help="Number of embeddings read from the embedding file at a time in "
+        "upsert mode",
+    )
+    parser.add_argument(
+        "-pum",
+        "--path_upload_manifest",
+        type=Path,
+        required=False,
+        default=None,
+        help="Path to which ids of uploaded objects are saved and from which "
+        "they are loaded to find stale objects in upsert mode, defaulting to "
+        "<path_text_emb>.<collection_name>.uploaded.npy",
+    )
+    parser.add_argument(
+        "-bs",
+        "--batch_size",
+        type=int,
+        required=False,
+        default=IngestConfig().batch_size,
+        help="Number of objects sent per request",
+    )
+    parser.add_argument(
+        "-mif",
+        "--max_in_flight",
+        type=int,
+        required=False,
+        default=IngestConfig().max_in_flight,
+        help="Number of concurrent requests",
+    )
+    parser.add_argument(
+        "-mr",
+        "--max_retries",
+        type=int,
+        required=False,
+        default=IngestConfig().max_retries,
+        help="Number of times failed objects are resent with exponential backoff",
+    )
 
     args = parser.parse_args()
 
@@ -78,4 +198,12 @@ if __name__ == "__main__":
         path_text_emb=args.path_text_emb,
         collection_name=args.collection_name,
         end_point=args.end_point,
+        mode=args.mode,
+        chunk_size=args.chunk_size,
+        ingest_config=IngestConfig(
+            batch_size=args.batch_size,
+            max_in_flight=args.max_in_flight,
+            max_retries=args.max_retries,
+        ),
+        path_upload_manifest=args.path_upload_manifest,
     )
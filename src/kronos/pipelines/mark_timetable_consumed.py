@@ -0,0 +1,110 @@
+import logging
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+from kronos.data_interfaces.marker_data_interface import (
+    ConsumedMarker,
+    ConsumedMarkerDataInterface,
+    RefreshMarkerDataInterface,
+)
+from kronos.data_interfaces.timetable_df_data_interface import TimeTableDFDataInterface
+
+logger = logging.getLogger(__name__)
+
+
+def mark_timetable_consumed(
+    path_timetable_df: Path,
+    path_consumed_marker: Path,
+    version: Optional[str] = None,
+    path_refresh_marker: Optional[Path] = None,
+) -> ConsumedMarker:
+    """Marks the version downstream stages processed, given either directly or
+    by the refresh marker they were started from. The latest version is never
+    assumed, as a refresh may have saved a newer one while they ran"""
+    if (version is None) == (path_refresh_marker is None):
+        raise ValueError("Exactly one of version and path_refresh_marker is needed")
+
+    # Data Access - Input
+    if path_refresh_marker is not None:
+        refresh_marker = RefreshMarkerDataInterface(filepath=path_refresh_marker).load()
+        if refresh_marker is None:
+            raise FileNotFoundError(
+                f"No refresh marker is saved at {path_refresh_marker}"
+            )
+        version = refresh_marker.version
+    catalog = TimeTableDFDataInterface(filepath=path_timetable_df).load_catalog()
+
+    # Task Processing
+    entry = None if version is None else catalog.by_version(version)
+    if entry is None:
+        raise FileNotFoundError(
+            f"Version {version} is not saved in {path_timetable_df}"
+        )
+
+    consumed_marker = ConsumedMarker(
+        version=entry.version,
+        content_hash=entry.content_hash,
+        consumed_at=datetime.now(tz=timezone.utc),
+    )
+
+    # Data Access - Output
+    consumed_marker_data_interface = ConsumedMarkerDataInterface(
+        filepath=path_consumed_marker
+    )
+    consumed_marker_data_interface.save(marker=consumed_marker)
+
+    return consumed_marker
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from kronos.nodes.project_logging import default_logging
+
+    default_logging()
+
+    parser = argparse.ArgumentParser(
+        description="Records the timetable version downstream stages completed "
+        "on, to be run after the last of them succeeds"
+    )
+    parser.add_argument(
+        "-ptd",
+        "--path_timetable_df",
+        type=Path,
+        required=True,
+        help="Path from which the catalog of timetable versions is loaded",
+    )
+    parser.add_argument(
+        "-pcm",
+        "--path_consumed_marker",
+        type=Path,
+        required=True,
+        help="Path to which a json marker is written with the consumed version "
+        "and its content hash",
+    )
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument(
+        "-v",
+        "--version",
+        type=str,
+        default=None,
+        help="Version downstream stages consumed",
+    )
+    group.add_argument(
+        "-prm",
+        "--path_refresh_marker",
+        type=Path,
+        default=None,
+        help="Path from which the refresh marker downstream stages were started "
+        "from is loaded, whose version they consumed",
+    )
+
+    args = parser.parse_args()
+
+    mark_timetable_consumed(
+        path_timetable_df=args.path_timetable_df,
+        path_consumed_marker=args.path_consumed_marker,
+        version=args.version,
+        path_refresh_marker=args.path_refresh_marker,
+    )
@@ -0,0 +1,185 @@
+import logging
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from sentence_transformers import SentenceTransformer
+
+from kronos.data_interfaces.emb_index_data_interface import (
+    EmbIndexDataInterface,
+    ivf_index_path,
+)
+from kronos.data_interfaces.text_emb_local_data_interface import (
+    TextEmbLocalDataInterface,
+)
+from kronos.nodes.search_emb import (
+    DEFAULT_BLOCK_SIZE,
+    EmbSearcher,
+    IVFIndex,
+    SearchIndexType,
+    emb_digest,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def search_emb(
+    path_text_emb: Path,
+    query_text: List[str],
+    k: int = 10,
+    path_sentence_transformer: Optional[Path] = None,
+    index_type: SearchIndexType = SearchIndexType.exact,
+    n_list: int = 1024,
+    n_probe: int = 8,
+    rebuild_index: bool = False,
+    block_size: int = DEFAULT_BLOCK_SIZE,
+) -> List[List[Tuple[str, float]]]:
+    # Data Access - Input
+    text_emb_local_data_interface = TextEmbLocalDataInterface(filepath=path_text_emb)
+    text, emb = text_emb_local_data_interface.load()
+
+    ivf_index: Optional[IVFIndex] = None
+    emb_index_data_interface = EmbIndexDataInterface(
+        filepath=ivf_index_path(path_text_emb)
+    )
+    # Every embedding is hashed once to tell whether a saved index is stale
+    digest = (
+        emb_digest(emb=emb, block_size=block_size)
+        if index_type == SearchIndexType.ivf
+        else None
+    )
+    if index_type == SearchIndexType.ivf and not rebuild_index:
+        if emb_index_data_interface.exists():
+            ivf_index = emb_index_data_interface.load()
+            if ivf_index.digest != digest:
+                logger.info("IVF index is stale and will be rebuilt")
+                ivf_index = None
+
+    # Task Processing
+    if index_type == SearchIndexType.ivf and ivf_index is None:
+        ivf_index = IVFIndex.build(
+            emb=emb, n_list=n_list, block_size=block_size, digest=digest
+        )
+        emb_index_data_interface.save(ivf_index=ivf_index)
+
+    searcher = EmbSearcher(
+        text=text, emb=emb, ivf_index=ivf_index, block_size=block_size, digest=digest
+    )
+
+    if path_sentence_transformer is None:
+        # Queries are looked up among texts already embedded
+        query = searcher.query_emb_of_texts(query_text=query_text)
+    else:
+        sentence_transformer = SentenceTransformer(
+            model_name_or_path=str(path_sentence_transformer)
+        )
+        query = sentence_transformer.encode(query_text)
+
+    result = searcher.search(query=query, k=k, n_probe=n_probe)
+    neighbours = searcher.neighbour_texts(result=result)
+
+    # Data Access - Output
+    for a_query_text, a_neighbours in zip(query_text, neighbours):
+        logger.info(f"Nearest neighbours of {a_query_text!r}:")
+        for rank, (a_text, score) in enumerate(a_neighbours, start=1):
+            logger.info(f"  {rank}. {a_text!r} ({score:.4f})")
+
+    return neighbours
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from kronos.nodes.project_logging import default_logging
+
+    default_logging()
+
+    parser = argparse.ArgumentParser(
+        description="Searches a local text embedding file for the texts nearest "
+        "to each query by cosine similarity"
+    )
+    parser.add_argument(
+        "-pte",
+        "--path_text_emb",
+        type=Path,
+        required=True,
+        help="Path from which text array and embedding array are loaded",
+    )
+    parser.add_argument(
+        "-q",
+        "--query_text",
+        type=str,
+        nargs="+",
+        required=True,
+        help="Query texts, which have to be present in the embedding file "
+        "unless a sentence transformer is given to embed them",
+    )
+    parser.add_argument(
+        "-k",
+        "--k",
+        type=int,
+        required=False,
+        default=10,
+        help="Number of nearest neighbours returned per query",
+    )
+    parser.add_argument(
+        "-pst",
+        "--path_sentence_transformer",
+        type=Path,
+        required=False,
+        default=None,
+        help="Path to a directory from which a sentence transformer embedding "
+        "free text queries is instantiated",
+    )
+    parser.add_argument(
+        "-it",
+        "--index_type",
+        type=SearchIndexType,
+        required=False,
+        default=SearchIndexType.exact,
+        help="Whether every embedding is scored or only those in the clusters "
+        "of an IVF index nearest to each query",
+    )
+    parser.add_argument(
+        "-nl",
+        "--n_list",
+        type=int,
+        required=False,
+        default=1024,
+        help="Number of clusters of a newly built IVF index",
+    )
+    parser.add_argument(
+        "-np",
+        "--n_probe",
+        type=int,
+        required=False,
+        default=8,
+        help="Number of IVF clusters scored per query, trading speed for recall",
+    )
+    parser.add_argument(
+        "-ri",
+        "--rebuild_index",
+        action="store_true",
+        help="Rebuild the IVF index even if an up to date one exists",
+    )
+    parser.add_argument(
+        "-bs",
+        "--block_size",
+        type=int,
+        required=False,
+        default=DEFAULT_BLOCK_SIZE,
+        help="Number of embeddings scored per matrix multiplication",
+    )
+
+    args = parser.parse_args()
+
+    search_emb(
+        path_text_emb=args.path_text_emb,
+        query_text=args.query_text,
+        k=args.k,
+        path_sentence_transformer=args.path_sentence_transformer,
+        index_type=args.index_type,
+        n_list=args.n_list,
+        n_probe=args.n_probe,
+        rebuild_index=args.rebuild_index,
+        block_size=args.block_size,
+    )
@@ -1,18 +1,30 @@
 from pathlib import Path
-from typing import List
+from typing import List, Optional
 
 import numpy as np
 from sentence_transformers import SentenceTransformer
 
+from kronos.data_interfaces.emb_cache_data_interface import EmbCacheDataInterface
 from kronos.data_interfaces.node_dfs_data_interface import NodeDFsDataInterface
 from kronos.data_interfaces.text_emb_local_data_interface import (
+    EmbDType,
     TextEmbLocalDataInterface,
 )
-from kronos.nodes.vectorise_text_feats import _vectorise_with_sentence_transformer
+from kronos.nodes.vectorise_text_feats import (
+    SentTxEncodeMode,
+    _vectorise_with_sentence_transformer,
+    sentence_transformer_identity,
+)
 
 
 def vectorise_with_sent_tx_local(
-    path_semantics_node_dfs: Path, path_sentence_transformer: Path, path_text_emb: Path
+    path_semantics_node_dfs: Path,
+    path_sentence_transformer: Path,
+    path_text_emb: Path,
+    emb_dtype: Optional[EmbDType] = None,
+    path_emb_cache: Optional[Path] = None,
+    max_cache_entries: int = 1_000_000,
+    encode_mode: SentTxEncodeMode = SentTxEncodeMode.single,
 ) -> None:
     # Data Access - Input
     semantics_node_dfs_data_interface = NodeDFsDataInterface(
@@ -24,20 +36,47 @@ def vectorise_with_sent_tx_local(
         model_name_or_path=str(path_sentence_transformer)
     )
 
+    emb_cache = (
+        None
+        if path_emb_cache is None
+        else EmbCacheDataInterface(
+            filepath=path_emb_cache, max_entries=max_cache_entries
+        )
+    )
+
     # Task Processing
     list_text: List[str] = []
     list_emb: List[np.ndarray] = []
     for single_text, single_emb in _vectorise_with_sentence_transformer(
-        node_dfs=semantics_node_dfs, sentence_transformer=sentence_transformer
+        node_dfs=semantics_node_dfs,
+        sentence_transformer=sentence_transformer,
+        emb_cache=emb_cache,
+        model_name=(
+            None
+            if emb_cache is None
+            else sentence_transformer_identity(
+                path_sentence_transformer=path_sentence_transformer
+            )
+        ),
+        encode_mode=encode_mode,
     ):
         list_text.append(single_text)
         list_emb.append(single_emb)
     text = np.array(list_text)
     emb = np.array(list_emb)
 
+    if emb_cache is not None:
+        emb_cache.log_stats()
+        emb_cache.close()
+
     # Data Access - Output
     text_emb_local_data_interface = TextEmbLocalDataInterface(filepath=path_text_emb)
-    text_emb_local_data_interface.save(text=text, emb=emb)
+    text_emb_local_data_interface.save(
+        text=text,
+        emb=emb,
+        model_name=path_sentence_transformer.name,
+        emb_dtype=emb_dtype,
+    )
 
 
 if __name__ == "__main__":
@@ -70,7 +109,45 @@ if __name__ == "__main__":
         "--path_text_emb",
         type=Path,
         required=True,
-        help="Path to which text array and embedding array are saved",
+        help="Path to which text array and embedding array are saved. Paths "
+        "ending with .emb are saved as a memory-mappable embedding store",
+    )
+    parser.add_argument(
+        "-ed",
+        "--emb_dtype",
+        type=EmbDType,
+        required=False,
+        default=None,
+        help="Floating point type in which embeddings are stored, e.g. float16 "
+        "to halve disk and memory usage",
+    )
+    parser.add_argument(
+        "-pec",
+        "--path_emb_cache",
+        type=Path,
+        required=False,
+        default=None,
+        help="Path to a sqlite embedding cache consulted before embedding texts "
+        "and updated with newly embedded texts",
+    )
+    parser.add_argument(
+        "-mce",
+        "--max_cache_entries",
+        type=int,
+        required=False,
+        default=1_000_000,
+        help="Number of embeddings beyond which least recently used cache "
+        "entries are evicted",
+    )
+    parser.add_argument(
+        "-em",
+        "--encode_mode",
+        type=SentTxEncodeMode,
+        required=False,
+        default=SentTxEncodeMode.single,
+        help="Whether texts are encoded in a single process, streamed through "
+        "a pool of worker processes or batched by token lengths under a token "
+        "budget",
     )
 
     args = parser.parse_args()
@@ -79,4 +156,8 @@ if __name__ == "__main__":
         path_semantics_node_dfs=args.path_semantics_node_dfs,
         path_sentence_transformer=args.path_sentence_transformer,
         path_text_emb=args.path_text_emb,
+        emb_dtype=args.emb_dtype,
+        path_emb_cache=args.path_emb_cache,
+        max_cache_entries=args.max_cache_entries,
+        encode_mode=args.encode_mode,
     )
@@ -1,20 +1,30 @@
 from pathlib import Path
-from typing import List
+from typing import List, Optional
 
 import numpy as np
 
+from kronos.data_interfaces.emb_cache_data_interface import EmbCacheDataInterface
 from kronos.data_interfaces.node_dfs_data_interface import NodeDFsDataInterface
 from kronos.data_interfaces.spacy_pipeline_data_interface import (
     SpacyPipelineDataInterface,
 )
 from kronos.data_interfaces.text_emb_local_data_interface import (
+    EmbDType,
     TextEmbLocalDataInterface,
 )
-from kronos.nodes.vectorise_text_feats import _vectorise_with_word_vector
+from kronos.nodes.vectorise_text_feats import (
+    _vectorise_with_word_vector,
+    spacy_pipeline_identity,
+)
 
 
 def vectorise_with_word_vector_local(
-    path_semantics_node_dfs: Path, path_spacy_pipeline: Path, path_text_emb: Path
+    path_semantics_node_dfs: Path,
+    path_spacy_pipeline: Path,
+    path_text_emb: Path,
+    emb_dtype: Optional[EmbDType] = None,
+    path_emb_cache: Optional[Path] = None,
+    max_cache_entries: int = 1_000_000,
 ) -> None:
     # Data Access - Input
     semantics_node_dfs_data_interface = NodeDFsDataInterface(
@@ -27,20 +37,43 @@ def vectorise_with_word_vector_local(
     )
     spacy_pipeline = spacy_pipeline_data_interface.load()
 
+    emb_cache = (
+        None
+        if path_emb_cache is None
+        else EmbCacheDataInterface(
+            filepath=path_emb_cache, max_entries=max_cache_entries
+        )
+    )
+
     # Task Processing
     list_text: List[str] = []
     list_emb: List[np.ndarray] = []
     for single_text, single_emb in _vectorise_with_word_vector(
-        node_dfs=semantics_node_dfs, spacy_pipeline=spacy_pipeline
+        node_dfs=semantics_node_dfs,
+        spacy_pipeline=spacy_pipeline,
+        emb_cache=emb_cache,
+        model_name=(
+            None
+            if emb_cache is None
+            else spacy_pipeline_identity(
+                spacy_pipeline=spacy_pipeline, path_spacy_pipeline=path_spacy_pipeline
+            )
+        ),
     ):
         list_text.append(single_text)
         list_emb.append(single_emb)
     text = np.array(list_text)
     emb = np.array(list_emb)
 
+    if emb_cache is not None:
+        emb_cache.log_stats()
+        emb_cache.close()
+
     # Data Access - Output
     text_emb_local_data_interface = TextEmbLocalDataInterface(filepath=path_text_emb)
-    text_emb_local_data_interface.save(text=text, emb=emb)
+    text_emb_local_data_interface.save(
+        text=text, emb=emb, model_name=path_spacy_pipeline.name, emb_dtype=emb_dtype
+    )
 
 
 if __name__ == "__main__":
@@ -73,7 +106,35 @@ if __name__ == "__main__":
         "--path_text_emb",
         type=Path,
         required=True,
-        help="Path to which text array and embedding array are saved",
+        help="Path to which text array and embedding array are saved. Paths "
+        "ending with .emb are saved as a memory-mappable embedding store",
+    )
+    parser.add_argument(
+        "-ed",
+        "--emb_dtype",
+        type=EmbDType,
+        required=False,
+        default=None,
+        help="Floating point type in which embeddings are stored, e.g. float16 "
+        "to halve disk and memory usage",
+    )
+    parser.add_argument(
+        "-pec",
+        "--path_emb_cache",
+        type=Path,
+        required=False,
+        default=None,
+        help="Path to a sqlite embedding cache consulted before embedding texts "
+        "and updated with newly embedded texts",
+    )
+    parser.add_argument(
+        "-mce",
+        "--max_cache_entries",
+        type=int,
+        required=False,
+        default=1_000_000,
+        help="Number of embeddings beyond which least recently used cache "
+        "entries are evicted",
     )
 
     args = parser.parse_args()
@@ -82,4 +143,7 @@ if __name__ == "__main__":
         path_semantics_node_dfs=args.path_semantics_node_dfs,
         path_spacy_pipeline=args.path_spacy_pipeline,
         path_text_emb=args.path_text_emb,
+        emb_dtype=args.emb_dtype,
+        path_emb_cache=args.path_emb_cache,
+        max_cache_entries=args.max_cache_entries,
     )
@@ -6,6 +6,7 @@ import pytest
 from pandas.testing import assert_frame_equal
 
 from kronos.data_interfaces.edge_dfs_data_interface import (
+    EdgeAttrKey,
     EdgeDF,
     EdgeDFs,
     EdgeDFsDataInterface,
@@ -60,6 +61,28 @@ def test_edge_dfs_to_dict() -> None:
     assert_frame_equal(result_dict[EdgeType.right], df2)
 
 
+def test_edge_dfs_nids_by_ntype() -> None:
+    # Arrange
+    df = pd.DataFrame(
+        {
+            EdgeAttrKey.src_nid.value: [0, 1],
+            EdgeAttrKey.src_ntype.value: "Token",
+            EdgeAttrKey.dst_nid.value: [5, 6],
+            EdgeAttrKey.dst_ntype.value: "SheetCell",
+        }
+    )
+    edge_dfs = EdgeDFs(members=[EdgeDF(etype=EdgeType.token_to_cell, df=df)])
+
+    # Act
+    result = edge_dfs.nids_by_ntype
+
+    # Assert
+    assert {key: value.tolist() for key, value in result.items()} == {
+        "Token": [0, 1],
+        "SheetCell": [5, 6],
+    }
+
+
 #
 # Data interface tests
 #
@@ -107,3 +130,37 @@ def test_load(mock_from_dict: Mock, mock_loads: Mock, mock_file: Mock) -> None:
     mock_loads.assert_called_once()
     mock_from_dict.assert_called_once()
     assert isinstance(result, EdgeDFs)
+
+
+@pytest.mark.parametrize("suffix", [".parquet", ".arrow"])
+def test_save_load_binary_round_trip(tmp_path: Path, suffix: str) -> None:
+    # Arrange
+    filepath = tmp_path / f"edges{suffix}"
+    df = pd.DataFrame(
+        {
+            EdgeAttrKey.src_nid.value: [0, 1],
+            EdgeAttrKey.dst_nid.value: [1, 0],
+            EdgeAttrKey.src_ntype.value: "SheetCell",
+            EdgeAttrKey.etype.value: pd.Categorical([EdgeType.up.value] * 2),
+            EdgeAttrKey.dst_ntype.value: "SheetCell",
+            EdgeAttrKey.distance.value: [4, 4],
+        },
+        index=[3, 7],  # Layout edge dataframes keep their non-default index
+    )
+    edge_dfs = EdgeDFs(members=[EdgeDF(etype=EdgeType.up, df=df)])
+    interface = EdgeDFsDataInterface(filepath=filepath)
+
+    # Act
+    interface.save(edge_dfs)
+    loaded_edge_dfs = interface.load()
+    loaded_subset = (
+        interface.load(columns=[EdgeAttrKey.src_nid.value], memory_map=True)
+        .members[0]
+        .df
+    )
+
+    # Assert
+    assert loaded_edge_dfs.etypes == [EdgeType.up]
+    assert_frame_equal(loaded_edge_dfs.members[0].df, df)
+    assert loaded_subset.columns.tolist() == [EdgeAttrKey.src_nid.value]
+    assert loaded_subset.index.tolist() == [3, 7]
@@ -0,0 +1,70 @@
+from pathlib import Path
+
+import numpy as np
+from pytest import fixture
+
+from kronos.data_interfaces.emb_cache_data_interface import (
+    EmbCacheDataInterface,
+    emb_cache_key,
+)
+
+
+@fixture
+def mock_emb_cache(tmp_path: Path) -> EmbCacheDataInterface:
+    return EmbCacheDataInterface(filepath=tmp_path / "emb_cache.sqlite", max_entries=2)
+
+
+def test_emb_cache_key() -> None:
+    assert emb_cache_key("model_a", "text") == emb_cache_key("model_a", "text")
+    assert emb_cache_key("model_a", "text") != emb_cache_key("model_b", "text")
+
+
+def test_put_get_many(mock_emb_cache: EmbCacheDataInterface) -> None:
+    # Arrange
+    emb = np.array([1.0, 2.0, 3.0], dtype=np.float32)
+
+    # Act
+    mock_emb_cache.put_many(model_name="model_a", text_emb=[("text", emb)])
+    found = mock_emb_cache.get_many(model_name="model_a", text=["text", "other"])
+    not_found = mock_emb_cache.get_many(model_name="model_b", text=["text"])
+
+    # Assert
+    assert list(found) == ["text"]
+    assert found["text"].dtype == np.float32
+    np.testing.assert_array_equal(found["text"], emb)
+    assert not_found == {}
+    assert mock_emb_cache.n_hit == 1
+    assert mock_emb_cache.n_miss == 2
+
+
+def test_lru_eviction(mock_emb_cache: EmbCacheDataInterface) -> None:
+    # Arrange
+    mock_emb_cache.put_many(
+        model_name="model_a",
+        text_emb=[("first", np.zeros(2)), ("second", np.ones(2))],
+    )
+    _ = mock_emb_cache.get_many(model_name="model_a", text=["first"])
+
+    # Act
+    mock_emb_cache.put_many(model_name="model_a", text_emb=[("third", np.ones(2))])
+
+    # Assert
+    assert len(mock_emb_cache) == 2
+    assert mock_emb_cache.n_evicted == 1
+    found = mock_emb_cache.get_many(
+        model_name="model_a", text=["first", "second", "third"]
+    )
+    assert set(found) == {"first", "third"}
+
+
+def test_persistence(tmp_path: Path) -> None:
+    filepath = tmp_path / "emb_cache.sqlite"
+    emb_cache = EmbCacheDataInterface(filepath=filepath)
+    emb_cache.put_many(model_name="model_a", text_emb=[("text", np.ones(2))])
+    emb_cache.close()
+
+    found = EmbCacheDataInterface(filepath=filepath).get_many(
+        model_name="model_a", text=["text"]
+    )
+
+    np.testing.assert_array_equal(found["text"], np.ones(2))
@@ -0,0 +1,32 @@
+from pathlib import Path
+
+import numpy as np
+
+from kronos.data_interfaces.emb_index_data_interface import (
+    EmbIndexDataInterface,
+    ivf_index_path,
+)
+from kronos.nodes.search_emb import IVFIndex
+
+
+def test_ivf_index_path() -> None:
+    assert ivf_index_path(Path("/data/emb.npz")) == Path("/data/emb.ivf.npz")
+    assert ivf_index_path(Path("/data/emb.emb")) == Path("/data/emb.ivf.npz")
+
+
+def test_save_load_round_trip(tmp_path: Path) -> None:
+    # Arrange
+    emb = np.random.default_rng(0).normal(size=(50, 8)).astype(np.float32)
+    ivf_index = IVFIndex.build(emb=emb, n_list=4)
+    data_interface = EmbIndexDataInterface(filepath=tmp_path / "emb.ivf.npz")
+
+    # Act
+    data_interface.save(ivf_index=ivf_index)
+    loaded = data_interface.load()
+
+    # Assert
+    assert data_interface.exists()
+    np.testing.assert_array_equal(loaded.centroids, ivf_index.centroids)
+    np.testing.assert_array_equal(loaded.order, ivf_index.order)
+    np.testing.assert_array_equal(loaded.starts, ivf_index.starts)
+    assert loaded.digest == ivf_index.digest
@@ -0,0 +1,163 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+from pandas import DataFrame
+from pytest import fixture
+
+from kronos.data_interfaces.edge_dfs_data_interface import (
+    EdgeAttrKey,
+    EdgeDF,
+    EdgeDFs,
+    EdgeType,
+)
+from kronos.data_interfaces.hetero_graph_data_interface import (
+    HeteroGraph,
+    HeteroGraphDataInterface,
+    build_csr,
+    gather_csr,
+)
+from kronos.data_interfaces.node_dfs_data_interface import NodeDFs, NodeType
+from kronos.nodes.assemble_kg import _assemble_kg
+from kronos.nodes.utils_columnar import EdgeDFBuilder, node_df_from_texts
+
+
+@fixture
+def mock_hetero_graph() -> HeteroGraph:
+    # Cells 0 -> 1 -> 2 -> 3 upwards and token 0 in cells 2 and 3
+    up = EdgeDFBuilder(
+        etype=EdgeType.up,
+        src_ntype=NodeType.sheet_cell,
+        dst_ntype=NodeType.sheet_cell,
+        attr_keys=(EdgeAttrKey.distance,),
+    )
+    up.extend([0, 1, 2], [1, 2, 3], [1, 1, 2])
+    token_to_cell = EdgeDFBuilder(
+        etype=EdgeType.token_to_cell,
+        src_ntype=NodeType.token,
+        dst_ntype=NodeType.sheet_cell,
+        attr_keys=(EdgeAttrKey.i_token_in_doc,),
+    )
+    token_to_cell.extend([0, 0], [3, 2], [0, 0])
+
+    node_dfs = NodeDFs(
+        members=[
+            node_df_from_texts(NodeType.sheet_cell, ["a", "b", "c", "d"]),
+            node_df_from_texts(NodeType.token, ["d"]),
+        ]
+    )
+    edge_dfs = EdgeDFs(members=[up.to_edge_df(), token_to_cell.to_edge_df()])
+
+    return HeteroGraph.from_dfs(node_dfs=node_dfs, edge_dfs=edge_dfs)
+
+
+def test_build_and_gather_csr() -> None:
+    # Arrange
+    keys = np.array([2, 0, 2, 1])
+    values = np.array([10, 11, 12, 13])
+
+    # Act
+    indptr, sorted_values = build_csr(keys=keys, values=values, n_key=4)
+
+    # Assert
+    assert indptr.tolist() == [0, 1, 2, 4, 4]
+    assert sorted_values.tolist() == [11, 13, 10, 12]
+    assert gather_csr(indptr, sorted_values, np.array([2, 3, 0])).tolist() == [
+        10,
+        12,
+        11,
+    ]
+    assert gather_csr(indptr, sorted_values, np.array([3])).tolist() == []
+
+
+def test_neighbours_and_degrees(mock_hetero_graph: HeteroGraph) -> None:
+    assert mock_hetero_graph.num_nodes() == 5
+    assert mock_hetero_graph.num_edges() == 5
+    assert mock_hetero_graph.num_edges(EdgeType.up) == 3
+    assert mock_hetero_graph.out_neighbours(EdgeType.up, 1).tolist() == [2]
+    assert mock_hetero_graph.in_neighbours(EdgeType.up, 0).tolist() == []
+    assert mock_hetero_graph.out_neighbours(EdgeType.token_to_cell, 0).tolist() == [
+        3,
+        2,
+    ]
+    assert mock_hetero_graph.out_degrees(EdgeType.up).tolist() == [1, 1, 1, 0]
+    assert mock_hetero_graph.in_degrees(EdgeType.token_to_cell).tolist() == [
+        0,
+        0,
+        1,
+        1,
+    ]
+
+
+def test_k_hop(mock_hetero_graph: HeteroGraph) -> None:
+    # Act
+    one_hop = mock_hetero_graph.k_hop(seeds={NodeType.sheet_cell: [0]}, k=1)
+    all_hops = mock_hetero_graph.k_hop(seeds={NodeType.sheet_cell: [0]}, k=10)
+    reversed_hops = mock_hetero_graph.k_hop(
+        seeds={NodeType.sheet_cell: [2]}, k=2, reverse=True
+    )
+    typed_hops = mock_hetero_graph.k_hop(
+        seeds={NodeType.token: [0]}, k=2, etypes=[EdgeType.token_to_cell]
+    )
+
+    # Assert
+    assert one_hop[NodeType.sheet_cell].tolist() == [0, 1]
+    assert all_hops[NodeType.sheet_cell].tolist() == [0, 1, 2, 3]
+    assert reversed_hops[NodeType.sheet_cell].tolist() == [0, 1, 2]
+    assert reversed_hops[NodeType.token].tolist() == [0]
+    assert typed_hops[NodeType.sheet_cell].tolist() == [2, 3]
+
+
+def test_to_networkx(mock_node_dfs: NodeDFs, mock_edge_dfs: EdgeDFs) -> None:
+    # Arrange
+    nx_g = _assemble_kg(node_dfs=mock_node_dfs, edge_dfs=mock_edge_dfs)
+
+    # Act
+    hetero_graph = HeteroGraph.from_dfs(node_dfs=mock_node_dfs, edge_dfs=mock_edge_dfs)
+    converted = hetero_graph.to_networkx()
+
+    # Assert
+    assert list(converted.nodes(data=True)) == list(nx_g.nodes(data=True))
+    assert list(converted.edges(data=True)) == list(nx_g.edges(data=True))
+
+
+def test_from_dfs_mixed_ntypes(mock_node_dfs: NodeDFs) -> None:
+    edge_df = EdgeDF(
+        etype=EdgeType.up,
+        df=DataFrame(
+            {
+                EdgeAttrKey.src_nid.value: [0, 0],
+                EdgeAttrKey.dst_nid.value: [1, 0],
+                EdgeAttrKey.src_ntype.value: [
+                    NodeType.sheet_cell.value,
+                    NodeType.token.value,
+                ],
+                EdgeAttrKey.dst_ntype.value: [NodeType.sheet_cell.value] * 2,
+                EdgeAttrKey.etype.value: [EdgeType.up.value] * 2,
+            }
+        ),
+    )
+
+    with pytest.raises(ValueError):
+        _ = HeteroGraph.from_dfs(node_dfs=mock_node_dfs, edge_dfs=EdgeDFs([edge_df]))
+
+
+@pytest.mark.parametrize("memory_map", [False, True])
+def test_save_load(
+    tmp_path: Path, mock_hetero_graph: HeteroGraph, memory_map: bool
+) -> None:
+    # Arrange
+    interface = HeteroGraphDataInterface(filepath=tmp_path / "hetero_graph")
+
+    # Act
+    interface.save(hetero_graph=mock_hetero_graph)
+    loaded = interface.load(memory_map=memory_map)
+
+    # Assert
+    assert list(loaded.nodes) == list(mock_hetero_graph.nodes)
+    assert list(loaded.edges) == list(mock_hetero_graph.edges)
+    assert loaded.edges[EdgeType.up].src.dtype == np.int32
+    assert loaded.out_neighbours(EdgeType.token_to_cell, 0).tolist() == [3, 2]
+    converted, expected = loaded.to_networkx(), mock_hetero_graph.to_networkx()
+    assert list(converted.nodes(data=True)) == list(expected.nodes(data=True))
+    assert list(converted.edges(data=True)) == list(expected.edges(data=True))
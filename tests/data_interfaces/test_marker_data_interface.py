@@ -0,0 +1,65 @@
+from datetime import datetime, timezone
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from kronos.data_interfaces.marker_data_interface import (
+    ConsumedMarker,
+    ConsumedMarkerDataInterface,
+    RefreshMarker,
+    RefreshMarkerDataInterface,
+    RefreshStatus,
+)
+
+
+def test_save_load(tmp_path: Path) -> None:
+    # Arrange
+    refresh_marker = RefreshMarker(
+        status=RefreshStatus.unchanged,
+        version="2024-02-22T11.06.43.555Z",
+        content_hash="9b845d60fb073a6a69fd3ab0e2c309a2",
+        previous_version="2024-02-22T11.06.43.555Z",
+        checked_at=datetime(2024, 3, 4, 15, 36, 20, tzinfo=timezone.utc),
+    )
+    data_interface = RefreshMarkerDataInterface(
+        filepath=tmp_path / "markers" / "refresh_marker.json"
+    )
+
+    # Act
+    loaded_before_save = data_interface.load()
+    data_interface.save(marker=refresh_marker)
+    data_interface.save(marker=refresh_marker)  # Overwrites
+    loaded_refresh_marker = data_interface.load()
+
+    # Assert
+    assert loaded_before_save is None
+    assert loaded_refresh_marker == refresh_marker
+    assert [path.name for path in data_interface.filepath.parent.iterdir()] == [
+        "refresh_marker.json"
+    ]
+
+
+def test_failed_save_keeps_the_previous_marker(tmp_path: Path) -> None:
+    # Arrange
+    consumed_marker = ConsumedMarker(
+        version="2024-02-22T11.06.43.555Z",
+        content_hash="9b845d60fb073a6a69fd3ab0e2c309a2",
+        consumed_at=datetime(2024, 3, 4, 15, 36, 20, tzinfo=timezone.utc),
+    )
+    data_interface = ConsumedMarkerDataInterface(
+        filepath=tmp_path / "consumed_marker.json"
+    )
+    data_interface.save(marker=consumed_marker)
+
+    # Act
+    with patch("os.replace", side_effect=OSError("Disk full")):
+        with pytest.raises(OSError, match="Disk full"):
+            data_interface.save(
+                marker=consumed_marker.model_copy(update={"version": "v1"})
+            )
+
+    # Assert
+    assert data_interface.load() == consumed_marker
+    # Temporary files are removed
+    assert [path.name for path in tmp_path.iterdir()] == ["consumed_marker.json"]
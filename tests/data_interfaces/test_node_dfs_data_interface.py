@@ -1,4 +1,5 @@
 from pathlib import Path
+from typing import List
 from unittest.mock import Mock, mock_open, patch
 
 import pandas as pd
@@ -58,7 +59,7 @@ def test_node_dfs_validate_non_unique_ids() -> None:
     node_dfs = NodeDFs(members=[node_df])
 
     # Act & Assert
-    with pytest.raises(ValueError):
+    with pytest.raises(ValueError, match=r"SheetCell: 1 ids such as \[1\]"):
         node_dfs.validate()
 
 
@@ -150,3 +151,57 @@ def test_load(mock_from_dict: Mock, mock_loads: Mock, mock_file: Mock) -> None:
     mock_loads.assert_called_once()
     mock_from_dict.assert_called_once()
     assert isinstance(result, NodeDFs)
+
+
+@pytest.mark.parametrize("suffix", [".parquet", ".arrow"])
+def test_save_load_binary_round_trip(tmp_path: Path, suffix: str) -> None:
+    # Arrange
+    filepath = tmp_path / f"nodes{suffix}"
+    df = pd.DataFrame(
+        {
+            NodeAttrKey.nid.value: [0, 1],
+            NodeAttrKey.ntype.value: NodeType.sheet_cell.value,
+            NodeAttrKey.text.value: ["text1", "text2"],
+            NodeAttrKey.coord.value: [[0, 1], [2, 3]],
+        }
+    )
+    node_dfs = NodeDFs(members=[NodeDF(ntype=NodeType.sheet_cell, df=df)])
+    interface = NodeDFsDataInterface(filepath=filepath)
+
+    # Act
+    interface.save(node_dfs)
+    loaded_node_dfs = interface.load()
+
+    # Assert
+    assert (filepath / "manifest.json").is_file()
+    assert (filepath / f"{NodeType.sheet_cell.value}{suffix}").is_file()
+    assert loaded_node_dfs.ntypes == [NodeType.sheet_cell]
+    assert_frame_equal(loaded_node_dfs.members[0].df, df)
+
+
+@pytest.mark.parametrize(
+    "suffix,memory_map", [(".parquet", True), (".arrow", True), (".json", False)]
+)
+def test_load_selected_columns(tmp_path: Path, suffix: str, memory_map: bool) -> None:
+    # Arrange
+    filepath = tmp_path / f"nodes{suffix}"
+    df = pd.DataFrame(
+        {
+            NodeAttrKey.nid.value: [0, 1],
+            NodeAttrKey.ntype.value: NodeType.token.value,
+            NodeAttrKey.text.value: ["text1", "text2"],
+        }
+    )
+    interface = NodeDFsDataInterface(filepath=filepath)
+    interface.save(NodeDFs(members=[NodeDF(ntype=NodeType.token, df=df)]))
+    columns: List[str] = [NodeAttrKey.text.value, "absent"]
+
+    # Act
+    loaded_node_dfs = interface.load(columns=columns, memory_map=memory_map)
+
+    # Assert
+    assert loaded_node_dfs.members[0].df.columns.tolist() == [NodeAttrKey.text.value]
+    assert loaded_node_dfs.members[0].df[NodeAttrKey.text.value].tolist() == [
+        "text1",
+        "text2",
+    ]
@@ -0,0 +1,78 @@
+from pathlib import Path
+
+from pytest import fixture
+
+from kronos.data_interfaces.parse_cache_data_interface import (
+    ParseCacheDataInterface,
+    ParsedText,
+    parse_cache_key,
+)
+
+CAPE_TOWN_TOUR = ParsedText(
+    tokens=("Cape", "Town", "tour"), ents=(("Cape Town", "GPE", 0, 2),)
+)
+LUNCH = ParsedText(tokens=("Lunch",), ents=())
+
+
+@fixture
+def mock_parse_cache(tmp_path: Path) -> ParseCacheDataInterface:
+    return ParseCacheDataInterface(
+        filepath=tmp_path / "parse_cache.sqlite", max_entries=2
+    )
+
+
+def test_parse_cache_key() -> None:
+    assert parse_cache_key("en_a-1.0", "text") == parse_cache_key("en_a-1.0", "text")
+    assert parse_cache_key("en_a-1.0", "text") != parse_cache_key("en_a-1.1", "text")
+
+
+def test_put_get_many(mock_parse_cache: ParseCacheDataInterface) -> None:
+    # Act
+    mock_parse_cache.put_many(
+        pipeline_name="en_a-1.0", text_parsed=[("Cape Town tour", CAPE_TOWN_TOUR)]
+    )
+    found = mock_parse_cache.get_many(
+        pipeline_name="en_a-1.0", text=["Cape Town tour", "other"]
+    )
+    not_found = mock_parse_cache.get_many(
+        pipeline_name="en_a-1.1", text=["Cape Town tour"]
+    )
+
+    # Assert
+    assert found == {"Cape Town tour": CAPE_TOWN_TOUR}
+    assert not_found == {}
+    assert mock_parse_cache.n_hit == 1
+    assert mock_parse_cache.n_miss == 2
+
+
+def test_lru_eviction(mock_parse_cache: ParseCacheDataInterface) -> None:
+    # Arrange
+    mock_parse_cache.put_many(
+        pipeline_name="en_a-1.0",
+        text_parsed=[("Cape Town tour", CAPE_TOWN_TOUR), ("Lunch", LUNCH)],
+    )
+    _ = mock_parse_cache.get_many(pipeline_name="en_a-1.0", text=["Cape Town tour"])
+
+    # Act
+    mock_parse_cache.put_many(pipeline_name="en_a-1.0", text_parsed=[("L", LUNCH)])
+
+    # Assert
+    assert len(mock_parse_cache) == 2
+    assert mock_parse_cache.n_evicted == 1
+    found = mock_parse_cache.get_many(
+        pipeline_name="en_a-1.0", text=["Cape Town tour", "Lunch", "L"]
+    )
+    assert set(found) == {"Cape Town tour", "L"}
+
+
+def test_persistence(tmp_path: Path) -> None:
+    filepath = tmp_path / "parse_cache.sqlite"
+    parse_cache = ParseCacheDataInterface(filepath=filepath)
+    parse_cache.put_many(pipeline_name="en_a-1.0", text_parsed=[("Lunch", LUNCH)])
+    parse_cache.close()
+
+    found = ParseCacheDataInterface(filepath=filepath).get_many(
+        pipeline_name="en_a-1.0", text=["Lunch"]
+    )
+
+    assert found == {"Lunch": LUNCH}
@@ -6,8 +6,11 @@ import numpy as np
 import pytest
 
 from kronos.data_interfaces.text_emb_local_data_interface import (
+    EmbDType,
     NPArrayName,
     TextEmbLocalDataInterface,
+    decode_text,
+    encode_text,
 )
 
 
@@ -60,3 +63,66 @@ def test_load(
     assert np.array_equal(loaded_text, text)
     assert np.array_equal(loaded_emb, emb)
     mock_load.assert_called_once_with(mock_filepath)
+
+
+def test_encode_decode_text() -> None:
+    text = np.array(["Room 101", "", "Café"])
+
+    offsets, text_bytes = encode_text(text)
+
+    assert offsets.tolist() == [0, 8, 8, 13]
+    decoded = decode_text(offsets, np.frombuffer(text_bytes, dtype=np.uint8))
+    assert decoded.tolist() == text.tolist()
+
+
+def test_save_load_store(
+    tmp_path: Path, mock_text_emb_arrays: Tuple[np.ndarray, np.ndarray]
+) -> None:
+    # Arrange
+    text, emb = mock_text_emb_arrays
+    interface = TextEmbLocalDataInterface(tmp_path / "data.emb")
+
+    # Act
+    interface.save(text, emb, model_name="all-MiniLM-L6-v2")
+    header = interface.load_header()
+    loaded_text, loaded_emb = interface.load()
+
+    # Assert
+    assert header.row_count == 2
+    assert header.dim == 628
+    assert header.dtype == EmbDType.float64
+    assert header.model_name == "all-MiniLM-L6-v2"
+    assert isinstance(loaded_emb, np.memmap)
+    assert np.array_equal(loaded_text, text)
+    assert np.array_equal(loaded_emb, emb)
+
+
+def test_save_store_float16(
+    tmp_path: Path, mock_text_emb_arrays: Tuple[np.ndarray, np.ndarray]
+) -> None:
+    text, emb = mock_text_emb_arrays
+    interface = TextEmbLocalDataInterface(tmp_path / "data.emb")
+
+    interface.save(text, emb, emb_dtype=EmbDType.float16)
+    _, loaded_emb = interface.load()
+
+    assert interface.load_header().dtype == EmbDType.float16
+    assert loaded_emb.dtype == np.float16
+    np.testing.assert_allclose(loaded_emb, emb, atol=1e-3)
+
+
+@pytest.mark.parametrize("filename", ["data.emb", "data.npz"])
+def test_iter_chunks(tmp_path: Path, filename: str) -> None:
+    # Arrange
+    text = np.array([f"text {i}" for i in range(5)])
+    emb = np.arange(10, dtype=np.float32).reshape(5, 2)
+    interface = TextEmbLocalDataInterface(tmp_path / filename)
+    interface.save(text, emb)
+
+    # Act
+    chunks = list(interface.iter_chunks(chunk_size=2))
+
+    # Assert
+    assert [len(text_chunk) for text_chunk, _ in chunks] == [2, 2, 1]
+    assert np.array_equal(np.concatenate([t for t, _ in chunks]), text)
+    assert np.array_equal(np.concatenate([e for _, e in chunks]), emb)
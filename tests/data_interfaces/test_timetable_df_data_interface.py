@@ -2,9 +2,13 @@ from pathlib import Path
 from typing import List
 from unittest.mock import Mock, patch
 
+import numpy as np
 import pandas as pd
 
-from kronos.data_interfaces.timetable_df_data_interface import TimeTableDFDataInterface
+from kronos.data_interfaces.timetable_df_data_interface import (
+    SparseSheet,
+    TimeTableDFDataInterface,
+)
 from tests.conftest import TestDataPaths
 
 
@@ -77,3 +81,192 @@ def test_load_most_recent_version(tmp_path: Path) -> None:
     # Given header is removed during save, loaded dataframe has default column names
     recent_timetable_df = recent_timetable_df.rename({"A": 0}, axis=1)
     pd.testing.assert_frame_equal(loaded_df, recent_timetable_df, check_like=True)
+
+
+def test_load_pinned_version(tmp_path: Path) -> None:
+    # Arrange
+    filepath = tmp_path / "timetable_df.csv"
+    for version, text in [
+        ("2024-02-20T17.34.32.739Z", "old"),
+        ("2024-02-20T17.34.55.964Z", "new"),
+    ]:
+        TimeTableDFDataInterface(filepath=filepath, version=version).save(
+            pd.DataFrame({0: [text]})
+        )
+
+    # Act
+    data_interface = TimeTableDFDataInterface(
+        filepath=filepath, version="2024-02-20T17.34.32.739Z"
+    )
+    loaded_df = data_interface.load()
+
+    # Assert
+    assert data_interface.versions() == [
+        "2024-02-20T17.34.32.739Z",
+        "2024-02-20T17.34.55.964Z",
+    ]
+    assert loaded_df[0].tolist() == ["old"]
+
+
+def test_save_skips_duplicate_snapshot(tmp_path: Path) -> None:
+    # Arrange
+    filepath = tmp_path / "timetable_df.csv"
+    data_interface = TimeTableDFDataInterface(filepath=filepath)
+    df = pd.DataFrame({0: ["Lunch", "MATH2001"]})
+
+    # Act
+    with patch(
+        "kronos.data_interfaces.timetable_df_data_interface.generate_timestamp",
+        side_effect=["2024-02-20T17.34.32.739Z", "2024-02-20T17.34.55.964Z"],
+    ):
+        first_version = data_interface.save(df)
+        second_version = data_interface.save(df)
+        third_version = data_interface.save(pd.DataFrame({0: ["Dinner", "MATH2001"]}))
+
+    # Assert
+    assert first_version == second_version == "2024-02-20T17.34.32.739Z"
+    assert third_version == "2024-02-20T17.34.55.964Z"
+    assert data_interface.versions() == [first_version, third_version]
+    assert sorted(path.name for path in filepath.iterdir()) == [
+        "2024-02-20T17.34.32.739Z",
+        "2024-02-20T17.34.55.964Z",
+        "catalog.json",
+    ]
+
+
+def test_version_catalog_lookups(tmp_path: Path) -> None:
+    # Arrange
+    filepath = tmp_path / "timetable_df.csv"
+    for version, texts in [
+        ("2024-02-20T17.34.32.739Z", ["a", "b"]),
+        ("2024-02-21T09.00.00.000Z", ["c", "d", "e"]),
+        ("2024-02-22T09.00.00.000Z", ["a", "b"]),
+    ]:
+        TimeTableDFDataInterface(filepath=filepath, version=version).save(
+            pd.DataFrame({0: texts, 1: texts})
+        )
+
+    # Act
+    catalog = TimeTableDFDataInterface(filepath=filepath).load_catalog()
+
+    # Assert
+    latest = catalog.latest()
+    assert latest is not None and latest.version == "2024-02-22T09.00.00.000Z"
+    as_of = catalog.as_of("2024-02-21T23.59.59.999Z")
+    assert as_of is not None and as_of.version == "2024-02-21T09.00.00.000Z"
+    assert (as_of.n_row, as_of.n_col) == (3, 2)
+    assert catalog.as_of("2024-01-01T00.00.00.000Z") is None
+    by_hash = catalog.by_hash(latest.content_hash)
+    assert by_hash is not None and by_hash.version == "2024-02-20T17.34.32.739Z"
+
+
+def test_versions_saved_without_a_catalog_are_read_without_hashing(
+    tmp_path: Path,
+) -> None:
+    # Arrange
+    filepath = tmp_path / "timetable_df.csv"
+    for version, text in [("v0", "Lunch"), ("v1", "Dinner")]:
+        TimeTableDFDataInterface(filepath=filepath, version=version).save(
+            pd.DataFrame({0: [text]})
+        )
+    data_interface = TimeTableDFDataInterface(filepath=filepath)
+    data_interface.path_catalog.unlink()
+
+    # Act
+    with patch(
+        "kronos.data_interfaces.timetable_df_data_interface.content_hash"
+    ) as mock_content_hash:
+        versions = data_interface.versions()
+        loaded_df = data_interface.load()
+        sparse_sheet = data_interface.load_sparse()
+
+    # Assert
+    mock_content_hash.assert_not_called()
+    assert versions == ["v0", "v1"]
+    assert loaded_df[0].tolist() == ["Dinner"]
+    assert sparse_sheet.value.tolist() == ["Dinner"]
+    # Read paths never write the catalog
+    assert not data_interface.path_catalog.exists()
+
+
+def test_catalog_is_rebuilt_and_persisted_on_save(tmp_path: Path) -> None:
+    # Arrange
+    filepath = tmp_path / "timetable_df.csv"
+    data_interface = TimeTableDFDataInterface(filepath=filepath, version="v0")
+    data_interface.save(pd.DataFrame({0: ["Lunch"]}))
+    data_interface.path_catalog.unlink()
+
+    # Act
+    # Identical to the latest version, so only the rebuilt catalog is saved
+    version = TimeTableDFDataInterface(filepath=filepath).save(
+        pd.DataFrame({0: ["Lunch"]})
+    )
+
+    # Assert
+    assert version == "v0"
+    assert data_interface.path_catalog.is_file()
+    catalog = data_interface.load_catalog()
+    assert [entry.version for entry in catalog.entries] == ["v0"]
+    assert (catalog.entries[0].n_row, catalog.entries[0].n_col) == (1, 1)
+
+
+def test_fingerprint_matches_the_content_hash_of_the_saved_version(
+    tmp_path: Path,
+) -> None:
+    # Arrange
+    data_interface = TimeTableDFDataInterface(filepath=tmp_path / "timetable_df.csv")
+    df = TimeTableDFDataInterface.preprocess([["Mon", ""], ["2024.0", "x"]])
+
+    # Act
+    version = data_interface.save(df)
+    fingerprint = TimeTableDFDataInterface.fingerprint(df)
+
+    # Assert
+    entry = data_interface.load_catalog().by_version(version)
+    assert entry is not None and entry.content_hash == fingerprint
+    # Reloaded content is fingerprinted the same as the content saved
+    assert TimeTableDFDataInterface.fingerprint(data_interface.load()) == fingerprint
+    assert TimeTableDFDataInterface.fingerprint(df.replace("x", "y")) != fingerprint
+
+
+def test_sparse_sheet_round_trip() -> None:
+    # Arrange
+    df = pd.DataFrame(
+        {0: ["A", np.nan, "B"], 1: [np.nan] * 3, 2: ["C", "D", np.nan]}, dtype=object
+    )
+
+    # Act
+    sparse_sheet = SparseSheet.from_df(df)
+
+    # Assert
+    assert sparse_sheet.i_row.tolist() == [0, 0, 1, 2]
+    assert sparse_sheet.i_col.tolist() == [0, 2, 2, 0]
+    assert sparse_sheet.value.tolist() == ["A", "C", "D", "B"]
+    assert sparse_sheet.shape == (3, 3)
+    pd.testing.assert_frame_equal(sparse_sheet.to_df(), df)
+
+
+def test_load_sparse_matches_load(tmp_path: Path) -> None:
+    # Arrange
+    data_interface = TimeTableDFDataInterface(filepath=tmp_path / "timetable_df.csv")
+    df = TimeTableDFDataInterface.preprocess(
+        [
+            ["Mon", "", "", ""],
+            ["", "", "", ""],
+            ["2024.0", "", "Room 1", ""],
+            ["", "", "", ""],
+            ["", "Cape Town", "", "x"],
+        ]
+    )
+    data_interface.save(df)
+
+    # Act
+    # Chunks of two rows include one holding no non null cell at all
+    sparse_sheet = data_interface.load_sparse(chunk_size=2)
+
+    # Assert
+    expected_sparse_sheet = SparseSheet.from_df(data_interface.load())
+    assert sparse_sheet.shape == expected_sparse_sheet.shape == (5, 4)
+    assert sparse_sheet.i_row.tolist() == expected_sparse_sheet.i_row.tolist()
+    assert sparse_sheet.i_col.tolist() == expected_sparse_sheet.i_col.tolist()
+    assert sparse_sheet.value.tolist() == expected_sparse_sheet.value.tolist()
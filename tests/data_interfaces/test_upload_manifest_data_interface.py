@@ -0,0 +1,27 @@
+from pathlib import Path
+
+import numpy as np
+
+from kronos.data_interfaces.upload_manifest_data_interface import (
+    UploadManifestDataInterface,
+)
+from kronos.nodes.operate_vector_db import CollectionName, object_uuids
+
+
+def test_save_load(tmp_path: Path) -> None:
+    # Arrange
+    uuids = set(
+        object_uuids(collection_name=CollectionName.word, text=np.array(["a", "b"]))
+    )
+    data_interface = UploadManifestDataInterface(
+        filepath=tmp_path / "text_emb.emb.Word.uploaded.npy"
+    )
+
+    # Act
+    loaded_before_save = data_interface.load()
+    data_interface.save(uuids=uuids)
+    loaded_uuids = data_interface.load()
+
+    # Assert
+    assert loaded_before_save is None
+    assert loaded_uuids == uuids
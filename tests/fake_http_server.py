@@ -0,0 +1,100 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Set, Tuple, TypeVar
+
+import orjson
+
+# Status, json payload and extra headers of a response
+Response = Tuple[int, Any, Dict[str, str]]
+
+S = TypeVar("S", bound="FakeHTTPServer")
+
+
+class FakeHTTPServer:
+    """Local json HTTP server run on a background thread for offline tests of
+    clients, recording the requests and the concurrency it sees
+
+    Subclasses answer requests in respond, after latency_s has elapsed"""
+
+    def __init__(self, latency_s: float = 0.0) -> None:
+        self.latency_s = latency_s
+
+        self.n_request = 0
+        self.n_in_flight = 0
+        self.max_in_flight = 0
+        # Arrival time and path of every request
+        self.requests: List[Tuple[float, str]] = []
+        # Client ports seen, one per connection
+        self.client_ports: Set[int] = set()
+
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host!s}:{port}"
+
+    def _handler_class(self) -> type:
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _handle(self, method: str) -> None:
+                with fake._lock:
+                    fake.client_ports.add(self.client_address[1])
+                content_length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(content_length)
+                status, payload, headers = fake.handle(method, self.path, body)
+                content = orjson.dumps(payload)
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(content)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(content)
+
+            def do_GET(self) -> None:
+                self._handle("GET")
+
+            def do_POST(self) -> None:
+                self._handle("POST")
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+        return Handler
+
+    def handle(self, method: str, path: str, body: bytes) -> Response:
+        with self._lock:
+            self.n_request += 1
+            n_request = self.n_request
+            self.n_in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.n_in_flight)
+            self.requests.append((time.monotonic(), path))
+
+        try:
+            time.sleep(self.latency_s)
+            return self.respond(method, path, body, n_request)
+        finally:
+            with self._lock:
+                self.n_in_flight -= 1
+
+    def respond(self, method: str, path: str, body: bytes, n_request: int) -> Response:
+        """Answers the n_request-th request"""
+        raise NotImplementedError
+
+    def __enter__(self: S) -> S:
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, args=(0.05,), daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self._server.shutdown()
+        self._server.server_close()
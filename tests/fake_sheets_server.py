@@ -0,0 +1,71 @@
+from typing import Any, Dict, List
+from urllib.parse import unquote, urlsplit
+
+from tests.fake_http_server import FakeHTTPServer, Response
+
+
+class FakeSheetsServer(FakeHTTPServer):
+    """Minimal stand-in for the spreadsheet metadata and values endpoints of
+    the Sheets API v4, holding worksheet values keyed by spreadsheet key and
+    worksheet title
+
+    The first n_rate_limited requests are answered with 429 and a Retry-After
+    header, so that throttling and retries can be exercised offline"""
+
+    def __init__(
+        self,
+        spreadsheets: Dict[str, Dict[str, List[List[str]]]],
+        latency_s: float = 0.0,
+        n_rate_limited: int = 0,
+        retry_after_s: float = 0.0,
+    ) -> None:
+        super().__init__(latency_s=latency_s)
+        self.spreadsheets = spreadsheets
+        self.n_rate_limited = n_rate_limited
+        self.retry_after_s = retry_after_s
+
+    def respond(self, method: str, path: str, body: bytes, n_request: int) -> Response:
+        if n_request <= self.n_rate_limited:
+            return (
+                429,
+                {"error": {"code": 429, "status": "RESOURCE_EXHAUSTED"}},
+                {"Retry-After": str(self.retry_after_s)},
+            )
+
+        return self.route(urlsplit(path).path)
+
+    def route(self, path: str) -> Response:
+        parts = path.split("/")
+        # ["", "v4", "spreadsheets", key] or [..., key, "values", range]
+        if len(parts) < 4 or parts[1:3] != ["v4", "spreadsheets"]:
+            return 404, {"error": f"Unknown path {path}"}, {}
+
+        worksheets = self.spreadsheets.get(unquote(parts[3]))
+        if worksheets is None:
+            return 404, {"error": "Requested entity was not found"}, {}
+
+        if len(parts) == 4:
+            sheets = [
+                {"properties": {"title": title, "index": i}}
+                for i, title in enumerate(worksheets)
+            ]
+            return 200, {"sheets": sheets}, {}
+
+        a1_range = unquote(parts[5])
+        title = a1_range[1:-1].replace("''", "'")
+        if parts[4] != "values" or title not in worksheets:
+            return 400, {"error": f"Unable to parse range: {a1_range}"}, {}
+
+        # Trailing empty cells and rows are trimmed as by the Sheets API
+        values = [list(row) for row in worksheets[title]]
+        for row in values:
+            while len(row) > 0 and row[-1] == "":
+                row.pop()
+        while len(values) > 0 and len(values[-1]) == 0:
+            values.pop()
+
+        value_range: Dict[str, Any] = {"range": a1_range, "majorDimension": "ROWS"}
+        if len(values) > 0:
+            value_range["values"] = values
+
+        return 200, value_range, {}
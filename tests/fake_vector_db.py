@@ -0,0 +1,55 @@
+from collections import Counter
+from typing import Any, Dict, List
+
+import orjson
+
+from kronos.nodes.operate_vector_db import RestBatchTransport
+from tests.fake_http_server import FakeHTTPServer, Response
+
+
+class FakeVectorDB(FakeHTTPServer):
+    """Minimal stand-in for the REST batch endpoint of a vector database
+
+    Every object fails on its first n_fail_per_object attempts and every
+    fail_every_nth_request request is answered with 503, so that retries can be
+    exercised offline"""
+
+    def __init__(
+        self,
+        latency_s: float = 0.0,
+        n_fail_per_object: int = 0,
+        fail_every_nth_request: int = 0,
+    ) -> None:
+        super().__init__(latency_s=latency_s)
+        self.n_fail_per_object = n_fail_per_object
+        self.fail_every_nth_request = fail_every_nth_request
+
+        # Stored objects keyed by their id, or by their payload without one
+        self.objects: Dict[str, Dict[str, Any]] = {}
+        self.request_bytes: List[int] = []
+
+        self._attempts: Counter[str] = Counter()
+
+    def respond(self, method: str, path: str, body: bytes, n_request: int) -> Response:
+        if method != "POST" or path != RestBatchTransport.PATH:
+            return 404, {"error": f"Unknown path {path}"}, {}
+
+        with self._lock:
+            self.request_bytes.append(len(body))
+
+        if self.fail_every_nth_request and n_request % self.fail_every_nth_request == 0:
+            return 503, {"error": "Service unavailable"}, {}
+
+        results = []
+        for obj in orjson.loads(body)["objects"]:
+            key = obj.get("id") or orjson.dumps(obj).decode()
+            with self._lock:
+                self._attempts[key] += 1
+                failed = self._attempts[key] <= self.n_fail_per_object
+                if not failed:
+                    self.objects[key] = obj
+
+            errors = {"error": [{"message": "Injected failure"}]} if failed else None
+            results.append({**obj, "result": {"errors": errors} if errors else {}})
+
+        return 200, results, {}
@@ -1,236 +1,273 @@
-from typing import Any, List, Tuple
+from pathlib import Path
+from typing import List, Tuple
+from unittest.mock import patch
 
+import numpy as np
 import pytest
 from pandas import DataFrame
 from pandas.testing import assert_frame_equal
 from spacy.language import Language
 
 from kronos.data_interfaces.edge_dfs_data_interface import (
+    EdgeAttrKey,
     EdgeDF,
-    EntToCellTuple,
-    EntToLabelTuple,
-    TokenToCellTuple,
-    TokenToEntTuple,
+    EdgeType,
 )
 from kronos.data_interfaces.node_dfs_data_interface import (
-    EntLabelTuple,
-    EntTuple,
+    NodeAttrKey,
     NodeDF,
-    TokenTuple,
+    NodeType,
 )
+from kronos.data_interfaces.parse_cache_data_interface import ParseCacheDataInterface
 from kronos.nodes.add_nlp_feats import (
-    assemble_nlp_ndfs_edfs,
-    assemble_nlp_ntuples_etuples,
-    prep_nlp_ntuples_etuples_input,
+    NLPFeats,
+    add_parsed_text_feats,
+    assemble_nlp_ndfs,
+    fan_out_edges,
+    parse_doc,
+    prep_nlp_feats,
+    shard_bounds,
+    spacy_pipeline_name,
 )
 
 
-def test_assemble_nlp_ntuples_etuples_typical() -> None:
+def test_prep_nlp_feats_typical(
+    en_sm_spacy_pipeline: Language,
+) -> None:
     # Arrange
-    # Function input
-    token_text = ["Token1", "Token2"]
-    ent_text = ["Ent1"]
-    ent_label_text = ["Label1"]
-    i_token_to_cell = [(0, 1)]
-    i_token_to_ent = [(1, 0)]
-    i_ent_to_cell = [(0, 1)]
-    i_ent_to_label = [(0, 0)]
-    i_token_in_doc = [0]
-    i_token_in_ent = [0]
-    i_ent_in_doc = [0]
-
-    # Expected function outpu
-    expected_token_tuples = [
-        TokenTuple(nid=0, ntype="Token", text="Token1"),
-        TokenTuple(nid=1, ntype="Token", text="Token2"),
-    ]
-    expected_ent_tuples = [EntTuple(nid=0, ntype="Ent", text="Ent1")]
-    expected_ent_label_tuples = [EntLabelTuple(nid=0, ntype="EntLabel", text="Label1")]
-    expected_token_to_cell = [
-        TokenToCellTuple(
-            src_nid=0,
-            dst_nid=1,
-            src_ntype="Token",
-            etype="TokenToCell",
-            dst_ntype="SheetCell",
-            i_token_in_doc=0,
-        )
-    ]
-    expected_token_to_ent = [
-        TokenToEntTuple(
-            src_nid=1,
-            dst_nid=0,
-            src_ntype="Token",
-            etype="TokenToEnt",
-            dst_ntype="Ent",
-            i_token_in_ent=0,
-        )
-    ]
-    expected_ent_to_cell = [
-        EntToCellTuple(
-            src_nid=0,
-            dst_nid=1,
-            src_ntype="Ent",
-            etype="EntToCell",
-            dst_ntype="SheetCell",
-            i_ent_in_doc=0,
-        )
-    ]
-    expected_ent_to_label = [
-        EntToLabelTuple(
-            src_nid=0,
-            dst_nid=0,
-            src_ntype="Ent",
-            etype="EntToLabel",
-            dst_ntype="EntLabel",
-        )
-    ]
+    data = {"nid": [0, 1], "text": ["Cape Town South Africa", "Shanghai repeat repeat"]}
+    df = DataFrame(data)
 
     # Act
-    result = assemble_nlp_ntuples_etuples(
-        token_text,
-        ent_text,
-        ent_label_text,
-        i_token_to_cell,
-        i_token_to_ent,
-        i_ent_to_cell,
-        i_ent_to_label,
-        i_token_in_doc,
-        i_token_in_ent,
-        i_ent_in_doc,
+    node_dfs, edge_dfs = prep_nlp_feats(df, en_sm_spacy_pipeline)
+
+    # Assert
+    token_df, ent_df, ent_label_df = (node_df.df for node_df in node_dfs)
+    token_to_cell_df, token_to_ent_df, ent_to_cell_df, ent_to_label_df = (
+        edge_df.df for edge_df in edge_dfs
     )
+    assert len(token_df) > 0
+    assert len(ent_df) == 2
+    assert len(ent_label_df) == 1
+    # "repeat" token repeats once
+    assert (len(token_to_cell_df) - 1) == len(token_df)
+    assert len(token_to_ent_df) > 0
+    assert len(ent_to_cell_df) == 2
+    assert len(ent_to_label_df) == 2
+
+
+def test_prep_nlp_feats_duplicate_text(
+    en_sm_spacy_pipeline: Language,
+) -> None:
+    # Arrange
+    data = {"nid": [0, 1], "text": ["Lunch", "Lunch"]}
+    df = DataFrame(data)
+
+    # Act
+    node_dfs, edge_dfs = prep_nlp_feats(df, en_sm_spacy_pipeline)
 
     # Assert
-    assert result[0] == expected_token_tuples
-    assert result[1] == expected_ent_tuples
-    assert result[2] == expected_ent_label_tuples
-    assert result[3] == expected_token_to_cell
-    assert result[4] == expected_token_to_ent
-    assert result[5] == expected_ent_to_cell
-    assert result[6] == expected_ent_to_label
+    # Cells with identical text are still linked to their own cell node
+    token_to_cell_df = edge_dfs[0].df
+    assert node_dfs[0].df[NodeAttrKey.text.value].tolist() == ["Lunch"]
+    assert token_to_cell_df[EdgeAttrKey.src_nid.value].tolist() == [0, 0]
+    assert token_to_cell_df[EdgeAttrKey.dst_nid.value].tolist() == [0, 1]
 
 
-def test_assemble_nlp_ntuples_etuples_edge() -> None:
-    # Arrange & Act
-    expected: Tuple[List[Any], ...] = ([], [], [], [], [], [], [])
-    result = assemble_nlp_ntuples_etuples([], [], [], [], [], [], [], [], [], [])
+def test_prep_nlp_feats_parse_cache(
+    en_sm_spacy_pipeline: Language, tmp_path: Path
+) -> None:
+    # Arrange
+    df_old = DataFrame({"nid": [0, 1], "text": ["Cape Town", "Lunch"]})
+    df_new = DataFrame({"nid": [0, 1, 2], "text": ["Shanghai", "Cape Town", "Lunch"]})
+    parse_cache = ParseCacheDataInterface(filepath=tmp_path / "parse_cache.sqlite")
+    prep_nlp_feats(df_old, en_sm_spacy_pipeline, parse_cache=parse_cache)
+
+    # Act
+    with patch.object(
+        en_sm_spacy_pipeline, "pipe", wraps=en_sm_spacy_pipeline.pipe
+    ) as mock_pipe:
+        nlp_dfs = prep_nlp_feats(df_new, en_sm_spacy_pipeline, parse_cache=parse_cache)
 
     # Assert
-    assert result == expected
+    # Only the added text is parsed
+    assert mock_pipe.call_args.kwargs["texts"] == ["Shanghai"]
+    assert len(parse_cache) == 3
+    assert_nlp_dfs_equal(nlp_dfs, prep_nlp_feats(df_new, en_sm_spacy_pipeline))
+
+
+def test_spacy_pipeline_name(en_sm_spacy_pipeline: Language) -> None:
+    # Arrange
+    meta = en_sm_spacy_pipeline.meta
+    name = spacy_pipeline_name(en_sm_spacy_pipeline)
+
+    # Act
+    with patch.dict(meta, {"version": meta["version"] + "-changed"}):
+        changed_name = spacy_pipeline_name(en_sm_spacy_pipeline)
+
+    # Assert
+    assert name.startswith(f"{meta['lang']}_{meta['name']}-{meta['version']}")
+    assert changed_name != name
+
+
+def assert_nlp_dfs_equal(
+    nlp_dfs: Tuple[List[NodeDF], List[EdgeDF]],
+    expected: Tuple[List[NodeDF], List[EdgeDF]],
+) -> None:
+    node_dfs, edge_dfs = nlp_dfs
+    expected_node_dfs, expected_edge_dfs = expected
+    assert len(node_dfs) == len(expected_node_dfs)
+    assert len(edge_dfs) == len(expected_edge_dfs)
+    for node_df, expected_node_df in zip(node_dfs, expected_node_dfs):
+        assert node_df.ntype == expected_node_df.ntype
+        assert_frame_equal(node_df.df, expected_node_df.df)
+    for edge_df, expected_edge_df in zip(edge_dfs, expected_edge_dfs):
+        assert edge_df.etype == expected_edge_df.etype
+        assert_frame_equal(edge_df.df, expected_edge_df.df)
+
+
+def test_shard_bounds() -> None:
+    assert shard_bounds(n_cell=10, n_shard=3) == [(0, 3), (3, 6), (6, 10)]
+    assert shard_bounds(n_cell=2, n_shard=4) == [(0, 1), (1, 2)]
+    assert shard_bounds(n_cell=0, n_shard=4) == [(0, 0)]
 
 
-def test_prep_nlp_ntuples_etuples_input_typical(
+def test_prep_nlp_feats_matches_parsing_every_cell(
     en_sm_spacy_pipeline: Language,
 ) -> None:
     # Arrange
-    data = {"nid": [0, 1], "text": ["Cape Town South Africa", "Shanghai repeat repeat"]}
-    df = DataFrame(data)
+    cell = ["Shanghai Lunch", "Cape Town", "Lunch", "Cape Town Shanghai", "Lunch"]
+    cell += ["Shanghai Lunch", "", "Cape Town"]
+    expected = NLPFeats()
+    for i_cell, text in enumerate(cell):
+        add_parsed_text_feats(expected, parse_doc(en_sm_spacy_pipeline(text)), i_cell)
+
+    edge_builders = (
+        expected.token_to_cell,
+        expected.token_to_ent,
+        expected.ent_to_cell,
+        expected.ent_to_label,
+    )
+
+    # Act
+    with patch.object(
+        en_sm_spacy_pipeline, "pipe", wraps=en_sm_spacy_pipeline.pipe
+    ) as mock_pipe:
+        nlp_dfs = prep_nlp_feats(
+            DataFrame({"nid": range(len(cell)), "text": cell}), en_sm_spacy_pipeline
+        )
+
+    # Assert
+    # Every distinct text is parsed once in order of first appearance
+    assert mock_pipe.call_args.kwargs["texts"] == list(dict.fromkeys(cell))
+    assert_nlp_dfs_equal(
+        nlp_dfs,
+        (
+            assemble_nlp_ndfs(expected),
+            [builder.to_edge_df() for builder in edge_builders],
+        ),
+    )
+
+
+def test_prep_nlp_feats_process_pool(en_sm_spacy_pipeline: Language) -> None:
+    # Arrange
+    df = DataFrame({"nid": range(6), "text": ["Cape Town", "Lunch", "Shanghai"] * 2})
 
     # Act
-    (
-        token,
-        ent,
-        ent_label,
-        i_token_to_cell,
-        i_token_to_ent,
-        i_ent_to_cell,
-        i_ent_to_label,
-        i_token_in_doc,
-        i_token_in_ent,
-        i_ent_in_doc,
-    ) = prep_nlp_ntuples_etuples_input(df, en_sm_spacy_pipeline)
+    nlp_dfs = prep_nlp_feats(df, en_sm_spacy_pipeline, n_process=2, batch_size=2)
 
     # Assert
-    assert len(token) > 0
-    assert len(ent) == 2
-    assert len(ent_label) == 1
-    assert (len(i_token_to_cell) - 1) == len(token)  # "repeat" token repeats once
-    assert len(i_token_to_ent) > 0
-    assert len(i_ent_to_cell) == 2
-    assert len(i_ent_to_label) == 2
-    assert len(i_token_in_doc) > 0
-    assert len(i_token_in_ent) > 0
-    assert len(i_ent_in_doc) == 2
-    # Continue with assertions for other outputs
-
-
-def test_prep_nlp_ntuples_etuples_input_edge(en_sm_spacy_pipeline: Language) -> None:
+    assert_nlp_dfs_equal(nlp_dfs, prep_nlp_feats(df, en_sm_spacy_pipeline))
+
+
+def test_prep_nlp_feats_edge(en_sm_spacy_pipeline: Language) -> None:
     empty_df = DataFrame()
 
     with pytest.raises(KeyError):
-        prep_nlp_ntuples_etuples_input(empty_df, en_sm_spacy_pipeline)
+        prep_nlp_feats(empty_df, en_sm_spacy_pipeline)
 
 
-def test_assemble_nlp_ndfs_edfs_typical() -> None:
+def test_assemble_nlp_ndfs_typical() -> None:
     # Arrange
-    # Function input
-    token = [TokenTuple(nid=0, ntype="Token", text="example")]
-    ent = [EntTuple(nid=0, ntype="Ent", text="example")]
-    ent_label = [EntLabelTuple(nid=0, ntype="EntLabel", text="example")]
-    token_to_cell = [
-        TokenToCellTuple(
-            src_nid=0,
-            dst_nid=1,
-            src_ntype="Token",
-            etype="TokenToCell",
-            dst_ntype="SheetCell",
-            i_token_in_doc=0,
-        )
-    ]
-    token_to_ent = [
-        TokenToEntTuple(
-            src_nid=0,
-            dst_nid=1,
-            src_ntype="Token",
-            etype="TokenToEnt",
-            dst_ntype="Ent",
-            i_token_in_ent=0,
-        )
+    nlp_feats = NLPFeats()
+    nlp_feats.token.intern("Token1")
+    nlp_feats.token.intern("Token2")
+    nlp_feats.ent.intern("Ent1")
+    nlp_feats.ent_label.intern("Label1")
+
+    # Act
+    node_dfs = assemble_nlp_ndfs(nlp_feats)
+
+    # Assert
+    assert [node_df.ntype for node_df in node_dfs] == [
+        NodeType.token,
+        NodeType.ent,
+        NodeType.ent_label,
     ]
-    ent_to_cell = [
-        EntToCellTuple(
-            src_nid=0,
-            dst_nid=1,
-            src_ntype="Ent",
-            etype="EntToCell",
-            dst_ntype="SheetCell",
-            i_ent_in_doc=0,
-        )
+    token_df = node_dfs[0].df
+    assert token_df.columns.tolist() == [
+        NodeAttrKey.nid.value,
+        NodeAttrKey.ntype.value,
+        NodeAttrKey.text.value,
     ]
-    ent_to_label = [
-        EntToLabelTuple(
-            src_nid=0,
-            dst_nid=1,
-            src_ntype="Ent",
-            etype="EntToLabel",
-            dst_ntype="EntLabel",
-        )
+    assert token_df[NodeAttrKey.nid.value].tolist() == [0, 1]
+    assert token_df[NodeAttrKey.ntype.value].tolist() == ["Token", "Token"]
+    assert token_df[NodeAttrKey.text.value].tolist() == ["Token1", "Token2"]
+
+
+def test_fan_out_edges_typical() -> None:
+    # Arrange
+    # Text 0 holds tokens 0 and 1 and text 1 holds token 2
+    nlp_feats = NLPFeats()
+    nlp_feats.token_to_cell.extend([0, 1, 2], [0, 0, 1], [0, 1, 0])
+    counts = np.array([2, 1])
+    inverse = np.array([1, 0, 1])
+
+    # Act
+    edge_df = fan_out_edges(nlp_feats.token_to_cell, counts, inverse, dst_is_cell=True)
+
+    # Assert
+    df = edge_df.df
+    assert edge_df.etype == EdgeType.token_to_cell
+    assert df.columns.tolist() == [
+        EdgeAttrKey.src_nid.value,
+        EdgeAttrKey.dst_nid.value,
+        EdgeAttrKey.src_ntype.value,
+        EdgeAttrKey.etype.value,
+        EdgeAttrKey.dst_ntype.value,
+        EdgeAttrKey.i_token_in_doc.value,
     ]
+    assert df.iloc[0].tolist() == [2, 0, "Token", "TokenToCell", "SheetCell", 0]
+    assert df[EdgeAttrKey.src_nid.value].tolist() == [2, 0, 1, 2]
+    assert df[EdgeAttrKey.dst_nid.value].tolist() == [0, 1, 1, 2]
+    assert df[EdgeAttrKey.i_token_in_doc.value].tolist() == [0, 0, 1, 0]
+    assert df[EdgeAttrKey.src_nid.value].dtype == np.int32
+    assert df[EdgeAttrKey.dst_nid.value].dtype == np.int32
+
+
+def test_fan_out_edges_dst_not_cell() -> None:
+    # Arrange
+    nlp_feats = NLPFeats()
+    nlp_feats.ent_to_label.extend([0, 1], [3, 4])
 
     # Act
-    node_dfs, edge_dfs = assemble_nlp_ndfs_edfs(
-        token, ent, ent_label, token_to_cell, token_to_ent, ent_to_cell, ent_to_label
+    edge_df = fan_out_edges(
+        nlp_feats.ent_to_label, np.array([1, 1]), np.array([1, 1]), dst_is_cell=False
     )
 
     # Assert
-    # Verify correct number of NodeDF and EdgeDF objects
-    assert len(node_dfs) == 3
-    assert len(edge_dfs) == 4
+    assert edge_df.df.iloc[0].tolist() == [1, 4, "Ent", "EntToLabel", "EntLabel"]
+    assert edge_df.df[EdgeAttrKey.dst_nid.value].tolist() == [4, 4]
 
-    # Verify data in returned DataFrames matches input tuples
-    assert_frame_equal(node_dfs[0].df, DataFrame(token))
-    assert_frame_equal(node_dfs[1].df, DataFrame(ent))
-    assert_frame_equal(node_dfs[2].df, DataFrame(ent_label))
-    assert_frame_equal(edge_dfs[0].df, DataFrame(token_to_cell))
-    assert_frame_equal(edge_dfs[1].df, DataFrame(token_to_ent))
-    assert_frame_equal(edge_dfs[2].df, DataFrame(ent_to_cell))
-    assert_frame_equal(edge_dfs[3].df, DataFrame(ent_to_label))
 
+def test_prep_nlp_feats_no_cells(en_sm_spacy_pipeline: Language) -> None:
+    # Arrange
+    df = DataFrame({"nid": [], "text": []})
 
-def test_assemble_nlp_ndfs_edfs_edge() -> None:
-    empty_lists: tuple = ([], [], [], [], [], [], [])
-    node_dfs, edge_dfs = assemble_nlp_ndfs_edfs(*empty_lists)
+    # Act
+    node_dfs, edge_dfs = prep_nlp_feats(df, en_sm_spacy_pipeline)
 
+    # Assert
     # Verify correct structure is returned with empty DataFrames
     assert len(node_dfs) == 3
     assert all(isinstance(ndf, NodeDF) for ndf in node_dfs)
@@ -18,10 +18,12 @@ from kronos.nodes.assemble_kg import (
     _assemble_kg,
     edge_tuples_from_edge_df,
     edge_tuples_from_edge_dfs,
+    iter_node_tuples_from_node_df,
     node_tuples_from_node_df,
     node_tuples_from_node_dfs,
     validate_node_dfs_and_edge_dfs,
 )
+from kronos.nodes.utils_columnar import node_df_from_texts
 
 
 def test_validate_node_dfs_and_edge_dfs_valid(
@@ -49,7 +51,7 @@ def test_validate_node_dfs_and_edge_dfs_invalid(mock_node_dfs: NodeDFs) -> None:
     mock_edge_dfs_invalid = EdgeDFs(members=[edge_df_invalid])
 
     # Act and Assert
-    with pytest.raises(ValueError):
+    with pytest.raises(ValueError, match=r"Dangling references: SheetCell: 1 ids"):
         validate_node_dfs_and_edge_dfs(
             node_dfs=mock_node_dfs, edge_dfs=mock_edge_dfs_invalid
         )
@@ -77,6 +79,22 @@ def test_node_tuples_from_node_df(mock_node_df: NodeDF) -> None:
     ), "Node tuples transformation did not match expected output."
 
 
+def test_iter_node_tuples_from_node_df_native_values() -> None:
+    # Arrange
+    node_df = node_df_from_texts(NodeType.token, ["Cape", "Town"])
+
+    # Act
+    result = list(iter_node_tuples_from_node_df(node_df=node_df))
+
+    # Assert
+    assert result == [
+        ((NodeType.token.value, 0), {"ntype": "Token", "text": "Cape"}),
+        ((NodeType.token.value, 1), {"ntype": "Token", "text": "Town"}),
+    ]
+    assert all(type(node_key[1]) is int for node_key, _ in result)
+    assert all(type(attrs["ntype"]) is str for _, attrs in result)
+
+
 def test_node_tuples_from_node_dfs(mock_node_dfs: NodeDFs) -> None:
     result = node_tuples_from_node_dfs(node_dfs=mock_node_dfs)
 
@@ -1,5 +1,6 @@
 import numpy as np
 import pandas as pd
+import pytest
 
 from kronos.data_interfaces.edge_dfs_data_interface import (
     EdgeAttrKey,
@@ -15,21 +16,26 @@ from kronos.data_interfaces.node_dfs_data_interface import (
 )
 from kronos.nodes.contract_sheet_cell_nodes import (
     _contract_sheet_cell_nodes,
-    element_wise_sum_coords,
+    collect_by_group,
+    contraction_groups,
     merge_sheet_cell_nodes,
-    update_nids_in_df_edge,
+    sum_coords_by_group,
+    update_nids_in_df_edges,
 )
 
 
 def test_agg_coords() -> None:
     # Arrange
-    input_coords = [[1, 2], [3, 4], [5, 6]]
-    expected_output = np.array([9, 12])
+    input_coords = pd.Series([[1, 2], [3, 4], [5, 6]])
+    groups = contraction_groups(
+        df=pd.DataFrame({NodeAttrKey.text.value: ["A"] * 3}),
+        keys=[NodeAttrKey.text.value],
+    )
 
     # Act & Assert
-    assert np.array_equal(
-        element_wise_sum_coords(input_coords), expected_output
-    ), "agg_coords should sum coordinates correctly."
+    assert sum_coords_by_group(input_coords, groups) == [
+        [9, 12]
+    ], "agg_coords should sum coordinates correctly."
 
 
 def test_merge_sheet_cell_nodes() -> None:
@@ -59,7 +65,54 @@ def test_merge_sheet_cell_nodes() -> None:
     pd.testing.assert_frame_equal(merged_df, expected_df)
 
 
-def test_update_nids_in_df_edge() -> None:
+def test_contraction_groups() -> None:
+    # Arrange
+    df = pd.DataFrame({NodeAttrKey.text.value: ["B", "A", None, "B"]})
+
+    # Act
+    groups = contraction_groups(df=df, keys=[NodeAttrKey.text.value])
+
+    # Assert
+    assert groups.codes.tolist() == [1, 0, -1, 1]
+    assert groups.order.tolist() == [1, 0, 3]
+    assert groups.starts.tolist() == [0, 1]
+    assert collect_by_group(pd.Series([0, 1, 2, 3]), groups) == [[1], [0, 3]]
+    assert sum_coords_by_group(pd.Series([(1, 1), (2, 2), (5, 5), (3, 4)]), groups) == [
+        [2, 2],
+        [4, 5],
+    ]
+
+
+def test_merge_sheet_cell_nodes_random() -> None:
+    # Arrange
+    rng = np.random.default_rng(0)
+    n = 500
+    df_nodes = pd.DataFrame(
+        {
+            NodeAttrKey.nid.value: np.arange(n),
+            NodeAttrKey.ntype.value: [NodeType.sheet_cell.value] * n,
+            NodeAttrKey.text.value: rng.choice(["A", "B", "C", "D"], n),
+            NodeAttrKey.coord.value: rng.integers(0, 20, (n, 2)).tolist(),
+        }
+    )
+
+    # Act
+    merged_df, nid_lookup = merge_sheet_cell_nodes(df_nodes)
+
+    # Assert
+    for i_new, row in merged_df.iterrows():
+        group = df_nodes[
+            df_nodes[NodeAttrKey.text.value] == row[NodeAttrKey.text.value]
+        ]
+        assert (
+            row[NodeAttrKey.coord.value]
+            == np.sum(group[NodeAttrKey.coord.value].tolist(), axis=0).tolist()
+        )
+        assert all(nid_lookup[i_old] == i_new for i_old in group[NodeAttrKey.nid.value])
+    assert len(nid_lookup) == n
+
+
+def test_update_nids_in_single_df_edge() -> None:
     # Arrange
     df_edges = pd.DataFrame(
         {
@@ -68,7 +121,7 @@ def test_update_nids_in_df_edge() -> None:
             EdgeAttrKey.distance.value: [1, 2, 3, 4],
         }
     )
-    nid_mapping = {0: 10, 1: 11, 2: 12, 3: 13}
+    nid_lookup = np.array([10, 11, 12, 13])
     expected_df_edges = pd.DataFrame(
         {
             EdgeAttrKey.src_nid.value: [10, 11, 12, 13],
@@ -78,12 +131,42 @@ def test_update_nids_in_df_edge() -> None:
     )
 
     # Act
-    updated_df_edges = update_nids_in_df_edge(df_edges, nid_mapping)
+    (updated_df_edges,) = update_nids_in_df_edges([df_edges], nid_lookup)
 
     # Assert
     pd.testing.assert_frame_equal(updated_df_edges, expected_df_edges)
 
 
+def test_update_nids_in_df_edges_missing_nid() -> None:
+    df_edges = pd.DataFrame(
+        {EdgeAttrKey.src_nid.value: [0, 1, 7], EdgeAttrKey.dst_nid.value: [1, 2, 0]}
+    )
+
+    with pytest.raises(ValueError, match=r"2 node references .* node ids \[2, 7\]"):
+        _ = update_nids_in_df_edges([df_edges], np.array([0, 0, -1]))
+
+
+def test_update_nids_in_df_edges() -> None:
+    # Arrange
+    list_df_edge = [
+        pd.DataFrame(
+            {EdgeAttrKey.src_nid.value: [0, 1], EdgeAttrKey.dst_nid.value: [1, 2]}
+        ),
+        pd.DataFrame({EdgeAttrKey.src_nid.value: [], EdgeAttrKey.dst_nid.value: []}),
+        pd.DataFrame({EdgeAttrKey.src_nid.value: [2], EdgeAttrKey.dst_nid.value: [0]}),
+    ]
+
+    # Act
+    updated = update_nids_in_df_edges(list_df_edge, np.array([5, 5, 6]))
+
+    # Assert
+    assert updated[0][EdgeAttrKey.src_nid.value].tolist() == [5, 5]
+    assert updated[0][EdgeAttrKey.dst_nid.value].tolist() == [5, 6]
+    assert len(updated[1]) == 0
+    assert updated[2][EdgeAttrKey.src_nid.value].tolist() == [6]
+    assert updated[2][EdgeAttrKey.dst_nid.value].tolist() == [5]
+
+
 def test_contract_sheet_cell_nodes() -> None:
     # Arrange
     df_sheet_cell = pd.DataFrame(
@@ -1,15 +1,23 @@
 from typing import Optional
 
+import numpy as np
 import pandas as pd
 import pytest
+from pandas.testing import assert_frame_equal
 
 from kronos.data_interfaces.edge_dfs_data_interface import EdgeDF, EdgeDFs
 from kronos.data_interfaces.node_dfs_data_interface import NodeDF, NodeType
+from kronos.data_interfaces.timetable_df_data_interface import SparseSheet
 from kronos.nodes.df_to_layout_graph import (
     Direction,
+    LayoutEngine,
     TraDstTuple,
     _df_to_layout_graph,
+    _df_to_layout_graph_incremental,
     find_first_non_null,
+    layout_matches_timetable_df,
+    nearest_non_null,
+    sparse_nearest_neighbours,
 )
 
 
@@ -45,3 +53,101 @@ def test_df_to_layout_graph() -> None:
     assert isinstance(edge_dfs, EdgeDFs)
     # TODO: Validate the content of edge dataframes as well
     assert all(isinstance(edge_df, EdgeDF) for edge_df in edge_dfs.members)
+
+
+def test_nearest_non_null() -> None:
+    # Arrange
+    df = pd.DataFrame({0: [None, "start"], 1: ["target", None]})
+    mask = df.notna().to_numpy()
+
+    # Act
+    neighbour = nearest_non_null(mask)
+
+    # Assert
+    # Values are row indices for up and down and column indices for left and right
+    assert neighbour[Direction.up].tolist() == [[-1, -1], [-1, 0]]
+    assert neighbour[Direction.down].tolist() == [[1, -1], [-1, -1]]
+    assert neighbour[Direction.left].tolist() == [[-1, -1], [-1, 0]]
+    assert neighbour[Direction.right].tolist() == [[1, -1], [-1, -1]]
+
+
+def test_sparse_nearest_neighbours() -> None:
+    # Arrange
+    df = pd.DataFrame({0: ["A", None, "B"], 1: [None, "C", "D"], 2: ["E", None, None]})
+    sparse_sheet = SparseSheet.from_df(df)
+
+    # Act
+    neighbour = sparse_nearest_neighbours(sparse_sheet=sparse_sheet)
+
+    # Assert
+    # Cells A, E, C, B, D are numbered in row-major order
+    assert neighbour[Direction.up].tolist() == [-1, -1, -1, 0, 2]
+    assert neighbour[Direction.down].tolist() == [3, -1, 4, -1, -1]
+    assert neighbour[Direction.left].tolist() == [-1, 0, -1, -1, 3]
+    assert neighbour[Direction.right].tolist() == [1, -1, -1, 4, -1]
+
+
+@pytest.mark.parametrize("engine", [LayoutEngine.numpy, LayoutEngine.sparse])
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_df_to_layout_graph_engines_agree(seed: int, engine: LayoutEngine) -> None:
+    # Arrange
+    rng = np.random.default_rng(seed)
+    values = rng.integers(0, 5, size=(9, 7)).astype(str).astype(object)
+    values[rng.random(size=values.shape) < 0.6] = None
+    values[0, 0] = "Anchor"  # At least two non null cells are needed
+    values[-1, -1] = "Anchor"
+    df = pd.DataFrame(values)
+
+    # Act
+    expected_node_df, expected_edge_dfs = _df_to_layout_graph(
+        df, engine=LayoutEngine.iloc
+    )
+    node_df, edge_dfs = _df_to_layout_graph(df, engine=engine)
+
+    # Assert
+    assert_frame_equal(node_df.df, expected_node_df.df)
+    assert edge_dfs.etypes == expected_edge_dfs.etypes
+    for edge_df, expected_edge_df in zip(edge_dfs.members, expected_edge_dfs.members):
+        assert_frame_equal(edge_df.df, expected_edge_df.df)
+
+
+@pytest.mark.parametrize(
+    "df_new",
+    [
+        # Text of a cell changed
+        pd.DataFrame({0: ["A", None, "X"], 1: [None, "C", "D"]}),
+        # A cell added and another removed
+        pd.DataFrame({0: ["A", "E", "B"], 1: [None, None, "D"]}),
+    ],
+)
+def test_df_to_layout_graph_incremental(df_new: pd.DataFrame) -> None:
+    # Arrange
+    df_old = pd.DataFrame({0: ["A", None, "B"], 1: [None, "C", "D"]})
+    previous_node_df, previous_edge_dfs = _df_to_layout_graph(df=df_old)
+
+    # Act
+    node_df, edge_dfs = _df_to_layout_graph_incremental(
+        df=df_new,
+        previous_df=df_old,
+        previous_sheet_cell_node_df=previous_node_df,
+        previous_traversal_edge_dfs=previous_edge_dfs,
+    )
+
+    # Assert
+    expected_node_df, expected_edge_dfs = _df_to_layout_graph(df=df_new)
+    assert_frame_equal(node_df.df, expected_node_df.df)
+    assert edge_dfs.etypes == expected_edge_dfs.etypes
+    for edge_df, expected_edge_df in zip(edge_dfs.members, expected_edge_dfs.members):
+        assert_frame_equal(edge_df.df, expected_edge_df.df)
+    # The previous layout graph is left untouched
+    assert previous_node_df.df["text"].tolist() == ["A", "C", "B", "D"]
+
+
+def test_layout_matches_timetable_df() -> None:
+    df = pd.DataFrame({0: ["A", None, "B"], 1: [None, "C", "D"]})
+    node_df, _ = _df_to_layout_graph(df=df)
+
+    assert layout_matches_timetable_df(sheet_cell_node_df=node_df, df=df)
+    assert not layout_matches_timetable_df(
+        sheet_cell_node_df=node_df, df=df.replace("D", "X")
+    )
@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+
+from kronos.nodes.diff_timetable_df import _diff_timetable_dfs
+
+
+def test_diff_timetable_dfs() -> None:
+    # Arrange
+    df_old = pd.DataFrame({0: ["A", None, "B"], 1: [None, "C", "D"]})
+    df_new = pd.DataFrame({0: ["A", "E", "X"], 1: [None, None, "D"]})
+
+    # Act
+    cell_diff = _diff_timetable_dfs(df_old=df_old, df_new=df_new)
+
+    # Assert
+    assert cell_diff.changed.tolist() == [[2, 0]]
+    assert cell_diff.added.tolist() == [[1, 0]]
+    assert cell_diff.removed.tolist() == [[1, 1]]
+    assert cell_diff.affected_rows.tolist() == [1]
+    assert cell_diff.affected_cols.tolist() == [0, 1]
+    assert not cell_diff.is_text_only
+
+
+def test_diff_timetable_dfs_different_shapes() -> None:
+    # Arrange
+    df_old = pd.DataFrame({0: ["A"]})
+    df_new = pd.DataFrame({0: ["A", None], 1: [None, "B"]})
+
+    # Act
+    cell_diff = _diff_timetable_dfs(df_old=df_old, df_new=df_new)
+
+    # Assert
+    assert len(cell_diff.changed) == 0
+    assert cell_diff.added.tolist() == [[1, 1]]
+    assert len(cell_diff.removed) == 0
+
+
+def test_diff_timetable_dfs_identical() -> None:
+    df = pd.DataFrame({0: ["A", np.nan], 1: ["B", "C"]})
+
+    cell_diff = _diff_timetable_dfs(df_old=df, df_new=df.copy())
+
+    assert cell_diff.is_empty
+    assert cell_diff.is_text_only
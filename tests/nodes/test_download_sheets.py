@@ -0,0 +1,238 @@
+from typing import Any, List, Union
+
+import httpx
+import pytest
+
+from kronos.nodes.download_sheets import (
+    DownloadConfig,
+    RestSheetsTransport,
+    SheetTarget,
+    TokenBucket,
+    download_targets,
+    download_with_retry,
+    pad_rows,
+)
+from tests.fake_sheets_server import FakeSheetsServer
+
+SPREADSHEETS = {
+    "key_a": {
+        "2024": [["", "Mon"], ["Cape Town", "2024.0"]],
+        "Bob's sheet": [["x", "", ""], ["", "", ""]],
+    },
+    "key_b": {"Sheet1": [["a"], ["b", "c"]], "empty": []},
+}
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+        self.sleeps: List[float] = []
+
+    def clock(self) -> float:
+        return self.now
+
+    def sleep(self, s: float) -> None:
+        self.sleeps.append(s)
+        self.now += s
+
+
+def test_token_bucket_allows_a_burst_then_the_rate() -> None:
+    # Arrange
+    fake_clock = FakeClock()
+    token_bucket = TokenBucket(
+        rate=2.0, capacity=3, clock=fake_clock.clock, sleep=fake_clock.sleep
+    )
+
+    # Act
+    waits = [token_bucket.acquire() for _ in range(5)]
+
+    # Assert
+    assert waits == [0.0, 0.0, 0.0, 0.5, 0.5]
+    assert fake_clock.now == pytest.approx(1.0)
+
+
+def test_token_bucket_refills_up_to_its_capacity_and_pauses() -> None:
+    # Arrange
+    fake_clock = FakeClock()
+    token_bucket = TokenBucket(
+        rate=1.0, capacity=2, clock=fake_clock.clock, sleep=fake_clock.sleep
+    )
+    token_bucket.acquire()
+    token_bucket.acquire()
+    fake_clock.now += 10.0
+
+    # Act
+    waits = [token_bucket.acquire() for _ in range(3)]
+    token_bucket.pause(4.0)
+    wait_after_pause = token_bucket.acquire()
+
+    # Assert
+    assert waits == [0.0, 0.0, 1.0]
+    assert wait_after_pause == pytest.approx(5.0)
+
+
+def test_token_bucket_rejects_invalid_parameters() -> None:
+    with pytest.raises(ValueError, match="rate"):
+        TokenBucket(rate=0.0)
+    with pytest.raises(ValueError, match="capacity"):
+        TokenBucket(rate=1.0, capacity=0)
+
+
+def test_pad_rows() -> None:
+    assert pad_rows([["a"], [], ["b", "c"]]) == [["a", ""], ["", ""], ["b", "c"]]
+    assert pad_rows([]) == []
+
+
+@pytest.mark.parametrize(
+    "spreadsheet_key,worksheet,expected",
+    [
+        ("key_a", 0, [["", "Mon"], ["Cape Town", "2024.0"]]),
+        ("key_a", "Bob's sheet", [["x"]]),
+        ("key_b", 1, []),
+        ("key_b", "Sheet1", [["a", ""], ["b", "c"]]),
+    ],
+)
+def test_rest_sheets_transport_get_values(
+    spreadsheet_key: str, worksheet: Union[int, str], expected: List[List[Any]]
+) -> None:
+    with FakeSheetsServer(spreadsheets=SPREADSHEETS) as fake:
+        with RestSheetsTransport(base_url=fake.url) as transport:
+            sheet_values = transport.get_values(
+                spreadsheet_key=spreadsheet_key, worksheet=worksheet
+            )
+
+    assert sheet_values == expected
+
+
+def test_rest_sheets_transport_caches_worksheet_titles() -> None:
+    with FakeSheetsServer(spreadsheets=SPREADSHEETS) as fake:
+        with RestSheetsTransport(base_url=fake.url) as transport:
+            transport.get_values(spreadsheet_key="key_a", worksheet=0)
+            transport.get_values(spreadsheet_key="key_a", worksheet=1)
+            with pytest.raises(IndexError):
+                transport.get_values(spreadsheet_key="key_a", worksheet=2)
+
+    # One metadata request followed by one values request per worksheet
+    assert fake.n_request == 3
+    # Every request went over the same keep-alive connection
+    assert len(fake.client_ports) == 1
+
+
+def test_download_targets_concurrently_over_one_session() -> None:
+    # Arrange
+    targets = [
+        SheetTarget(name=f"t{i}", spreadsheet_key="key_b", worksheet="Sheet1")
+        for i in range(8)
+    ]
+    download_config = DownloadConfig(max_workers=4)
+
+    # Act
+    with FakeSheetsServer(spreadsheets=SPREADSHEETS, latency_s=0.05) as fake:
+        with RestSheetsTransport(
+            base_url=fake.url, max_connections=download_config.max_workers
+        ) as transport:
+            sheet_downloads = list(
+                download_targets(
+                    transport=transport,
+                    targets=targets,
+                    download_config=download_config,
+                )
+            )
+
+    # Assert
+    assert sorted(d.target.name for d in sheet_downloads) == [t.name for t in targets]
+    assert all(d.sheet_values == [["a", ""], ["b", "c"]] for d in sheet_downloads)
+    assert 1 < fake.max_in_flight <= download_config.max_workers
+    assert len(fake.client_ports) <= download_config.max_workers
+
+
+def test_download_targets_are_throttled_by_the_token_bucket() -> None:
+    # Arrange
+    targets = [
+        SheetTarget(name=f"t{i}", spreadsheet_key="key_b", worksheet="Sheet1")
+        for i in range(6)
+    ]
+
+    # Act
+    with FakeSheetsServer(spreadsheets=SPREADSHEETS) as fake:
+        with RestSheetsTransport(
+            base_url=fake.url, token_bucket=TokenBucket(rate=20.0, capacity=2)
+        ) as transport:
+            list(download_targets(transport=transport, targets=targets))
+
+    # Assert
+    arrivals = sorted(arrival for arrival, _ in fake.requests)
+    # Two requests are sent at once and the remaining four at 20 per second
+    assert arrivals[-1] - arrivals[0] >= 4 / 20.0 - 0.02
+
+
+def test_download_with_retry_honours_retry_after() -> None:
+    # Arrange
+    target = SheetTarget(name="t", spreadsheet_key="key_a", worksheet=0)
+    download_config = DownloadConfig(backoff_s=0.0, max_retries=3)
+
+    # Act
+    with FakeSheetsServer(
+        spreadsheets=SPREADSHEETS, n_rate_limited=2, retry_after_s=0.1
+    ) as fake:
+        with RestSheetsTransport(
+            base_url=fake.url, token_bucket=TokenBucket(rate=1000.0, capacity=10)
+        ) as transport:
+            sheet_download = download_with_retry(
+                transport=transport, target=target, download_config=download_config
+            )
+
+    # Assert
+    assert sheet_download.error is None
+    assert sheet_download.n_retry == 2
+    assert sheet_download.sheet_values == SPREADSHEETS["key_a"]["2024"]
+    arrivals = [arrival for arrival, _ in fake.requests]
+    assert all(
+        later - earlier >= 0.09 for earlier, later in zip(arrivals, arrivals[1:3])
+    )
+
+
+def test_download_with_retry_gives_up_on_errors_which_are_not_retryable() -> None:
+    # Arrange
+    target = SheetTarget(name="t", spreadsheet_key="missing", worksheet="Sheet1")
+
+    # Act
+    with FakeSheetsServer(spreadsheets=SPREADSHEETS) as fake:
+        with RestSheetsTransport(base_url=fake.url) as transport:
+            sheet_download = download_with_retry(
+                transport=transport, target=target, download_config=DownloadConfig()
+            )
+
+    # Assert
+    assert sheet_download.sheet_values is None
+    assert sheet_download.n_retry == 0
+    assert sheet_download.error is not None and "404" in sheet_download.error
+    assert fake.n_request == 1
+
+
+def test_download_with_retry_gives_up_after_max_retries() -> None:
+    # Arrange
+    class FailingTransport:
+        n_call = 0
+
+        def get_values(
+            self, spreadsheet_key: str, worksheet: Union[int, str]
+        ) -> List[List[Any]]:
+            self.n_call += 1
+            raise httpx.ConnectError("Connection refused")
+
+    transport = FailingTransport()
+    target = SheetTarget(name="t", spreadsheet_key="key_a")
+
+    # Act
+    sheet_download = download_with_retry(
+        transport=transport,
+        target=target,
+        download_config=DownloadConfig(max_retries=2, backoff_s=0.0),
+    )
+
+    # Assert
+    assert sheet_download.sheet_values is None
+    assert sheet_download.n_retry == 2
+    assert transport.n_call == 3
+    assert sheet_download.error == "ConnectError: Connection refused"
@@ -1,19 +1,34 @@
 from unittest.mock import ANY, MagicMock, Mock, patch
 
 import numpy as np
+import orjson
+import pytest
 from pydantic_core import Url
-from weaviate.collections.classes.config import DataType
+from weaviate.classes.config import DataType
 
 from kronos.nodes.operate_vector_db import (
     CollectionName,
     CollectionSchema,
+    IngestConfig,
+    NameToSchema,
+    PropertyName,
+    PropertySchema,
+    RestBatchTransport,
     VectorDBEndPoint,
     add_collections,
     batch_import,
+    batch_upsert,
     collection_exists,
     del_collection,
+    emb_hashes,
+    get_emb_hash_property_schema,
+    ingest,
     instantiate_client,
+    iter_objects,
+    object_uuids,
+    validate_object_properties,
 )
+from tests.fake_vector_db import FakeVectorDB
 
 
 @patch("kronos.nodes.operate_vector_db.WeaviateClient")
@@ -84,32 +99,298 @@ def test_del_collection() -> None:
 def test_batch_import() -> None:
     # Arrange
     mock_client = Mock()
+    mock_transport = Mock()
+    mock_transport.send.side_effect = lambda objects: [None] * len(objects)
     collection_name = CollectionName.word
     text = np.array(["a_text"])
     emb = np.array([[0.1, 0.2]])
-    mock_batch = Mock()
-    mock_context_manager = MagicMock()
-    mock_client.batch.dynamic.return_value = mock_context_manager
-    mock_context_manager.__enter__.return_value = mock_batch
     mock_client.collections.get.return_value.aggregate.overall.return_value = MagicMock(
         total_count=1
     )
 
-    expected_add_object = [
-        (
-            {
-                "collection": collection_name.value,
-                "properties": {"name": "a_text", "data_type": DataType.TEXT},
-                "vector": ANY,  # TODO: Test numpy array equality inside call_args_list
-            },
+    # Act
+    report = batch_import(
+        client=mock_client,
+        collection_name=collection_name,
+        text=text,
+        emb=emb,
+        transport=mock_transport,
+    )
+
+    # Assert
+    (objects,), _ = mock_transport.send.call_args
+    assert objects[0]["class"] == collection_name.value
+    assert objects[0]["properties"] == {
+        PropertyName.text.value: "a_text",
+        PropertyName.emb_hash.value: emb_hashes(emb)[0],
+    }
+    assert objects[0]["vector"].dtype == np.float32
+    assert report.n_object == 1
+    mock_client.collections.get.assert_called_once_with(collection_name.value)
+
+
+def test_batch_import_schema_mismatch() -> None:
+    # Arrange
+    schema = CollectionSchema(name=CollectionName.word, description="", properties=[])
+
+    # Act & Assert
+    with patch.dict(NameToSchema, {CollectionName.word: schema}):
+        with pytest.raises(ValueError, match="do not match properties"):
+            batch_import(
+                client=Mock(),
+                collection_name=CollectionName.word,
+                text=np.array(["a_text"]),
+                emb=np.array([[0.1, 0.2]]),
+                transport=Mock(),
+            )
+
+
+def test_batch_import_data_type_mismatch() -> None:
+    # Arrange
+    schema = CollectionSchema(
+        name=CollectionName.word,
+        description="",
+        properties=[
+            PropertySchema(
+                name=PropertyName.text, description="", data_type=DataType.INT
+            ),
+            get_emb_hash_property_schema(),
+        ],
+    )
+    mock_transport = Mock()
+
+    # Act & Assert
+    with patch.dict(NameToSchema, {CollectionName.word: schema}):
+        with pytest.raises(ValueError, match="does not match data type"):
+            batch_import(
+                client=Mock(),
+                collection_name=CollectionName.word,
+                text=np.array(["a_text"]),
+                emb=np.array([[0.1, 0.2]]),
+                transport=mock_transport,
+            )
+    mock_transport.send.assert_not_called()
+
+
+def test_iter_objects_match_every_collection_schema() -> None:
+    for collection_name in CollectionName:
+        obj = next(
+            iter_objects(
+                collection_name=collection_name,
+                text=np.array(["a_text"]),
+                emb=np.array([[0.1, 0.2]]),
+            )
+        )
+
+        validate_object_properties(
+            collection_name=collection_name, properties=obj["properties"]
+        )
+
+
+def test_iter_objects_row_views() -> None:
+    # Arrange
+    emb = np.random.default_rng(0).random((3, 4)).astype(np.float32)
+
+    # Act
+    objects = list(
+        iter_objects(
+            collection_name=CollectionName.word, text=np.array(["a", "b", "c"]), emb=emb
+        )
+    )
+
+    # Assert
+    assert all(np.shares_memory(obj["vector"], emb) for obj in objects)
+    assert all(obj["vector"].flags.c_contiguous for obj in objects)
+
+
+def test_batch_import_wire_size_per_10k_vectors() -> None:
+    # Arrange
+    n_vector, n_dim = 10_000, 32
+    text = np.array([f"text {i}" for i in range(n_vector)])
+    emb = np.random.default_rng(0).random((n_vector, n_dim))  # float64
+    mock_client = Mock()
+
+    # Act
+    with FakeVectorDB() as fake_vector_db, RestBatchTransport(
+        end_point=VectorDBEndPoint(url=Url(fake_vector_db.url))
+    ) as transport:
+        batch_import(
+            client=mock_client,
+            collection_name=CollectionName.word,
+            text=text,
+            emb=emb,
+            transport=transport,
+            ingest_config=IngestConfig(batch_size=1000),
+        )
+
+    # Assert
+    wire_bytes = sum(fake_vector_db.request_bytes)
+    float64_vector_bytes = len(orjson.dumps(emb.tolist()))
+    float32_vector_bytes = len(orjson.dumps(emb.astype(np.float32).tolist()))
+    # Vectors are sent with float32 precision
+    assert len(fake_vector_db.objects) == n_vector
+    assert wire_bytes < float32_vector_bytes + 150 * n_vector
+    assert wire_bytes < 0.8 * float64_vector_bytes
+
+
+def test_ingest_against_fake_server() -> None:
+    # Arrange
+    objects = [
+        {"class": "Word", "properties": {"text": str(i)}, "vector": [float(i)]}
+        for i in range(1000)
+    ]
+    ingest_config = IngestConfig(batch_size=64, max_in_flight=4)
+
+    # Act
+    with FakeVectorDB(latency_s=0.01) as fake_vector_db, RestBatchTransport(
+        end_point=VectorDBEndPoint(url=Url(fake_vector_db.url))
+    ) as transport:
+        report = ingest(
+            objects=iter(objects), transport=transport, ingest_config=ingest_config
+        )
+
+    # Assert
+    assert len(fake_vector_db.objects) == 1000
+    assert report.n_object == 1000
+    assert report.n_failed == 0
+    assert len(report.batches) == 16
+    assert sorted(metrics.i_batch for metrics in report.batches) == list(range(16))
+    assert 1 < fake_vector_db.max_in_flight <= 4
+
+
+def test_ingest_retries_failed_objects_and_requests() -> None:
+    # Arrange
+    objects = [{"class": "Word", "id": str(i), "vector": [0.0]} for i in range(100)]
+    # A single request in flight keeps the order of injected failures fixed
+    ingest_config = IngestConfig(
+        batch_size=10, max_in_flight=1, max_retries=3, backoff_s=0.001
+    )
+
+    # Act
+    with FakeVectorDB(
+        n_fail_per_object=1, fail_every_nth_request=5
+    ) as fake_vector_db, RestBatchTransport(
+        end_point=VectorDBEndPoint(url=Url(fake_vector_db.url))
+    ) as transport:
+        report = ingest(
+            objects=objects, transport=transport, ingest_config=ingest_config
+        )
+
+    # Assert
+    assert sorted(fake_vector_db.objects, key=int) == [str(i) for i in range(100)]
+    assert report.n_failed == 0
+    assert report.n_retry >= 10
+
+
+def test_ingest_gives_up_after_max_retries() -> None:
+    # Arrange
+    objects = [{"class": "Word", "id": str(i), "vector": [0.0]} for i in range(20)]
+    ingest_config = IngestConfig(batch_size=8, max_retries=2, backoff_s=0.001)
+
+    # Act
+    with FakeVectorDB(n_fail_per_object=5) as fake_vector_db, RestBatchTransport(
+        end_point=VectorDBEndPoint(url=Url(fake_vector_db.url))
+    ) as transport:
+        report = ingest(
+            objects=objects, transport=transport, ingest_config=ingest_config
+        )
+
+    # Assert
+    assert report.n_failed == 20
+    assert [metrics.n_retry for metrics in report.batches] == [2, 2, 2]
+    assert fake_vector_db.n_request == 9
+
+
+def test_object_uuids() -> None:
+    text = np.array(["a_text", "b_text", "a_text"])
+
+    word_uuids = object_uuids(collection_name=CollectionName.word, text=text)
+    sent_uuids = object_uuids(collection_name=CollectionName.sent, text=text)
+
+    assert word_uuids[0] == word_uuids[2] != word_uuids[1]
+    assert word_uuids[0] != sent_uuids[0]
+
+
+def test_emb_hashes_dtype_invariant() -> None:
+    emb = np.array([[0.5, 0.25], [1.0, 2.0]], dtype=np.float64)
+
+    assert emb_hashes(emb) == emb_hashes(emb.astype(np.float32))
+    assert len(set(emb_hashes(emb))) == 2
+
+
+def test_batch_upsert() -> None:
+    # Arrange
+    collection_name = CollectionName.word
+    text = np.array(["same", "changed", "new"])
+    emb = np.array([[0.1, 0.2], [0.3, 0.4], [0.5, 0.6]])
+    uuids = object_uuids(collection_name=collection_name, text=text)
+    hashes = emb_hashes(emb)
+    stale_uuid = object_uuids(collection_name=collection_name, text=np.array(["old"]))
+
+    mock_client = Mock()
+    mock_transport = Mock()
+    mock_transport.send.side_effect = lambda objects: [None] * len(objects)
+    mock_collection = mock_client.collections.get.return_value
+    mock_collection.query.fetch_objects.return_value.objects = [
+        Mock(uuid=uuids[0], properties={PropertyName.emb_hash.value: hashes[0]}),
+        Mock(uuid=uuids[1], properties={PropertyName.emb_hash.value: "outdated"}),
+    ]
+
+    # Act
+    with patch(
+        "kronos.nodes.operate_vector_db.emb_hashes", wraps=emb_hashes
+    ) as mock_emb_hashes:
+        upsert_report = batch_upsert(
+            client=mock_client,
+            collection_name=collection_name,
+            chunks=iter([(text[:2], emb[:2]), (text[2:], emb[2:])]),
+            transport=mock_transport,
+            previous_uuids={*uuids[:2], stale_uuid[0]},
         )
+
+    # Assert
+    (added,), _ = mock_transport.send.call_args
+    assert [obj["id"] for obj in added] == [uuids[1], uuids[2]]
+    assert added[0]["properties"] == {
+        PropertyName.text.value: "changed",
+        PropertyName.emb_hash.value: hashes[1],
+    }
+    assert added[1]["vector"].tolist() == emb[2].astype(np.float32).tolist()
+    # Every row is hashed once
+    assert mock_emb_hashes.call_count == 2
+    # Stale objects are found without listing the collection
+    mock_collection.iterator.assert_not_called()
+    mock_collection.data.delete_many.assert_called_once()
+    assert upsert_report.n_deleted == 1
+    assert upsert_report.uuids == set(uuids)
+
+
+def test_batch_upsert_lists_the_collection_without_a_manifest() -> None:
+    # Arrange
+    collection_name = CollectionName.word
+    text = np.array(["same"])
+    emb = np.array([[0.1, 0.2]])
+    uuids = object_uuids(collection_name=collection_name, text=text)
+    stale_uuid = object_uuids(collection_name=collection_name, text=np.array(["old"]))
+
+    mock_client = Mock()
+    mock_transport = Mock()
+    mock_transport.send.side_effect = lambda objects: [None] * len(objects)
+    mock_collection = mock_client.collections.get.return_value
+    mock_collection.query.fetch_objects.return_value.objects = []
+    mock_collection.iterator.return_value = [
+        Mock(uuid=uuids[0]),
+        Mock(uuid=stale_uuid[0]),
     ]
 
     # Act
-    batch_import(
-        client=mock_client, collection_name=collection_name, text=text, emb=emb
+    upsert_report = batch_upsert(
+        client=mock_client,
+        collection_name=collection_name,
+        chunks=iter([(text, emb)]),
+        transport=mock_transport,
     )
 
     # Assert
-    assert mock_batch.add_object.call_args_list == expected_add_object
-    mock_client.collections.get.assert_called_once_with(collection_name.value)
+    mock_collection.iterator.assert_called_once()
+    assert upsert_report.n_deleted == 1
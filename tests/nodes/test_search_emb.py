@@ -0,0 +1,151 @@
+import numpy as np
+import pytest
+
+from kronos.nodes.search_emb import (
+    EmbSearcher,
+    IVFIndex,
+    emb_digest,
+    exact_search,
+    normalise_rows,
+    recall_at_k,
+)
+
+
+@pytest.fixture
+def clustered_emb() -> np.ndarray:
+    rng = np.random.default_rng(0)
+    centers = rng.normal(size=(20, 16))
+    return (
+        centers[rng.integers(0, 20, 2000)] + 0.3 * rng.normal(size=(2000, 16))
+    ).astype(np.float16)
+
+
+def brute_force_top_k(query: np.ndarray, emb: np.ndarray, k: int) -> np.ndarray:
+    scores = normalise_rows(query) @ normalise_rows(emb).T
+    return np.argsort(-scores, axis=1, kind="stable")[:, :k]
+
+
+def test_normalise_rows_keeps_zero_rows() -> None:
+    # Arrange
+    emb = np.array([[3.0, 4.0], [0.0, 0.0]])
+
+    # Act
+    emb_norm = normalise_rows(emb)
+
+    # Assert
+    assert emb_norm.dtype == np.float32
+    np.testing.assert_allclose(emb_norm, [[0.6, 0.8], [0.0, 0.0]])
+
+
+def test_exact_search_matches_brute_force_across_blocks(
+    clustered_emb: np.ndarray,
+) -> None:
+    # Arrange
+    query = clustered_emb[[0, 10, 500]].astype(np.float64)
+
+    # Act
+    result = exact_search(query=query, emb=clustered_emb, k=5, block_size=64)
+
+    # Assert
+    np.testing.assert_array_equal(
+        np.sort(result.indices, axis=1),
+        np.sort(brute_force_top_k(query, clustered_emb, k=5), axis=1),
+    )
+    assert (np.diff(result.scores, axis=1) <= 0).all()
+    np.testing.assert_allclose(result.scores[:, 0], 1.0, atol=1e-3)
+
+
+def test_exact_search_pads_when_fewer_than_k() -> None:
+    # Arrange
+    emb = np.array([[1.0, 0.0], [0.0, 1.0]])
+
+    # Act
+    result = exact_search(query=np.array([1.0, 0.0]), emb=emb, k=3)
+
+    # Assert
+    np.testing.assert_array_equal(result.indices, [[0, 1, -1]])
+    assert result.scores[0, 2] == -np.inf
+
+
+def test_ivf_index_recall(clustered_emb: np.ndarray) -> None:
+    # Arrange
+    query = clustered_emb[::100]
+    exact = exact_search(query=query, emb=clustered_emb, k=10)
+
+    # Act
+    ivf_index = IVFIndex.build(emb=clustered_emb, n_list=20)
+    approx = ivf_index.search(query=query, emb=clustered_emb, k=10, n_probe=4)
+    exhaustive = ivf_index.search(query=query, emb=clustered_emb, k=10, n_probe=20)
+
+    # Assert
+    assert ivf_index.starts[-1] == len(clustered_emb)
+    np.testing.assert_array_equal(np.sort(ivf_index.order), np.arange(2000))
+    assert recall_at_k(approx.indices, exact.indices) >= 0.9
+    assert recall_at_k(exhaustive.indices, exact.indices) == 1.0
+
+
+def test_ivf_index_build_rejects_no_embeddings() -> None:
+    with pytest.raises(ValueError, match="no embeddings"):
+        IVFIndex.build(emb=np.zeros((0, 4)), n_list=2)
+
+
+def test_recall_at_k() -> None:
+    assert recall_at_k(np.array([[0, 1], [2, 9]]), np.array([[1, 0], [2, 3]])) == 0.75
+
+
+def test_emb_searcher_batch_query_by_text(clustered_emb: np.ndarray) -> None:
+    # Arrange
+    text = np.array([f"text_{i}" for i in range(len(clustered_emb))])
+    searcher = EmbSearcher(text=text, emb=clustered_emb, block_size=128)
+
+    # Act
+    query = searcher.query_emb_of_texts(query_text=["text_3", "text_7"])
+    neighbours = searcher.neighbour_texts(searcher.search(query=query, k=2))
+
+    # Assert
+    assert [a_neighbours[0][0] for a_neighbours in neighbours] == ["text_3", "text_7"]
+    assert all(len(a_neighbours) == 2 for a_neighbours in neighbours)
+    with pytest.raises(ValueError, match="no embedding"):
+        searcher.query_emb_of_texts(query_text=["missing"])
+
+
+def test_emb_searcher_rejects_stale_index(clustered_emb: np.ndarray) -> None:
+    # Arrange
+    ivf_index = IVFIndex.build(emb=clustered_emb, n_list=4)
+
+    # Act & Assert
+    with pytest.raises(ValueError, match="different embeddings"):
+        EmbSearcher(
+            text=np.array(["a"] * 1000), emb=clustered_emb[:1000], ivf_index=ivf_index
+        )
+
+
+def test_emb_digest_covers_every_value(clustered_emb: np.ndarray) -> None:
+    # Arrange
+    changed_emb = clustered_emb.copy()
+    changed_emb[1001, 3] += 1
+
+    # Act
+    digest = emb_digest(emb=clustered_emb, block_size=300)
+
+    # Assert
+    assert digest == emb_digest(emb=clustered_emb, block_size=7)
+    assert digest != emb_digest(emb=changed_emb, block_size=300)
+    assert digest != emb_digest(emb=clustered_emb.astype(np.float32))
+
+
+def test_emb_searcher_rejects_an_index_of_embeddings_of_the_same_shape(
+    clustered_emb: np.ndarray,
+) -> None:
+    # Arrange
+    ivf_index = IVFIndex.build(emb=clustered_emb, n_list=4)
+    regenerated_emb = clustered_emb.copy()
+    regenerated_emb[1001] = -regenerated_emb[1001]
+
+    # Act & Assert
+    with pytest.raises(ValueError, match="different embeddings"):
+        EmbSearcher(
+            text=np.array(["a"] * len(regenerated_emb)),
+            emb=regenerated_emb,
+            ivf_index=ivf_index,
+        )
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from kronos.nodes.utils_batching import padded_token_count, token_budget_batches
+
+
+def test_token_budget_batches() -> None:
+    # Arrange
+    lengths = np.array([5, 2, 9, 3, 3, 100])
+
+    # Act
+    batches = token_budget_batches(lengths=lengths, max_batch_tokens=12)
+
+    # Assert
+    assert [batch.tolist() for batch in batches] == [[1, 3, 4], [0], [2], [5]]
+    assert sorted(np.concatenate(batches).tolist()) == list(range(len(lengths)))
+
+
+def test_token_budget_batches_max_batch_size() -> None:
+    batches = token_budget_batches(
+        lengths=np.ones(10, dtype=np.int64), max_batch_tokens=100, max_batch_size=4
+    )
+
+    assert [len(batch) for batch in batches] == [4, 4, 2]
+
+
+def test_token_budget_batches_empty() -> None:
+    assert token_budget_batches(lengths=np.zeros(0), max_batch_tokens=10) == []
+
+
+def test_token_budget_batches_invalid_budget() -> None:
+    with pytest.raises(ValueError):
+        _ = token_budget_batches(lengths=np.ones(3), max_batch_tokens=0)
+
+
+def test_token_budget_batches_synthetic_corpus() -> None:
+    # Arrange
+    # Mostly short codes with a long tail of free text notes
+    rng = np.random.default_rng(0)
+    n = 20_000
+    lengths = np.where(
+        rng.random(n) < 0.7,
+        rng.integers(3, 6, n),
+        rng.lognormal(3, 0.7, n).astype(int) + 3,
+    ).clip(3, 256)
+    fixed_batches = [np.arange(start, min(start + 32, n)) for start in range(0, n, 32)]
+
+    # Act
+    batches = token_budget_batches(lengths=lengths, max_batch_tokens=4096)
+
+    # Assert
+    assert all(len(b) * lengths[b].max() <= 4096 for b in batches if len(b) > 1)
+    assert len(batches) < len(fixed_batches)
+    assert padded_token_count(lengths, batches) < 1.1 * lengths.sum()
+    assert padded_token_count(lengths, fixed_batches) > 5 * lengths.sum()
@@ -0,0 +1,54 @@
+import numpy as np
+
+from kronos.data_interfaces.edge_dfs_data_interface import EdgeAttrKey, EdgeType
+from kronos.data_interfaces.node_dfs_data_interface import NodeAttrKey, NodeType
+from kronos.nodes.utils_columnar import (
+    EdgeDFBuilder,
+    constant_categorical,
+    node_df_from_texts,
+)
+
+
+def test_constant_categorical() -> None:
+    categorical = constant_categorical("Token", 3)
+
+    assert categorical.tolist() == ["Token"] * 3
+    assert categorical.categories.tolist() == ["Token"]
+
+
+def test_node_df_from_texts() -> None:
+    # Act
+    node_df = node_df_from_texts(NodeType.ent, ["a", "b"])
+
+    # Assert
+    assert node_df.ntype == NodeType.ent
+    assert node_df.df[NodeAttrKey.nid.value].dtype == np.int32
+    assert node_df.df[NodeAttrKey.nid.value].tolist() == [0, 1]
+    assert node_df.df[NodeAttrKey.ntype.value].tolist() == ["Ent", "Ent"]
+    assert node_df.df[NodeAttrKey.text.value].tolist() == ["a", "b"]
+
+
+def test_edge_df_builder() -> None:
+    # Arrange
+    builder = EdgeDFBuilder(
+        etype=EdgeType.token_to_cell,
+        src_ntype=NodeType.token,
+        dst_ntype=NodeType.sheet_cell,
+        attr_keys=(EdgeAttrKey.i_token_in_doc,),
+    )
+
+    # Act
+    builder.append(0, 1, 2)
+    builder.extend([3, 4], [5, 6], [7, 8])
+    edge_df = builder.to_edge_df()
+    builder.append(9, 9, 9)  # Materialised dataframes do not share buffers
+
+    # Assert
+    df = edge_df.df
+    assert edge_df.etype == EdgeType.token_to_cell
+    assert df[EdgeAttrKey.src_nid.value].tolist() == [0, 3, 4]
+    assert df[EdgeAttrKey.dst_nid.value].tolist() == [1, 5, 6]
+    assert df[EdgeAttrKey.i_token_in_doc.value].tolist() == [2, 7, 8]
+    assert df[EdgeAttrKey.src_nid.value].dtype == np.int32
+    assert df[EdgeAttrKey.etype.value].dtype == "category"
+    assert df[EdgeAttrKey.dst_ntype.value].tolist() == ["SheetCell"] * 3
@@ -1,4 +1,16 @@
-from kronos.nodes.utils_data_interfaces import generate_timestamp
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from kronos.nodes.utils_data_interfaces import (
+    atomic_write_bytes,
+    convert_to_str,
+    generate_timestamp,
+    normalise_sheet_cells,
+)
 
 
 def test_generate_timestamp_format() -> None:
@@ -8,3 +20,60 @@ def test_generate_timestamp_format() -> None:
     assert (
         len(timestamp) == 24
     ), "Timestamp format length should match YYYY-MM-DDTHH.MM.SSZ"
+
+
+def test_normalise_sheet_cells_matches_cell_by_cell_conversion() -> None:
+    # Arrange
+    values = [
+        ["2024", "2024.0", " 12 ", "1_000", "١٢", "3.7", "-2", "1e3"],
+        ["nan", "N/A", "Room 101", "", "0x10", "+5", ".5", None],
+        [1, 2.5, True, "inf", "Lunch", "", "9:00", "1,000"],
+    ]
+    df = pd.DataFrame(values)
+    expected = df.replace("", np.nan)
+    expected = expected.map(
+        lambda v: v if isinstance(v, str) and v.strip() == "inf" else convert_to_str(v)
+    )
+
+    # Act
+    normalised = normalise_sheet_cells(df)
+
+    # Assert
+    pd.testing.assert_frame_equal(normalised, expected)
+    assert normalised.iloc[0].tolist() == [
+        "2024",
+        "2024",
+        "12",
+        "1000",
+        "12",
+        "3",
+        "-2",
+        "1000",
+    ]
+
+
+def test_normalise_sheet_cells_keeps_null_columns() -> None:
+    # Arrange
+    df = pd.DataFrame([["", "2024"], ["", "Lunch"]])
+
+    # Act
+    normalised = normalise_sheet_cells(df)
+
+    # Assert
+    assert normalised[0].isna().all()
+    assert normalised[1].tolist() == ["2024", "Lunch"]
+
+
+def test_atomic_write_bytes(tmp_path: Path) -> None:
+    # Arrange
+    path = tmp_path / "dir" / "file.json"
+
+    # Act
+    atomic_write_bytes(path=path, content=b"old")
+    with patch("os.replace", side_effect=OSError("Disk full")):
+        with pytest.raises(OSError, match="Disk full"):
+            atomic_write_bytes(path=path, content=b"new")
+
+    # Assert
+    assert path.read_bytes() == b"old"
+    assert [p.name for p in path.parent.iterdir()] == ["file.json"]
@@ -1,6 +1,14 @@
+from pathlib import Path
+
 import pandas as pd
+import pytest
 
-from kronos.nodes.utils_df_serialisation import default, df_type_hook
+from kronos.nodes.utils_df_serialisation import (
+    DFsFormat,
+    default,
+    df_type_hook,
+    dfs_format_from_path,
+)
 
 
 def test_default() -> None:
@@ -23,3 +31,16 @@ def test_df_type_hook(mock_json_str_df: str) -> None:
     assert not result.empty
     assert list(result.columns) == ["dummy", "etype"]
     assert result.iloc[0]["dummy"] == [0, 0]
+
+
+@pytest.mark.parametrize(
+    "filepath,expected",
+    [
+        (Path("node_dfs.json"), DFsFormat.json),
+        (Path("node_dfs.parquet"), DFsFormat.parquet),
+        (Path("node_dfs.arrow"), DFsFormat.arrow),
+        (Path("node_dfs"), DFsFormat.json),
+    ],
+)
+def test_dfs_format_from_path(filepath: Path, expected: DFsFormat) -> None:
+    assert dfs_format_from_path(filepath) == expected
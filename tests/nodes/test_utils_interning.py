@@ -0,0 +1,33 @@
+import pytest
+
+from kronos.nodes.utils_interning import InternTable
+
+
+def test_intern_assigns_ids_in_order_of_first_appearance() -> None:
+    # Arrange
+    table = InternTable()
+
+    # Act
+    ids = [table.intern(text) for text in ["b", "a", "b", "c", "a"]]
+
+    # Assert
+    assert ids == [0, 1, 0, 2, 1]
+    assert table.to_list() == ["b", "a", "c"]
+    assert len(table) == 3
+
+
+def test_intern_table_from_iterable() -> None:
+    table = InternTable(["x", "y", "x"])
+
+    assert table.to_list() == ["x", "y"]
+    assert "x" in table
+    assert "z" not in table
+    assert list(table) == ["x", "y"]
+
+
+def test_id_of_unknown_text() -> None:
+    table = InternTable(["x"])
+
+    assert table.id_of("x") == 0
+    with pytest.raises(KeyError):
+        table.id_of("y")
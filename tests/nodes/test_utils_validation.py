@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+
+from kronos.nodes.utils_validation import (
+    concat_nids_by_ntype,
+    describe_nids,
+    duplicate_nids,
+    isin_sorted,
+    missing_nids,
+    nids_by_ntype,
+    sorted_unique,
+)
+
+
+def test_nids_by_ntype() -> None:
+    # Arrange
+    ntype = pd.Series(["Token", "SheetCell", "Token"])
+    nid = pd.Series([4, 0, 2])
+
+    # Act
+    result = nids_by_ntype(ntype=ntype, nid=nid)
+
+    # Assert
+    assert {key: value.tolist() for key, value in result.items()} == {
+        "SheetCell": [0],
+        "Token": [4, 2],
+    }
+
+
+def test_concat_nids_by_ntype() -> None:
+    result = concat_nids_by_ntype(
+        [{"Token": np.array([0, 1])}, {"Token": np.array([5]), "Ent": np.array([0])}]
+    )
+
+    assert result["Token"].tolist() == [0, 1, 5]
+    assert result["Ent"].tolist() == [0]
+
+
+def test_duplicate_nids() -> None:
+    result = duplicate_nids(
+        {"Token": np.array([3, 1, 3, 3, 2, 1]), "Ent": np.arange(3)}
+    )
+
+    assert list(result) == ["Token"]
+    assert result["Token"].tolist() == [1, 3]
+
+
+def test_missing_nids() -> None:
+    # Arrange
+    nids = {"Token": np.array([0, 7, 7, 1]), "Ent": np.array([0])}
+    reference = {"Token": np.array([0, 1, 2])}
+
+    # Act
+    result = missing_nids(nids_by_ntype=nids, reference_by_ntype=reference)
+
+    # Assert
+    assert {key: value.tolist() for key, value in result.items()} == {
+        "Token": [7],
+        "Ent": [0],
+    }
+
+
+def test_describe_nids() -> None:
+    assert describe_nids({}) == "none"
+    assert describe_nids({"Token": np.arange(12)}) == (
+        "Token: 12 ids such as [0, 1, 2, 3, 4, 5, 6, 7, 8, 9]"
+    )
+
+
+def test_sorted_unique() -> None:
+    assert sorted_unique(np.array([5, 1, 5, 0, 1])).tolist() == [0, 1, 5]
+
+
+def test_isin_sorted() -> None:
+    result = isin_sorted(np.array([0, 3, 9, -1]), np.array([0, 3, 5]))
+
+    assert result.tolist() == [True, True, False, False]
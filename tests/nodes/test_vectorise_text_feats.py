@@ -1,10 +1,14 @@
+from pathlib import Path
+from typing import Tuple
 from unittest.mock import MagicMock, Mock, patch
 
 import numpy as np
 import pytest
+import spacy
 from pandas import DataFrame
 from pytest import fixture
 
+from kronos.data_interfaces.emb_cache_data_interface import EmbCacheDataInterface
 from kronos.data_interfaces.node_dfs_data_interface import (
     NodeAttrKey,
     NodeDF,
@@ -15,7 +19,12 @@ from kronos.nodes.vectorise_text_feats import (
     _vectorise_with_word_vector,
     embed_with_avg_word_vec,
     embed_with_sent_tx,
+    encode_multi_process_streaming,
+    log_throughput,
+    plan_cpu_workers,
     prep_emb_input,
+    sentence_transformer_identity,
+    spacy_pipeline_identity,
 )
 
 #
@@ -138,7 +147,10 @@ def test_vectorise_with_word_vector(
 def mock_sentence_transformer() -> MagicMock:
     st = MagicMock()
     st.start_multi_process_pool.return_value = "mock_pool"
-    st.encode_multi_process.return_value = [np.array([1, 2, 3]) for _ in range(600)]
+    st.device = "cpu"
+    st.encode_multi_process.side_effect = lambda sentences, **kwargs: np.array(
+        [[1, 2, 3] for _ in sentences]
+    )
     st.encode.return_value = [np.array([1, 2, 3]) for _ in range(100)]
 
     return st
@@ -197,3 +209,188 @@ def test_embed_with_sent_tx_multiple_batches(
 
     # Assert
     assert len(emb) == 600
+
+
+def test_embed_with_sent_tx_multi_encodes_each_text_once(
+    mock_sentence_transformer: MagicMock,
+) -> None:
+    # Arrange
+    texts = [f"text {'x' * (i % 7)} {i}" for i in range(10_000)]
+    mock_sentence_transformer.encode_multi_process.side_effect = (
+        lambda sentences, **kwargs: np.array([[len(s)] for s in sentences])
+    )
+
+    # Act
+    res = list(
+        embed_with_sent_tx(
+            text=texts, sent_tx=mock_sentence_transformer, use_multi=True
+        )
+    )
+
+    # Assert
+    assert [text for text, _ in res] == texts
+    assert all(emb[0] == len(text) for text, emb in res)
+    n_encoded = sum(
+        len(call.kwargs["sentences"])
+        for call in mock_sentence_transformer.encode_multi_process.call_args_list
+    )
+    assert n_encoded == len(texts)
+    mock_sentence_transformer.start_multi_process_pool.assert_called_once()
+    mock_sentence_transformer.stop_multi_process_pool.assert_called_once()
+
+
+def test_encode_multi_process_streaming_sorts_windows(
+    mock_sentence_transformer: MagicMock,
+) -> None:
+    texts = ["ccc", "a", "bb", "dddd", "e"]
+
+    res = list(
+        encode_multi_process_streaming(
+            text=texts, sent_tx=mock_sentence_transformer, pool={}, window_size=3
+        )
+    )
+
+    assert [text for text, _ in res] == texts
+    sentences = [
+        call.kwargs["sentences"]
+        for call in mock_sentence_transformer.encode_multi_process.call_args_list
+    ]
+    assert sentences == [["a", "bb", "ccc"], ["e", "dddd"]]
+
+
+@pytest.mark.parametrize(
+    "n_cpu, expected", [(1, (1, 1)), (4, (2, 2)), (16, (4, 4)), (6, (3, 2))]
+)
+def test_plan_cpu_workers(n_cpu: int, expected: Tuple[int, int]) -> None:
+    n_worker, n_thread = plan_cpu_workers(n_cpu=n_cpu)
+
+    assert (n_worker, n_thread) == expected
+    assert n_worker * n_thread <= n_cpu
+
+
+def test_embed_with_sent_tx_bucketed(mock_sentence_transformer: MagicMock) -> None:
+    # Arrange
+    texts = ["a b c d", "a", "a b", "a b c d e f g h"]
+    mock_sentence_transformer.tokenizer.side_effect = lambda text, **kwargs: {
+        "input_ids": [a_text.split() for a_text in text]
+    }
+    mock_sentence_transformer.encode.side_effect = lambda sentences, **kwargs: (
+        np.array([[len(s)] for s in sentences])
+    )
+
+    # Act
+    res = list(
+        embed_with_sent_tx(
+            text=texts, sent_tx=mock_sentence_transformer, max_batch_tokens=8
+        )
+    )
+
+    # Assert
+    assert [text for text, _ in res] == texts
+    assert all(emb[0] == len(text) for text, emb in res)
+    sentences = [
+        call.kwargs["sentences"]
+        for call in mock_sentence_transformer.encode.call_args_list
+    ]
+    assert sentences == [["a", "a b"], ["a b c d"], ["a b c d e f g h"]]
+
+
+def test_log_throughput() -> None:
+    pairs = [("text", np.zeros(2)), ("other", np.ones(2))]
+
+    assert list(log_throughput(iter(pairs))) == pairs
+
+
+#
+# Embedding Cache
+#
+
+
+def test_sentence_transformer_identity_changes_with_weights(tmp_path: Path) -> None:
+    # Arrange
+    path_sentence_transformer = tmp_path / "model-best"
+    path_sentence_transformer.mkdir()
+    (path_sentence_transformer / "config.json").write_text('{"hidden_size": 8}')
+    (path_sentence_transformer / "model.safetensors").write_bytes(b"weights v1")
+    (path_sentence_transformer / "README.md").write_text("Not part of the model")
+
+    # Act
+    identity = sentence_transformer_identity(path_sentence_transformer)
+    (path_sentence_transformer / "README.md").write_text("Edited")
+    identity_same_model = sentence_transformer_identity(path_sentence_transformer)
+    (path_sentence_transformer / "model.safetensors").write_bytes(b"weights v2")
+    identity_retrained = sentence_transformer_identity(path_sentence_transformer)
+
+    # Assert
+    assert identity.startswith("model-best@")
+    assert identity_same_model == identity
+    assert identity_retrained != identity
+
+
+def test_spacy_pipeline_identity_changes_with_config_and_files(
+    tmp_path: Path,
+) -> None:
+    # Arrange
+    spacy_pipeline = spacy.blank("en")
+    path_spacy_pipeline = tmp_path / "model-best"
+    spacy_pipeline.to_disk(path_spacy_pipeline)
+
+    # Act
+    identity = spacy_pipeline_identity(spacy_pipeline, path_spacy_pipeline)
+    (path_spacy_pipeline / "vocab" / "strings.json").write_text('["retrained"]')
+    identity_retrained = spacy_pipeline_identity(spacy_pipeline, path_spacy_pipeline)
+    spacy_pipeline.add_pipe("sentencizer")
+    identity_reconfigured = spacy_pipeline_identity(spacy_pipeline, path_spacy_pipeline)
+
+    # Assert
+    assert identity.startswith("en_pipeline-0.0.0[]@")
+    assert len({identity, identity_retrained, identity_reconfigured}) == 3
+
+
+def test_embed_with_sent_tx_cached(
+    tmp_path: Path, mock_sentence_transformer: MagicMock
+) -> None:
+    # Arrange
+    emb_cache = EmbCacheDataInterface(filepath=tmp_path / "emb_cache.sqlite")
+    emb_cache.put_many(model_name="mock_model", text_emb=[("cached", np.zeros(3))])
+    mock_sentence_transformer.encode.return_value = np.array([[1, 2, 3]])
+
+    # Act
+    res = list(
+        embed_with_sent_tx(
+            text=["new", "cached"],
+            sent_tx=mock_sentence_transformer,
+            emb_cache=emb_cache,
+            model_name="mock_model",
+        )
+    )
+
+    # Assert
+    assert [text for text, _ in res] == ["new", "cached"]
+    np.testing.assert_array_equal(res[0][1], np.array([1, 2, 3]))
+    np.testing.assert_array_equal(res[1][1], np.zeros(3))
+    mock_sentence_transformer.encode.assert_called_once_with(
+        sentences=["new"], show_progress_bar=True
+    )
+    assert emb_cache.n_hit == 1 and emb_cache.n_miss == 1
+    assert "new" in emb_cache.get_many(model_name="mock_model", text=["new"])
+
+
+def test_embed_with_avg_word_vec_all_cached(
+    tmp_path: Path, mock_spacy_pipeline: MagicMock
+) -> None:
+    emb_cache = EmbCacheDataInterface(filepath=tmp_path / "emb_cache.sqlite")
+    emb_cache.put_many(model_name="mock_model", text_emb=[("mock_text", np.ones(3))])
+
+    res = list(
+        embed_with_avg_word_vec(
+            text=["mock_text"],
+            spacy_pipeline=mock_spacy_pipeline,
+            emb_cache=emb_cache,
+            model_name="mock_model",
+        )
+    )
+
+    assert len(res) == 1
+    np.testing.assert_array_equal(res[0][1], np.ones(3))
+    mock_spacy_pipeline.pipe.assert_not_called()
@@ -1,6 +1,7 @@
 from pathlib import Path
 from unittest.mock import MagicMock, Mock, patch
 
+from kronos.nodes.add_nlp_feats import DEFAULT_BATCH_SIZE
 from kronos.pipelines.add_nlp_feats import add_nlp_feats
 
 
@@ -53,6 +54,9 @@ def test_add_nlp_feats(
         node_dfs=mock_layout_node_dfs,
         edge_dfs=mock_layout_edge_dfs,
         spacy_pipeline=mock_spacy_pipeline,
+        parse_cache=None,
+        n_process=1,
+        batch_size=DEFAULT_BATCH_SIZE,
     )
     mock_node_interface.return_value.save.assert_called_once_with(
         node_dfs=mock_semantics_node_dfs
@@ -0,0 +1,59 @@
+from pathlib import Path
+from unittest.mock import MagicMock, Mock, mock_open, patch
+
+from kronos.pipelines.assemble_hetero_graph import assemble_hetero_graph
+
+
+@patch("kronos.pipelines.assemble_hetero_graph.HeteroGraphDataInterface")
+@patch("kronos.pipelines.assemble_hetero_graph._assemble_hetero_graph")
+@patch("kronos.pipelines.assemble_hetero_graph.EdgeDFsDataInterface")
+@patch("kronos.pipelines.assemble_hetero_graph.NodeDFsDataInterface")
+@patch("builtins.open", new_callable=mock_open)
+def test_assemble_hetero_graph(
+    mock_open: Mock,
+    mock_node_interface: Mock,
+    mock_edge_interface: Mock,
+    mock_assemble_hetero_graph: Mock,
+    mock_hetero_graph_interface: Mock,
+) -> None:
+    # Arrange
+    mock_paths = {
+        "path_node_dfs": Path("/fake/node_dfs"),
+        "path_edge_dfs": Path("/fake/edge_dfs"),
+        "path_hetero_graph": Path("/fake/hetero_graph"),
+    }
+
+    mock_node_dfs = MagicMock()
+    mock_edge_dfs = MagicMock()
+    mock_hetero_graph = MagicMock()
+
+    mock_node_interface.return_value.load.return_value = mock_node_dfs
+    mock_edge_interface.return_value.load.return_value = mock_edge_dfs
+    mock_assemble_hetero_graph.return_value = mock_hetero_graph
+
+    # Act
+    assemble_hetero_graph(
+        path_node_dfs=mock_paths["path_node_dfs"],
+        path_edge_dfs=mock_paths["path_edge_dfs"],
+        path_hetero_graph=mock_paths["path_hetero_graph"],
+    )
+
+    # Assert
+    mock_node_interface.assert_called_once_with(filepath=mock_paths["path_node_dfs"])
+    mock_node_interface.return_value.load.assert_called_once()
+    mock_node_dfs.validate.assert_called_once()
+
+    mock_edge_interface.assert_called_once_with(filepath=mock_paths["path_edge_dfs"])
+    mock_edge_interface.return_value.load.assert_called_once()
+    mock_edge_dfs.validate.assert_called_once()
+
+    mock_assemble_hetero_graph.assert_called_once_with(
+        node_dfs=mock_node_dfs, edge_dfs=mock_edge_dfs
+    )
+
+    mock_hetero_graph_interface.assert_called_once_with(
+        filepath=mock_paths["path_hetero_graph"]
+    )
+    mock_hetero_graph_interface.return_value.save.assert_called_once_with(
+        hetero_graph=mock_hetero_graph
+    )
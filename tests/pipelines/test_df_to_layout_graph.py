@@ -1,3 +1,13 @@
+from pathlib import Path
+
+import pandas as pd
+
+from kronos.data_interfaces.edge_dfs_data_interface import EdgeDFsDataInterface
+from kronos.data_interfaces.node_dfs_data_interface import (
+    NodeDFsDataInterface,
+    NodeType,
+)
+from kronos.data_interfaces.timetable_df_data_interface import TimeTableDFDataInterface
 from kronos.pipelines.df_to_layout_graph import df_to_layout_graph
 from tests.conftest import TestDataPaths
 
@@ -11,3 +21,38 @@ def test_df_to_layout_graph(test_data_paths: TestDataPaths) -> None:
 
     assert test_data_paths.path_integration_node_dfs.is_file()
     assert test_data_paths.path_integration_edge_dfs.is_file()
+
+
+def test_df_to_layout_graph_incremental(tmp_path: Path) -> None:
+    # Arrange
+    path_timetable_df = tmp_path / "timetable_df.csv"
+    path_node_dfs = tmp_path / "layout_node_dfs.json"
+    path_edge_dfs = tmp_path / "layout_edge_dfs.json"
+    df_old = pd.DataFrame({0: ["A", None, "B"], 1: [None, "C", "D"]})
+    TimeTableDFDataInterface(filepath=path_timetable_df, version="v0").save(df_old)
+    df_to_layout_graph(
+        path_timetable_df=path_timetable_df,
+        path_node_dfs=path_node_dfs,
+        path_edge_dfs=path_edge_dfs,
+    )
+    df_new = df_old.replace("C", "X")
+    TimeTableDFDataInterface(filepath=path_timetable_df, version="v1").save(df_new)
+
+    # Act
+    df_to_layout_graph(
+        path_timetable_df=path_timetable_df,
+        path_node_dfs=path_node_dfs,
+        path_edge_dfs=path_edge_dfs,
+        incremental=True,
+    )
+
+    # Assert
+    node_dfs = NodeDFsDataInterface(filepath=path_node_dfs).load()
+    edge_dfs = EdgeDFsDataInterface(filepath=path_edge_dfs).load()
+    assert node_dfs.to_dict()[NodeType.sheet_cell]["text"].tolist() == [
+        "A",
+        "X",
+        "B",
+        "D",
+    ]
+    assert sum(len(edge_df.df) for edge_df in edge_dfs.members) == 6
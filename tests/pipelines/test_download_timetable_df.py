@@ -4,7 +4,14 @@ from unittest.mock import Mock, patch
 
 import pandas as pd
 
+from kronos.data_interfaces.marker_data_interface import (
+    RefreshMarker,
+    RefreshMarkerDataInterface,
+    RefreshStatus,
+)
+from kronos.data_interfaces.timetable_df_data_interface import TimeTableDFDataInterface
 from kronos.pipelines.download_timetable_df import download_df_timetable
+from kronos.pipelines.mark_timetable_consumed import mark_timetable_consumed
 from tests.conftest import TestDataPaths
 
 
@@ -40,3 +47,121 @@ def test_download_df_timetable(
     df_output = pd.read_csv(filepath)
     # Not testing data transformation logic here. Leaving that to unit testing
     assert len(df_output) > 0, "The output DataFrame should contain rows."
+
+
+@patch(
+    "kronos.data_interfaces.timetable_df_data_interface.TimeTableDFDataInterface.download"
+)
+def test_download_df_timetable_marks_an_unchanged_sheet_once_consumed(
+    mock_download: Mock,
+    mock_sheet_values: List[List[str]],
+    tmp_path: Path,
+) -> None:
+    # Arrange
+    mock_download.return_value = mock_sheet_values
+    path_timetable_df = tmp_path / "timetable_df.csv"
+    path_refresh_marker = tmp_path / "refresh_marker.json"
+    path_consumed_marker = tmp_path / "consumed_marker.json"
+    dummy_service_account_json_path = Path("/path/to/dummy/service_account.json")
+
+    def refresh() -> RefreshMarker:
+        return download_df_timetable(
+            path_service_account_json=dummy_service_account_json_path,
+            path_timetable_df=path_timetable_df,
+            path_refresh_marker=path_refresh_marker,
+            path_consumed_marker=path_consumed_marker,
+        )
+
+    # Act
+    first_marker = refresh()
+    # Downstream stages failed, so the saved version was never consumed
+    retried_marker = refresh()
+    mark_timetable_consumed(
+        path_timetable_df=path_timetable_df,
+        path_consumed_marker=path_consumed_marker,
+        path_refresh_marker=path_refresh_marker,
+    )
+    consumed_marker = refresh()
+
+    # Assert
+    assert first_marker.status == RefreshStatus.changed
+    assert first_marker.previous_version is None
+    assert first_marker.consumed_version is None
+    assert retried_marker.status == RefreshStatus.changed
+    assert retried_marker.version == first_marker.version
+    assert retried_marker.consumed_version is None
+    assert consumed_marker.status == RefreshStatus.unchanged
+    assert consumed_marker.version == first_marker.version
+    assert consumed_marker.previous_version == first_marker.version
+    assert consumed_marker.consumed_version == first_marker.version
+    assert consumed_marker.content_hash == first_marker.content_hash
+    assert RefreshMarkerDataInterface(filepath=path_refresh_marker).load() == (
+        consumed_marker
+    )
+    assert TimeTableDFDataInterface(filepath=path_timetable_df).versions() == [
+        first_marker.version
+    ]
+
+
+@patch(
+    "kronos.data_interfaces.timetable_df_data_interface.TimeTableDFDataInterface.download"
+)
+def test_download_df_timetable_marks_a_sheet_changed_without_a_consumed_marker(
+    mock_download: Mock,
+    mock_sheet_values: List[List[str]],
+    tmp_path: Path,
+) -> None:
+    # Arrange
+    mock_download.return_value = mock_sheet_values
+    path_timetable_df = tmp_path / "timetable_df.csv"
+    dummy_service_account_json_path = Path("/path/to/dummy/service_account.json")
+
+    # Act
+    refresh_markers = [
+        download_df_timetable(
+            path_service_account_json=dummy_service_account_json_path,
+            path_timetable_df=path_timetable_df,
+        )
+        for _ in range(2)
+    ]
+
+    # Assert
+    assert [m.status for m in refresh_markers] == [RefreshStatus.changed] * 2
+    # Content identical to that of the latest version is not saved again
+    assert refresh_markers[1].version == refresh_markers[0].version
+
+
+@patch(
+    "kronos.data_interfaces.timetable_df_data_interface.TimeTableDFDataInterface.download"
+)
+def test_download_df_timetable_marks_a_changed_sheet(
+    mock_download: Mock,
+    mock_sheet_values: List[List[str]],
+    tmp_path: Path,
+) -> None:
+    # Arrange
+    path_timetable_df = tmp_path / "timetable_df.csv"
+    dummy_service_account_json_path = Path("/path/to/dummy/service_account.json")
+    previous_version = "2024-02-22T11.06.43.555Z"
+    mock_download.return_value = mock_sheet_values
+    download_df_timetable(
+        path_service_account_json=dummy_service_account_json_path,
+        path_timetable_df=path_timetable_df,
+        version=previous_version,
+    )
+    mock_download.return_value = [[*row[:-1], "changed"] for row in mock_sheet_values]
+
+    # Act
+    refresh_marker = download_df_timetable(
+        path_service_account_json=dummy_service_account_json_path,
+        path_timetable_df=path_timetable_df,
+    )
+
+    # Assert
+    assert refresh_marker.status == RefreshStatus.changed
+    assert refresh_marker.previous_version == previous_version
+    assert refresh_marker.version != previous_version
+    assert TimeTableDFDataInterface(filepath=path_timetable_df).versions() == [
+        previous_version,
+        refresh_marker.version,
+    ]
@@ -0,0 +1,85 @@
+from pathlib import Path
+
+import orjson
+import pytest
+
+from kronos.data_interfaces.timetable_df_data_interface import TimeTableDFDataInterface
+from kronos.nodes.download_sheets import DownloadConfig
+from kronos.pipelines.download_timetable_dfs import download_timetable_dfs
+from tests.fake_sheets_server import FakeSheetsServer
+
+
+def test_download_timetable_dfs(tmp_path: Path) -> None:
+    # Arrange
+    spreadsheets = {
+        "key_a": {"2024": [["", "Mon"], ["Cape Town", "2024.0"]]},
+        "key_b": {"Sheet1": [["a"], ["b", "c"]]},
+    }
+    path_targets_json = tmp_path / "targets.json"
+    path_targets_json.write_bytes(
+        orjson.dumps(
+            [
+                {"name": "a", "spreadsheet_key": "key_a", "worksheet": 0},
+                {"name": "b", "spreadsheet_key": "key_b", "worksheet": "Sheet1"},
+            ]
+        )
+    )
+    path_dir_timetable_df = tmp_path / "timetable_dfs"
+    download_config = DownloadConfig(requests_per_s=100.0)
+
+    # Act
+    with FakeSheetsServer(spreadsheets=spreadsheets) as fake:
+        name_to_version = download_timetable_dfs(
+            path_targets_json=path_targets_json,
+            path_dir_timetable_df=path_dir_timetable_df,
+            download_config=download_config,
+            base_url=fake.url,
+        )
+        # Unchanged worksheets are not saved again
+        name_to_version_again = download_timetable_dfs(
+            path_targets_json=path_targets_json,
+            path_dir_timetable_df=path_dir_timetable_df,
+            download_config=download_config,
+            base_url=fake.url,
+        )
+
+    # Assert
+    assert name_to_version_again == name_to_version
+    timetable_df = TimeTableDFDataInterface(
+        filepath=path_dir_timetable_df / "a.csv"
+    ).load()
+    assert timetable_df.isna().values.tolist() == [[True, False], [False, False]]
+    assert timetable_df.values.tolist()[1] == ["Cape Town", "2024"]
+    assert TimeTableDFDataInterface(
+        filepath=path_dir_timetable_df / "b.csv"
+    ).versions() == [name_to_version["b"]]
+
+
+def test_download_timetable_dfs_saves_the_rest_when_a_target_fails(
+    tmp_path: Path,
+) -> None:
+    # Arrange
+    path_targets_json = tmp_path / "targets.json"
+    path_targets_json.write_bytes(
+        orjson.dumps(
+            [
+                {"name": "a", "spreadsheet_key": "key_a"},
+                {"name": "missing", "spreadsheet_key": "missing"},
+            ]
+        )
+    )
+    path_dir_timetable_df = tmp_path / "timetable_dfs"
+
+    # Act
+    with FakeSheetsServer(spreadsheets={"key_a": {"Sheet1": [["a"]]}}) as fake:
+        with pytest.raises(RuntimeError, match="missing"):
+            download_timetable_dfs(
+                path_targets_json=path_targets_json,
+                path_dir_timetable_df=path_dir_timetable_df,
+                download_config=DownloadConfig(requests_per_s=100.0),
+                base_url=fake.url,
+            )
+
+    # Assert
+    assert (path_dir_timetable_df / "a.csv" / "catalog.json").is_file()
+    assert not (path_dir_timetable_df / "missing.csv").exists()
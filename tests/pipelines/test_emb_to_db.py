@@ -3,25 +3,34 @@ from unittest.mock import Mock, patch
 
 import numpy as np
 
-from kronos.nodes.operate_vector_db import CollectionName, VectorDBEndPoint
+from kronos.nodes.operate_vector_db import (
+    CollectionName,
+    ImportMode,
+    VectorDBEndPoint,
+    object_uuids,
+)
 from kronos.pipelines.emb_to_db import emb_to_db
 
 
+@patch("kronos.pipelines.emb_to_db.UploadManifestDataInterface")
 @patch("kronos.pipelines.emb_to_db.TextEmbLocalDataInterface")
 @patch("kronos.pipelines.emb_to_db.instantiate_client")
 @patch("kronos.pipelines.emb_to_db.collection_exists")
 @patch("kronos.pipelines.emb_to_db.del_collection")
 @patch("kronos.pipelines.emb_to_db.add_collections")
 @patch("kronos.pipelines.emb_to_db.batch_import")
+@patch("kronos.pipelines.emb_to_db.RestBatchTransport")
 @patch("numpy.load")
 def test_emb_to_db(
     mock_np_load: Mock,
+    mock_transport: Mock,
     mock_batch_import: Mock,
     mock_add_collections: Mock,
     mock_del_collection: Mock,
     mock_collection_exists: Mock,
     mock_instantiate_client: Mock,
     mock_text_emb_interface: Mock,
+    mock_upload_manifest_interface: Mock,
 ) -> None:
     # Arrange
     mock_path_text_emb = Path("/fake/text_emb.npz")
@@ -55,3 +64,61 @@ def test_emb_to_db(
     )
     mock_add_collections.assert_called_once()
     mock_batch_import.assert_called_once()
+    mock_upload_manifest_interface.assert_called_once_with(
+        filepath=Path("/fake/text_emb.npz.Word.uploaded.npy")
+    )
+    mock_upload_manifest_interface.return_value.save.assert_called_once_with(
+        uuids=object_uuids(collection_name=collection_name, text=np.array(["a_text"]))
+    )
+
+
+@patch("kronos.pipelines.emb_to_db.UploadManifestDataInterface")
+@patch("kronos.pipelines.emb_to_db.TextEmbLocalDataInterface")
+@patch("kronos.pipelines.emb_to_db.instantiate_client")
+@patch("kronos.pipelines.emb_to_db.collection_exists")
+@patch("kronos.pipelines.emb_to_db.del_collection")
+@patch("kronos.pipelines.emb_to_db.add_collections")
+@patch("kronos.pipelines.emb_to_db.batch_upsert")
+@patch("kronos.pipelines.emb_to_db.RestBatchTransport")
+def test_emb_to_db_upsert(
+    mock_transport: Mock,
+    mock_batch_upsert: Mock,
+    mock_add_collections: Mock,
+    mock_del_collection: Mock,
+    mock_collection_exists: Mock,
+    mock_instantiate_client: Mock,
+    mock_text_emb_interface: Mock,
+    mock_upload_manifest_interface: Mock,
+) -> None:
+    # Arrange
+    mock_client = Mock()
+    mock_instantiate_client.return_value.__enter__.return_value = mock_client
+    mock_collection_exists.return_value = True
+
+    # Act
+    emb_to_db(
+        path_text_emb=Path("/fake/text_emb.emb"),
+        collection_name=CollectionName.word,
+        end_point=VectorDBEndPoint(),
+        mode=ImportMode.upsert,
+        chunk_size=128,
+    )
+
+    # Assert
+    mock_text_emb_interface.return_value.load.assert_not_called()
+    mock_text_emb_interface.return_value.iter_chunks.assert_called_once_with(
+        chunk_size=128
+    )
+    mock_del_collection.assert_not_called()
+    mock_add_collections.assert_not_called()
+    mock_batch_upsert.assert_called_once_with(
+        client=mock_client,
+        collection_name=CollectionName.word,
+        chunks=mock_text_emb_interface.return_value.iter_chunks.return_value,
+        transport=mock_transport.return_value.__enter__.return_value,
+        ingest_config=None,
+        previous_uuids=mock_upload_manifest_interface.return_value.load.return_value,
+    )
+    mock_upload_manifest_interface.return_value.save.assert_called_once_with(
+        uuids=mock_batch_upsert.return_value.uuids
+    )
@@ -0,0 +1,74 @@
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from kronos.data_interfaces.marker_data_interface import (
+    ConsumedMarkerDataInterface,
+    RefreshMarker,
+    RefreshMarkerDataInterface,
+    RefreshStatus,
+)
+from kronos.data_interfaces.timetable_df_data_interface import TimeTableDFDataInterface
+from kronos.pipelines.mark_timetable_consumed import mark_timetable_consumed
+
+
+def test_mark_timetable_consumed(tmp_path: Path) -> None:
+    # Arrange
+    path_timetable_df = tmp_path / "timetable_df.csv"
+    path_consumed_marker = tmp_path / "consumed_marker.json"
+    path_refresh_marker = tmp_path / "refresh_marker.json"
+    for version, value in [("v0", "a"), ("v1", "b")]:
+        TimeTableDFDataInterface(filepath=path_timetable_df, version=version).save(
+            timetable_df=pd.DataFrame([[value]])
+        )
+    catalog = TimeTableDFDataInterface(filepath=path_timetable_df).load_catalog()
+    # Downstream stages were started from v0, before v1 was saved
+    RefreshMarkerDataInterface(filepath=path_refresh_marker).save(
+        marker=RefreshMarker(
+            status=RefreshStatus.changed,
+            version="v0",
+            content_hash=catalog.by_version("v0").content_hash,
+            checked_at=datetime(2024, 3, 4, 15, 36, 20, tzinfo=timezone.utc),
+        )
+    )
+
+    # Act
+    pinned_marker = mark_timetable_consumed(
+        path_timetable_df=path_timetable_df,
+        path_consumed_marker=path_consumed_marker,
+        version="v1",
+    )
+    refreshed_marker = mark_timetable_consumed(
+        path_timetable_df=path_timetable_df,
+        path_consumed_marker=path_consumed_marker,
+        path_refresh_marker=path_refresh_marker,
+    )
+
+    # Assert
+    assert pinned_marker.version == "v1"
+    assert pinned_marker.content_hash == catalog.by_version("v1").content_hash
+    # The version of the refresh marker is marked rather than the latest version
+    assert refreshed_marker.version == "v0"
+    assert refreshed_marker.content_hash == catalog.by_version("v0").content_hash
+    assert ConsumedMarkerDataInterface(filepath=path_consumed_marker).load() == (
+        refreshed_marker
+    )
+
+
+def test_mark_timetable_consumed_rejects_an_unknown_version(tmp_path: Path) -> None:
+    with pytest.raises(FileNotFoundError, match="v9"):
+        mark_timetable_consumed(
+            path_timetable_df=tmp_path / "timetable_df.csv",
+            path_consumed_marker=tmp_path / "consumed_marker.json",
+            version="v9",
+        )
+
+
+def test_mark_timetable_consumed_needs_the_consumed_version(tmp_path: Path) -> None:
+    with pytest.raises(ValueError, match="Exactly one"):
+        mark_timetable_consumed(
+            path_timetable_df=tmp_path / "timetable_df.csv",
+            path_consumed_marker=tmp_path / "consumed_marker.json",
+        )
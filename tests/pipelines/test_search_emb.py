@@ -0,0 +1,88 @@
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+import numpy as np
+
+from kronos.data_interfaces.emb_index_data_interface import ivf_index_path
+from kronos.data_interfaces.text_emb_local_data_interface import (
+    TextEmbLocalDataInterface,
+)
+from kronos.nodes.search_emb import SearchIndexType
+from kronos.pipelines.search_emb import search_emb
+
+
+def save_text_emb(path_text_emb: Path) -> None:
+    text = np.array(["Cape Town", "Cape Town tour", "Shanghai", "Lunch"])
+    emb = np.array([[1.0, 0.0, 0.0], [0.9, 0.1, 0.0], [0.0, 1.0, 0.0], [0, 0, 1.0]])
+    TextEmbLocalDataInterface(filepath=path_text_emb).save(text=text, emb=emb)
+
+
+def test_search_emb_exact(tmp_path: Path) -> None:
+    # Arrange
+    path_text_emb = tmp_path / "text_emb.npz"
+    save_text_emb(path_text_emb)
+
+    # Act
+    neighbours = search_emb(
+        path_text_emb=path_text_emb, query_text=["Cape Town", "Lunch"], k=2
+    )
+
+    # Assert
+    assert [a_text for a_text, _ in neighbours[0]] == ["Cape Town", "Cape Town tour"]
+    assert neighbours[1][0][0] == "Lunch"
+    assert not ivf_index_path(path_text_emb).exists()
+
+
+def test_search_emb_ivf_persists_and_reuses_index(tmp_path: Path) -> None:
+    # Arrange
+    path_text_emb = tmp_path / "text_emb.emb"
+    save_text_emb(path_text_emb)
+
+    # Act
+    first = search_emb(
+        path_text_emb=path_text_emb,
+        query_text=["Shanghai"],
+        k=1,
+        index_type=SearchIndexType.ivf,
+        n_list=2,
+        n_probe=2,
+    )
+    with patch("kronos.pipelines.search_emb.IVFIndex.build") as mock_build:
+        second = search_emb(
+            path_text_emb=path_text_emb,
+            query_text=["Shanghai"],
+            k=1,
+            index_type=SearchIndexType.ivf,
+            n_probe=2,
+        )
+
+    # Assert
+    assert ivf_index_path(path_text_emb).exists()
+    mock_build.assert_not_called()
+    assert first == second
+    assert first[0][0][0] == "Shanghai"
+
+
+@patch("kronos.pipelines.search_emb.SentenceTransformer")
+def test_search_emb_with_sentence_transformer(
+    mock_sent_tx: Mock, tmp_path: Path
+) -> None:
+    # Arrange
+    path_text_emb = tmp_path / "text_emb.npz"
+    save_text_emb(path_text_emb)
+    mock_sent_tx.return_value.encode.return_value = np.array([[0.0, 0.2, 0.9]])
+
+    # Act
+    neighbours = search_emb(
+        path_text_emb=path_text_emb,
+        query_text=["Something to eat"],
+        k=1,
+        path_sentence_transformer=Path("/fake/sentence_transformer"),
+    )
+
+    # Assert
+    mock_sent_tx.assert_called_once_with(
+        model_name_or_path=str(Path("/fake/sentence_transformer"))
+    )
+    mock_sent_tx.return_value.encode.assert_called_once_with(["Something to eat"])
+    assert neighbours[0][0][0] == "Lunch"
@@ -3,6 +3,7 @@ from unittest.mock import MagicMock, Mock, mock_open, patch
 
 import numpy as np
 
+from kronos.nodes.vectorise_text_feats import SentTxEncodeMode
 from kronos.pipelines.vectorise_with_sent_tx_local import vectorise_with_sent_tx_local
 
 
@@ -53,7 +54,12 @@ def test_contracted_sheet_cell_nodes(
     )
 
     mock_vectorise_with_sent_tx.assert_called_once_with(
-        node_dfs=mock_semantics_node_dfs, sentence_transformer=mock_sent_tx_instance
+        node_dfs=mock_semantics_node_dfs,
+        sentence_transformer=mock_sent_tx_instance,
+        emb_cache=None,
+        # Without an embedding cache the model identity is not computed
+        model_name=None,
+        encode_mode=SentTxEncodeMode.single,
     )
 
     mock_text_emb_interface.assert_called_once_with(
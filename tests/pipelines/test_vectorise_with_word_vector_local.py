@@ -55,7 +55,11 @@ def test_vectorise_with_word_vector_local(
     mock_spacy_pipeline_interface.return_value.load.assert_called_once()
 
     mock_vectorise_with_word_vector.assert_called_once_with(
-        node_dfs=mock_semantics_node_dfs, spacy_pipeline=mock_spacy_pipeline
+        node_dfs=mock_semantics_node_dfs,
+        spacy_pipeline=mock_spacy_pipeline,
+        emb_cache=None,
+        # Without an embedding cache the model identity is not computed
+        model_name=None,
     )
 
     mock_text_emb_interface.assert_called_once_with(